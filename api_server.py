@@ -7,12 +7,15 @@ from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 import uvicorn
 import json
+import asyncio
 
 from core.website_extract import WebInfo
 from core.website_analyzer import WebsiteAnalyzer
 from core.search_engine.search_engine_tool import SearchEngineTool
 from core.parse_webpage.get_webpage_info import WebPageParser
 from core.ai_summary import ContentProcessor, ProcessedContent, HTMLContentExtractorAgent
+from core.parse_worker import get_parse_pool, prepare_html_content
+from core.ai_processor import get_llm_executor
 
 app = FastAPI(title="网站内容提取API")
 
@@ -35,6 +38,7 @@ class WebsiteRequest(BaseModel):
 class WebsiteResponse(BaseModel):
     content: List[Dict[str, Any]]
     job_urls: List[str]
+    timing: Optional[Dict[str, Any]] = None  # 本次爬取的耗时汇总
 
 class AIProcessRequest(BaseModel):
     content: List[Dict[str, Any]]
@@ -115,6 +119,35 @@ def get_html_content_agent():
         html_content_agent = HTMLContentExtractorAgent()
     return html_content_agent
 
+async def extract_html(html_content: str, url: str = "") -> Dict[str, Any]:
+    """
+    提取HTML内容：解析、清理和规则提取在解析进程池中执行，大模型调用在当前进程的线程池中执行
+    Args:
+        html_content: HTML内容
+        url: 页面URL
+    Returns:
+        HTMLContentExtractorAgent.extract_content格式的结果
+    """
+    agent = get_html_content_agent()
+    if not html_content:
+        return agent.extract_content(html_content, url)
+    prepared = await get_parse_pool().run_async(prepare_html_content, html_content, url)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_llm_executor(), agent.complete_extraction, prepared, html_content)
+
+async def analyze_html(html_content: str, url: str = "", user_query: str = "") -> str:
+    """
+    智能分析HTML内容，执行方式同extract_html
+    Returns:
+        JSON格式的分析结果
+    """
+    agent = get_html_content_agent()
+    if not html_content:
+        return agent.analyze_with_agent(html_content, url, user_query)
+    prepared = await get_parse_pool().run_async(prepare_html_content, html_content, url)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_llm_executor(), agent.complete_analysis, prepared, user_query)
+
 @app.post("/search", response_model=List[Dict[str, str]])
 async def search_engine(request: SearchEngineRequest):
     """搜索引擎接口"""
@@ -133,15 +166,20 @@ async def get_webpage(request: WebpageRequest):
     """网页内容获取接口"""
     try:
         parser = WebPageParser()
-        soup = parser.get_webpage_content(
+        response = parser.fetch(
             request.url,
             tool_type=request.tool_type
         )
+        # 整个接口只解析一次，title/text/soup都复用同一棵树
+        soup = response.soup if response else None
         
         result = {
             "title": soup.title.string if soup and soup.title else None,
             "text": soup.get_text() if soup else None,
-            "soup": soup.prettify() if hasattr(soup, 'prettify') else None
+            "soup": soup.prettify() if hasattr(soup, 'prettify') else None,
+            "final_url": response.final_url if response else None,
+            "encoding": response.encoding if response else None,
+            "timing": response.timing_report() if response else None
         }
         return result
     except Exception as e:
@@ -159,7 +197,8 @@ async def extract_website(request: WebsiteRequest):
         content, job_urls = webtool.run()
         return {
             "content": content,
-            "job_urls": job_urls
+            "job_urls": job_urls,
+            "timing": webtool.timing_summary()
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -445,10 +484,8 @@ async def qwen_quality_assessment(request: QwenAgentRequest):
 async def html_content_extract(request: HTMLContentExtractRequest):
     """HTML内容提取接口 - 提取标题、作者、时间、摘要、标签等"""
     try:
-        agent = get_html_content_agent()
-        
-        # 提取内容
-        result = agent.extract_content(request.html_content, request.url)
+        # 在解析进程池中解析，在线程池中调用大模型
+        result = await extract_html(request.html_content, request.url)
         
         return result
         
@@ -459,10 +496,8 @@ async def html_content_extract(request: HTMLContentExtractRequest):
 async def html_content_analyze(request: HTMLContentAnalyzeRequest):
     """HTML内容智能分析接口 - 使用AI分析HTML内容"""
     try:
-        agent = get_html_content_agent()
-        
-        # 智能分析
-        analysis = agent.analyze_with_agent(
+        # 在解析进程池中解析，在线程池中调用大模型
+        analysis = await analyze_html(
             request.html_content, 
             request.url, 
             request.user_query
@@ -481,10 +516,12 @@ async def html_content_analyze(request: HTMLContentAnalyzeRequest):
 async def html_content_batch_extract(request: HTMLContentBatchRequest):
     """HTML内容批量提取接口"""
     try:
-        agent = get_html_content_agent()
-        
-        # 批量处理
-        results = agent.batch_extract(request.html_contents)
+        # 批量处理，各页面在解析进程池中并行解析，在线程池中并行调用大模型
+        extracted = await asyncio.gather(*(
+            extract_html(item.get('html_content', ''), item.get('url', ''))
+            for item in request.html_contents
+        ))
+        results = HTMLContentExtractorAgent.build_batch_result(request.html_contents, extracted)
         
         return {
             "success": True,
@@ -499,10 +536,8 @@ async def html_content_batch_extract(request: HTMLContentBatchRequest):
 async def html_content_quality_assessment(request: HTMLContentExtractRequest):
     """HTML内容质量评估接口"""
     try:
-        agent = get_html_content_agent()
-        
         # 提取内容并评估质量
-        result = agent.extract_content(request.html_content, request.url)
+        result = await extract_html(request.html_content, request.url)
         
         if result['success']:
             data = result['data']
@@ -537,10 +572,8 @@ async def html_content_quality_assessment(request: HTMLContentExtractRequest):
 async def html_metadata_extract(request: HTMLContentExtractRequest):
     """HTML元数据提取接口 - 专门提取标题、作者、时间等元数据"""
     try:
-        agent = get_html_content_agent()
-        
-        # 提取内容
-        result = agent.extract_content(request.html_content, request.url)
+        # 在解析进程池中解析，在线程池中调用大模型
+        result = await extract_html(request.html_content, request.url)
         
         if result['success']:
             data = result['data']
@@ -575,10 +608,8 @@ async def html_metadata_extract(request: HTMLContentExtractRequest):
 async def html_summary_generate(request: HTMLContentExtractRequest):
     """HTML内容摘要生成接口"""
     try:
-        agent = get_html_content_agent()
-        
-        # 提取内容
-        result = agent.extract_content(request.html_content, request.url)
+        # 在解析进程池中解析，在线程池中调用大模型
+        result = await extract_html(request.html_content, request.url)
         
         if result['success']:
             data = result['data']
@@ -609,16 +640,16 @@ async def html_summary_generate(request: HTMLContentExtractRequest):
 async def html_content_compare(request: Dict[str, Any]):
     """HTML内容比较接口 - 比较两个HTML内容"""
     try:
-        agent = get_html_content_agent()
-        
         html1 = request.get('html_content_1', '')
         html2 = request.get('html_content_2', '')
         url1 = request.get('url_1', '')
         url2 = request.get('url_2', '')
         
-        # 提取两个内容
-        result1 = agent.extract_content(html1, url1)
-        result2 = agent.extract_content(html2, url2)
+        # 并行提取两个内容
+        result1, result2 = await asyncio.gather(
+            extract_html(html1, url1),
+            extract_html(html2, url2)
+        )
         
         comparison = {
             "content1": {
@@ -32,6 +32,11 @@ class Config:
     AI_TEMPERATURE = float(os.getenv("AI_TEMPERATURE", "0.7"))
     AI_USE_LOCAL_MODEL = os.getenv("AI_USE_LOCAL_MODEL", "false").lower() == "true"
     AI_LOCAL_MODEL_PATH = os.getenv("AI_LOCAL_MODEL_PATH", "")
+    # 每个进程同时进行的大模型调用数，以及整站分析等待全部调用的最长时间（秒，0表示不限）
+    AI_MAX_CONCURRENCY = int(os.getenv("AI_MAX_CONCURRENCY", "4"))
+    AI_CALL_TIMEOUT = float(os.getenv("AI_CALL_TIMEOUT", "120"))
+    # 整站分析用一次JSON结构化输出调用同时生成总结、关键信息、分类和洞察（否则为四次独立调用）
+    AI_STRUCTURED_OUTPUT = os.getenv("AI_STRUCTURED_OUTPUT", "false").lower() == "true"
     
     # =============================================================================
     # qwen-agent配置
@@ -47,8 +52,45 @@ class Config:
     DEFAULT_NEED_SOUP = os.getenv("DEFAULT_NEED_SOUP", "false").lower() == "true"
     DEFAULT_TIMEOUT = int(os.getenv("DEFAULT_TIMEOUT", "30"))
     DEFAULT_RETRY_TIMES = int(os.getenv("DEFAULT_RETRY_TIMES", "3"))
+    FETCH_MAX_BODY_BYTES = int(os.getenv("FETCH_MAX_BODY_BYTES", str(10 * 1024 * 1024)))
+    # HTML解析器：auto（已安装lxml时使用lxml，否则html.parser）/lxml/html5lib/html.parser
+    HTML_PARSER = os.getenv("HTML_PARSER", "auto")
+    # 解析前预处理：清空超长的内嵌script/style/svg和data URI，限制嵌套深度、标签总数和属性数量/长度（0表示不限制）
+    HTML_SCRUB_ENABLED = os.getenv("HTML_SCRUB_ENABLED", "true").lower() == "true"
+    HTML_SCRUB_MAX_INLINE_BYTES = int(os.getenv("HTML_SCRUB_MAX_INLINE_BYTES", "262144"))
+    HTML_SCRUB_MAX_DATA_URI = int(os.getenv("HTML_SCRUB_MAX_DATA_URI", "2048"))
+    HTML_SCRUB_MAX_DEPTH = int(os.getenv("HTML_SCRUB_MAX_DEPTH", "256"))
+    HTML_SCRUB_MAX_NODES = int(os.getenv("HTML_SCRUB_MAX_NODES", "200000"))
+    HTML_SCRUB_MAX_ATTRIBUTES = int(os.getenv("HTML_SCRUB_MAX_ATTRIBUTES", "64"))
+    HTML_SCRUB_MAX_ATTRIBUTE_LENGTH = int(os.getenv("HTML_SCRUB_MAX_ATTRIBUTE_LENGTH", "8192"))
+    # 发布时间统一换算到的时区（UTC偏移，如+08:00），不带时区的时间按原样保留
+    DATE_TIMEZONE = os.getenv("DATE_TIMEZONE", "+08:00")
+    # 调用大模型前的页面质量判断：得分低于阈值的页面（登录页、Cookie提示、导航列表等）只做规则处理
+    QUALITY_GATE_ENABLED = os.getenv("QUALITY_GATE_ENABLED", "true").lower() == "true"
+    QUALITY_GATE_THRESHOLD = float(os.getenv("QUALITY_GATE_THRESHOLD", "0.5"))
+    # 质量模型JSON路径，留空使用随包发布的core/ai_summary/quality_model.json
+    QUALITY_MODEL_PATH = os.getenv("QUALITY_MODEL_PATH", "")
+    
+    # 按站点的自适应限流（令牌桶+AIMD并发）
+    RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_RPS = float(os.getenv("RATE_LIMIT_RPS", "2"))
+    RATE_LIMIT_MAX_RPS = float(os.getenv("RATE_LIMIT_MAX_RPS", "20"))
+    RATE_LIMIT_CONCURRENCY = int(os.getenv("RATE_LIMIT_CONCURRENCY", "2"))
+    RATE_LIMIT_MAX_CONCURRENCY = int(os.getenv("RATE_LIMIT_MAX_CONCURRENCY", "8"))
+    
+    # 代理池：逗号分隔的代理URL，按延迟和错误率加权选择
+    PROXY_LIST = os.getenv("PROXY_LIST", "")
+    PROXY_STICKY_HOSTS = os.getenv("PROXY_STICKY_HOSTS", "")
+    PROXY_EJECT_AFTER = int(os.getenv("PROXY_EJECT_AFTER", "3"))
+    PROXY_REPROBE_SECONDS = float(os.getenv("PROXY_REPROBE_SECONDS", "60"))
     USER_AGENT = os.getenv("USER_AGENT", "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
     
+    # 动态页面渲染等待（selenium/playwright）
+    RENDER_MAX_WAIT = float(os.getenv("RENDER_MAX_WAIT", "10"))
+    RENDER_NETWORK_IDLE_MS = int(os.getenv("RENDER_NETWORK_IDLE_MS", "500"))
+    RENDER_DOM_QUIET_MS = int(os.getenv("RENDER_DOM_QUIET_MS", "500"))
+    RENDER_WAIT_SELECTORS = os.getenv("RENDER_WAIT_SELECTORS", "")
+    
     # =============================================================================
     # 搜索引擎配置
     # =============================================================================
@@ -115,6 +157,15 @@ class Config:
     MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "10"))
     CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() == "true"
     CACHE_TTL = int(os.getenv("CACHE_TTL", "3600"))
+    CACHE_DIR = os.getenv("CACHE_DIR", ".cache/webpages")
+    CACHE_MAX_SIZE_MB = int(os.getenv("CACHE_MAX_SIZE_MB", "512"))
+    # HTML解析进程池的进程数：0表示使用CPU核数，1表示不启用进程池，在当前进程解析
+    PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", "0"))
+    
+    # 获取结果录制/回放（off/record/replay），用于离线性能测试
+    FETCH_ARCHIVE_MODE = os.getenv("FETCH_ARCHIVE_MODE", "off")
+    FETCH_ARCHIVE_PATH = os.getenv("FETCH_ARCHIVE_PATH", ".cache/fetch_archive.warc.gz")
+    FETCH_ARCHIVE_LATENCY = float(os.getenv("FETCH_ARCHIVE_LATENCY", "0"))
     
     # =============================================================================
     # 监控配置
@@ -6,12 +6,19 @@ AI内容处理模块
 """
 
 import os
+import sys
 import json
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeoutError
+from typing import Callable, List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 import re
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import config as app_config
+from core.llm_json import extract_json
+
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -24,6 +31,57 @@ class AIConfig:
     temperature: float = 0.7
     use_local_model: bool = False
     local_model_path: Optional[str] = None
+    structured_output: bool = app_config.AI_STRUCTURED_OUTPUT  # 整站分析是否只调用一次模型
+
+
+# 结构化输出模式要求模型返回的JSON结构
+ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "summary": {"type": "string", "description": "网页内容的简洁总结，保留重要信息"},
+        "key_info": {
+            "type": "object",
+            "properties": {
+                "公司名称": {"type": "string"},
+                "主营业务": {"type": "string"},
+                "联系方式": {"type": "object", "properties": {
+                    "电话": {"type": "string"}, "邮箱": {"type": "string"}, "地址": {"type": "string"}
+                }},
+                "产品服务": {"type": "array", "items": {"type": "string"}},
+                "公司简介": {"type": "string"},
+                "其他重要信息": {"type": "string"}
+            }
+        },
+        "categories": {"type": "array", "items": {"type": "string"}, "minItems": 3, "maxItems": 5},
+        "insights": {"type": "string", "description": "业务模式、市场定位、竞争优势、发展前景和潜在风险分析"}
+    },
+    "required": ["summary", "key_info", "categories", "insights"]
+}
+
+# 各字段期望的类型，缺失时使用该类型的空值
+_ANALYSIS_FIELDS = {
+    "summary": str,
+    "key_info": dict,
+    "categories": list,
+    "insights": str
+}
+
+_llm_executor = None
+_llm_executor_lock = threading.Lock()
+
+
+def get_llm_executor() -> ThreadPoolExecutor:
+    """获取进程内共享的大模型调用线程池，线程数即每个进程的并发上限"""
+    global _llm_executor
+    if _llm_executor is None:
+        with _llm_executor_lock:
+            if _llm_executor is None:
+                _llm_executor = ThreadPoolExecutor(
+                    max_workers=max(1, app_config.AI_MAX_CONCURRENCY),
+                    thread_name_prefix="llm"
+                )
+    return _llm_executor
+
 
 class AIContentProcessor:
     """AI内容处理器"""
@@ -66,8 +124,8 @@ class AIContentProcessor:
             logger.error(f"AI模型初始化失败: {e}")
             raise
     
-    def _call_qwen_api(self, prompt: str, system_prompt: str = None) -> str:
-        """调用Qwen API"""
+    def _call_qwen_api(self, prompt: str, system_prompt: str = None, json_mode: bool = False) -> str:
+        """调用Qwen API，json_mode为True时要求模型只输出JSON对象"""
         try:
             # 直接使用dashscope调用，避免qwen-agent的复杂配置
             import dashscope
@@ -90,7 +148,8 @@ class AIContentProcessor:
                 max_tokens=2000,
                 temperature=0.7,
                 top_p=0.8,
-                result_format='message'
+                result_format='message',
+                **({'response_format': {'type': 'json_object'}} if json_mode else {})
             )
             
             if response.status_code == 200:
@@ -176,16 +235,11 @@ class AIContentProcessor:
         else:
             result = self._call_qwen_api(prompt, system_prompt)
         
-        # 尝试解析JSON结果
-        try:
-            # 提取JSON部分
-            json_match = re.search(r'\{.*\}', result, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group())
-            else:
-                return {"error": "无法解析AI返回的JSON格式", "raw_result": result}
-        except json.JSONDecodeError:
-            return {"error": "JSON解析失败", "raw_result": result}
+        # 解析回复中的JSON对象
+        key_info = extract_json(result, dict)
+        if key_info is None:
+            return {"error": "无法解析AI返回的JSON格式", "raw_result": result}
+        return key_info
     
     def categorize_content(self, content: str) -> List[str]:
         """
@@ -210,15 +264,7 @@ class AIContentProcessor:
         else:
             result = self._call_qwen_api(prompt, system_prompt)
         
-        try:
-            # 提取JSON数组
-            json_match = re.search(r'\[.*\]', result, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group())
-            else:
-                return ["未分类"]
-        except json.JSONDecodeError:
-            return ["未分类"]
+        return extract_json(result, list) or ["未分类"]
     
     def generate_insights(self, content: str) -> str:
         """
@@ -248,17 +294,72 @@ class AIContentProcessor:
         else:
             return self._call_qwen_api(prompt, system_prompt)
     
-    def process_website_content(self, website_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def analyze_content_structured(self, content: str) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """
+        一次调用同时生成总结、关键信息、分类和洞察，内容只发送一次
+        Args:
+            content: 网页内容
+        Returns:
+            (字段名 -> 结果, 字段名 -> 缺失或解析失败原因)
+        """
+        prompt = f"""
+        请分析以下网页内容，只返回一个符合下面JSON Schema的JSON对象，不要输出其他文字：
+        - summary: 简洁的总结，保留重要信息
+        - key_info: 公司名称、主营业务、联系方式（电话、邮箱、地址）、产品服务、公司简介和其他重要信息
+        - categories: 3-5个最相关的分类标签
+        - insights: 从业务模式、市场定位、竞争优势、发展前景和潜在风险角度进行的洞察分析
+
+        JSON Schema：
+        {json.dumps(ANALYSIS_SCHEMA, ensure_ascii=False)}
+
+        内容：
+        {content[:5000]}
+        """
+        
+        system_prompt = "你是一个专业的内容分析助手，请严格按照给定的JSON Schema返回结果。"
+        
+        if self.config.use_local_model:
+            result = self._call_local_model(prompt)
+        else:
+            result = self._call_qwen_api(prompt, system_prompt, json_mode=True)
+        
+        data = extract_json(result, dict)
+        if data is None:
+            return {}, {name: "无法解析AI返回的JSON格式" for name in _ANALYSIS_FIELDS}
+        
+        results, errors = {}, {}
+        for name, expected in _ANALYSIS_FIELDS.items():
+            value = data.get(name)
+            if isinstance(value, expected):
+                results[name] = value
+            else:
+                errors[name] = "缺失或类型错误"
+        return results, errors
+    
+    def process_website_content(self, website_data: List[Dict[str, Any]], structured: bool = None) -> Dict[str, Any]:
         """
         处理整个网站的内容
         Args:
             website_data: 网站数据列表，每个元素包含title、text等信息
+            structured: 是否用一次结构化输出调用完成全部分析，默认取AIConfig.structured_output
         Returns:
             处理结果
         """
         if not website_data:
             return {"error": "没有可处理的内容"}
         
+        # 质量得分只决定是否调用大模型：所有页面都像登录页、Cookie提示等低质量页面时不调用，
+        # 否则所有页面（包括得分较低的产品列表等页面）都参与合并，不丢弃任何页面的内容
+        from core.ai_summary.quality_gate import get_quality_gate
+        quality_gate = get_quality_gate()
+        scores = [float(score) for score in quality_gate.score_texts([page.get('text') or "" for page in website_data])]
+        if not any(quality_gate.allows(score) for score in scores):
+            return {
+                "error": "页面质量得分均低于阈值，未调用AI处理",
+                "page_count": len(website_data),
+                "quality_scores": [round(score, 3) for score in scores]
+            }
+        
         # 合并所有文本内容
         all_text = ""
         titles = []
@@ -275,27 +376,78 @@ class AIContentProcessor:
         if not all_text:
             return {"error": "没有有效的文本内容"}
         
-        # 执行AI处理
+        if structured is None:
+            structured = self.config.structured_output
+        
         try:
-            summary = self.summarize_content(all_text)
-            key_info = self.extract_key_info(all_text)
-            categories = self.categorize_content(all_text)
-            insights = self.generate_insights(all_text)
+            if structured:
+                # 一次调用返回全部字段
+                results, errors = self.analyze_content_structured(all_text)
+            else:
+                # 四项AI处理互不依赖，并发执行
+                results, errors = self._run_concurrently({
+                    "summary": self.summarize_content,
+                    "key_info": self.extract_key_info,
+                    "categories": self.categorize_content,
+                    "insights": self.generate_insights
+                }, all_text)
+            if not results:
+                return {"error": f"AI处理失败: {errors}"}
             
-            return {
-                "summary": summary,
-                "key_info": key_info,
-                "categories": categories,
-                "insights": insights,
+            result = {name: results[name] if name in results else expected()
+                      for name, expected in _ANALYSIS_FIELDS.items()}
+            result.update({
                 "page_count": len(website_data),
+                "low_quality_page_count": sum(1 for score in scores if not quality_gate.allows(score)),
                 "total_text_length": len(all_text),
                 "titles": titles[:10]  # 只返回前10个标题
-            }
+            })
+            if errors:
+                # 部分调用失败或超时，返回已完成的结果
+                result["errors"] = errors
+            return result
             
         except Exception as e:
             logger.error(f"AI处理失败: {e}")
             return {"error": f"AI处理失败: {str(e)}"}
     
+    def _run_concurrently(self, calls: Dict[str, Callable], *args) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """
+        在共享线程池中并发执行多个大模型调用，按完成顺序收集结果
+        Args:
+            calls: 结果名 -> 调用函数
+            *args: 每个调用的参数
+        Returns:
+            (结果名 -> 结果, 结果名 -> 失败或超时原因)
+        """
+        executor = get_llm_executor()
+        futures = {executor.submit(fn, *args): name for name, fn in calls.items()}
+        results, errors = {}, {}
+        
+        def collect(future):
+            name = futures[future]
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                logger.error(f"AI处理{name}失败: {e}")
+                errors[name] = str(e)
+        
+        try:
+            for future in as_completed(futures, timeout=app_config.AI_CALL_TIMEOUT or None):
+                collect(future)
+        except FutureTimeoutError:
+            for future, name in futures.items():
+                if name in results or name in errors:
+                    continue
+                if future.done():
+                    collect(future)
+                else:
+                    # 尚未开始的调用直接取消，已在进行的调用结果不再等待
+                    future.cancel()
+                    errors[name] = "超时"
+            logger.warning(f"AI处理超时: {[name for name, reason in errors.items() if reason == '超时']}")
+        return results, errors
+    
     def compare_websites(self, website1_data: List[Dict], website2_data: List[Dict]) -> Dict[str, Any]:
         """
         比较两个网站
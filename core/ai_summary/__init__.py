@@ -8,6 +8,11 @@ AI智能总结模块
 from .content_processor import ContentProcessor, ProcessedContent
 from .html_cleaner import HTMLCleaner
 from .content_validator import ContentValidator
+from .document import HTMLDocument
+from .metadata_index import MetadataIndex
+from .text_stats import TextStats
+from .quality_gate import QualityGate
+from .content_extractor import MainContentExtractor
 from .html_content_agent import HTMLContentExtractorAgent, html_content_extractor
 
 __all__ = [
@@ -15,6 +20,11 @@ __all__ = [
     'ProcessedContent',
     'HTMLCleaner',
     'ContentValidator',
+    'HTMLDocument',
+    'MetadataIndex',
+    'TextStats',
+    'QualityGate',
+    'MainContentExtractor',
     'HTMLContentExtractorAgent',
     'html_content_extractor'
 ]
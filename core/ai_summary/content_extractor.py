@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+正文提取器
+参考readability的做法，一次自底向上遍历统计每个元素的文本长度、链接文本长度和标点数，
+按段落给父级和祖父级元素打分，再结合类名/ID权重和链接密度选出正文所在的子树
+"""
+
+import re
+import logging
+from typing import Dict, List, Optional
+
+from bs4 import NavigableString, Tag
+from bs4.element import PreformattedString
+
+logger = logging.getLogger(__name__)
+
+# 不参与统计的标签
+_SKIP_TAGS = {'script', 'style', 'noscript', 'template', 'head', 'iframe', 'svg', 'form'}
+# 行内标签：其文本计入所在块的段落文本
+_INLINE_TAGS = {
+    'a', 'abbr', 'b', 'big', 'br', 'cite', 'code', 'em', 'font', 'i', 'img', 'label', 'mark',
+    'q', 's', 'small', 'span', 'strike', 'strong', 'sub', 'sup', 'time', 'u', 'wbr'
+}
+_PUNCT_RE = re.compile(r'[，。、；：！？,.;:!?]')
+# 类名和ID按空白、-、_拆成单词后整词匹配，避免photo中的hot、canvas中的nav、pagination中的page等误判
+_CLASS_SPLIT_RE = re.compile(r'[\s\-_]+')
+_POSITIVE_RE = re.compile(r'article|body|contents?|entry|main|posts?|text|blog|story|detail|正文', re.I)
+_NEGATIVE_RE = re.compile(
+    r'comments?|meta|foot(?:er)?|sidebar|sponsor(?:ed)?|banner|nav(?:bar|igation)?|menu|share|sharing|'
+    r'related|recommend(?:ed|ation|ations)?|widgets?|rank(?:ing)?|ads?|advert(?:isement)?s?',
+    re.I
+)
+
+
+class _NodeStats:
+    """单个元素子树的统计"""
+    __slots__ = ('text_len', 'link_len', 'punct')
+
+    def __init__(self, text_len: int, link_len: int, punct: int):
+        self.text_len = text_len
+        self.link_len = link_len
+        self.punct = punct
+
+    @property
+    def link_density(self) -> float:
+        return self.link_len / self.text_len if self.text_len else 1.0
+
+
+class MainContentExtractor:
+    """基于文本密度打分的正文提取器"""
+
+    def __init__(self, min_paragraph_length: int = 25, min_text_length: int = 100):
+        """
+        初始化正文提取器
+        Args:
+            min_paragraph_length: 参与打分的段落最少字符数
+            min_text_length: 正文最少字符数，不足时视为未找到正文
+        """
+        self.min_paragraph_length = min_paragraph_length
+        self.min_text_length = min_text_length
+
+    def _collect_stats(self, root: Tag):
+        """
+        自底向上统计每个元素，并把段落得分累加到父级（全额）和祖父级（一半）
+        Returns:
+            (元素统计, 候选元素得分, 候选元素) 三个以id(元素)为键的字典
+        """
+        stats: Dict[int, _NodeStats] = {}
+        scores: Dict[int, float] = {}
+        candidates: Dict[int, Tag] = {}
+
+        stack = [(root, False)]
+        while stack:
+            node, visited = stack.pop()
+            if not visited:
+                stack.append((node, True))
+                stack.extend((child, False) for child in node.contents
+                             if isinstance(child, Tag) and child.name not in _SKIP_TAGS)
+                continue
+
+            text_len = link_len = punct = own_len = own_punct = 0
+            for child in node.contents:
+                if isinstance(child, Tag):
+                    child_stats = stats.get(id(child))
+                    if child_stats is None:
+                        continue
+                    text_len += child_stats.text_len
+                    link_len += child_stats.link_len
+                    punct += child_stats.punct
+                    if child.name in _INLINE_TAGS:
+                        own_len += child_stats.text_len
+                        own_punct += child_stats.punct
+                elif isinstance(child, NavigableString) and not isinstance(child, PreformattedString):
+                    text = child.strip()
+                    if text:
+                        count = len(_PUNCT_RE.findall(text))
+                        text_len += len(text)
+                        own_len += len(text)
+                        punct += count
+                        own_punct += count
+
+            if node.name == 'a':
+                link_len = text_len
+            stats[id(node)] = _NodeStats(text_len, link_len, punct)
+
+            # 块内直接包含的文本视为一个段落
+            if own_len >= self.min_paragraph_length:
+                paragraph_score = 1 + own_punct + min(own_len // 100, 3)
+                parent = node.parent
+                for ancestor, weight in ((parent, 1.0), (parent.parent if parent else None, 0.5)):
+                    if ancestor is None or not isinstance(ancestor, Tag):
+                        continue
+                    key = id(ancestor)
+                    if key not in candidates:
+                        candidates[key] = ancestor
+                        scores[key] = self._class_weight(ancestor)
+                    scores[key] += paragraph_score * weight
+
+        return stats, scores, candidates
+
+    @staticmethod
+    def _class_weight(element: Tag) -> float:
+        """根据类名和ID给候选元素加减分"""
+        weight = 0.0
+        if element.name in ('article', 'main'):
+            weight += 10
+        for value in (element.get('class'), element.get('id')):
+            if not value:
+                continue
+            if not isinstance(value, str):
+                value = ' '.join(value)
+            words = [word for word in _CLASS_SPLIT_RE.split(value) if word]
+            if any(_NEGATIVE_RE.fullmatch(word) for word in words):
+                weight -= 25
+            if any(_POSITIVE_RE.fullmatch(word) for word in words):
+                weight += 25
+        return weight
+
+    def find_main_content(self, root: Tag) -> List[Tag]:
+        """
+        找出正文所在的元素
+        Args:
+            root: 文档树或其子树
+        Returns:
+            正文元素列表（得分最高的元素，以及与其并列的高分兄弟元素），未找到时为空列表
+        """
+        stats, scores, candidates = self._collect_stats(root)
+        if not candidates:
+            return []
+
+        final = {key: score * (1 - stats[key].link_density) for key, score in scores.items() if key in stats}
+        # 按得分从高到低取第一个足够长的候选，得分高但很短的导语等元素不会导致提取失败
+        best_key = next(
+            (key for key in sorted(final, key=final.get, reverse=True)
+             if stats[key].text_len >= self.min_text_length),
+            None
+        )
+        if best_key is None:
+            return []
+        best = candidates[best_key]
+
+        # 与正文并列、得分接近或本身是长段落的兄弟元素一起保留
+        threshold = max(10.0, final[best_key] * 0.2)
+        parent = best.parent
+        if parent is None:
+            return [best]
+        selected = []
+        for sibling in parent.contents:
+            if not isinstance(sibling, Tag):
+                continue
+            key = id(sibling)
+            if sibling is best or final.get(key, 0) >= threshold:
+                selected.append(sibling)
+            elif sibling.name == 'p' and key in stats:
+                sibling_stats = stats[key]
+                if sibling_stats.text_len > 80 and sibling_stats.link_density < 0.25:
+                    selected.append(sibling)
+        return selected
+
+    def extract_text(self, root: Tag) -> Optional[str]:
+        """
+        提取正文文本
+        Args:
+            root: 文档树或其子树
+        Returns:
+            正文文本，未找到足够长的正文时返回None
+        """
+        try:
+            elements = self.find_main_content(root)
+        except Exception as e:
+            logger.error(f"正文打分提取失败: {e}")
+            return None
+        if not elements:
+            return None
+        text = '\n'.join(element.get_text(separator='\n', strip=True) for element in elements)
+        return text if len(text) >= self.min_text_length else None
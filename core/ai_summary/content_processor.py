@@ -6,21 +6,35 @@
 """
 
 import os
-import json
 import logging
 import re
-from typing import Dict, Any, Optional, List
-from dataclasses import dataclass
-from bs4 import BeautifulSoup
+from typing import Dict, Any, Optional, List, Union
+from dataclasses import dataclass, replace
+from bs4 import Tag
+
+from core.parser_backend import make_soup
+from core.llm_json import extract_json
 
 # 导入其他模块
 try:
     from .html_cleaner import HTMLCleaner
     from .content_validator import ContentValidator
+    from .document import HTMLDocument
+    from .content_extractor import MainContentExtractor
+    from .metadata_index import MetadataIndex
+    from .date_parser import format_datetime
+    from .text_stats import TextStats
+    from .quality_gate import get_quality_gate
 except ImportError:
     # 如果相对导入失败，使用绝对导入
     from core.ai_summary.html_cleaner import HTMLCleaner
     from core.ai_summary.content_validator import ContentValidator
+    from core.ai_summary.document import HTMLDocument
+    from core.ai_summary.content_extractor import MainContentExtractor
+    from core.ai_summary.metadata_index import MetadataIndex
+    from core.ai_summary.date_parser import format_datetime
+    from core.ai_summary.text_stats import TextStats
+    from core.ai_summary.quality_gate import get_quality_gate
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
@@ -38,11 +52,18 @@ class ProcessedContent:
     is_valid: bool = False
     content_type: str = "unknown"
     word_count: int = 0
+    quality_score: float = 0.0  # 调用大模型前的页面质量得分
     
     def __post_init__(self):
         if self.tags is None:
             self.tags = []
 
+def _as_soup(source: Union[str, Tag]) -> Tag:
+    """已解析的文档树直接返回，HTML文本则解析"""
+    if isinstance(source, Tag):
+        return source
+    return make_soup(source)
+
 class ContentProcessor:
     """内容处理器"""
     
@@ -55,6 +76,7 @@ class ContentProcessor:
         self.use_ai = use_ai
         self.html_cleaner = HTMLCleaner()
         self.content_validator = ContentValidator()
+        self.main_content_extractor = MainContentExtractor()
         
         if use_ai:
             self._init_ai_model()
@@ -138,36 +160,85 @@ class ContentProcessor:
         Returns:
             处理后的内容
         """
-        # 清理HTML内容
-        cleaned_content = self.html_cleaner.clean_html(html_content)
-        
-        # 验证内容是否有效
-        if not self.content_validator.is_valid_content(cleaned_content):
-            return ProcessedContent(is_valid=False)
+        return self.process_document(HTMLDocument(html_content, url, cleaner=self.html_cleaner))
+    
+    def process_document(self, doc: HTMLDocument, use_ai: bool = True) -> ProcessedContent:
+        """
+        处理文档上下文，整个流程共享一次解析得到的文档树，同一文档重复处理时直接返回结果
+        Args:
+            doc: HTML文档上下文
+            use_ai: 是否调用大模型生成摘要和标签，为False时只做解析和规则提取
+        Returns:
+            处理后的内容
+        """
+        result = doc.memo('processed_content', lambda: self._process_document(doc))
+        if use_ai:
+            result = doc.memo('processed_content_ai', lambda: self.enrich_with_ai(result))
+        return result
+    
+    def enrich_with_ai(self, result: ProcessedContent) -> ProcessedContent:
+        """
+        用大模型重新生成规则提取结果中的摘要和标签
+        只依赖正文和标题，可以在解析进程之外（如线程池中）执行
+        Args:
+            result: 规则提取的结果（process_document(doc, use_ai=False)）
+        Returns:
+            新的处理结果；内容无效、AI不可用或质量得分低于阈值时原样返回
+        """
+        if not (result.is_valid and self.use_ai and self.ai_available):
+            return result
+        if not get_quality_gate().allows(result.quality_score):
+            logger.info(f"页面质量得分{result.quality_score:.2f}低于阈值，使用规则生成摘要和标签")
+            return result
+        return replace(
+            result,
+            summary=self._generate_summary(result.content),
+            tags=self._generate_tags(result.content, result.title)
+        )
+    
+    def _process_document(self, doc: HTMLDocument) -> ProcessedContent:
+        # 元数据依赖原始结构，在清理（就地修改文档树）之前提取
+        soup = doc.soup
+        metadata = doc.metadata
+        shape = doc.dom_shape
         
         # 提取标题
-        title = self._extract_title(html_content)
+        title = self._extract_title(soup, metadata)
         
         # 提取作者信息
-        author = self._extract_author(html_content)
+        author = self._extract_author(soup, metadata)
         
         # 提取发布时间
-        publish_time = self._extract_publish_time(html_content)
+        publish_time = self._extract_publish_time(soup, metadata)
+        
+        # 清理HTML内容
+        cleaned_content = doc.cleaned_html
+        
+        # 验证内容是否有效
+        if not self.content_validator.is_valid_content(cleaned_content, doc.text_stats):
+            return ProcessedContent(is_valid=False)
         
         # 提取正文内容
-        content = self._extract_main_content(cleaned_content)
+        content = self._extract_main_content(doc.cleaned_soup)
+        content_stats = doc.memo('content_stats', lambda: TextStats.from_text(content))
         
-        # 生成摘要
-        summary = self._generate_summary(content)
+        # 质量得分，低于阈值的页面在enrich_with_ai中不调用大模型
+        quality_gate = get_quality_gate()
+        quality_score = quality_gate.score(
+            quality_gate.features(doc.text_stats, content, content_stats, shape)
+        )
+        
+        # 生成摘要（规则），大模型生成的摘要和标签由enrich_with_ai补充
+        summary = self._generate_summary(content, allow_ai=False)
         
-        # 生成标签
-        tags = self._generate_tags(content, title)
+        # 生成标签（规则）
+        tags = self._generate_tags(content, title, allow_ai=False)
         
         # 确定内容类型
         content_type = self._determine_content_type(content, title)
         
         # 计算字数
-        word_count = len(content.strip())
+        word_count = content_stats.length
         
         return ProcessedContent(
             title=title,
@@ -178,17 +249,23 @@ class ContentProcessor:
             tags=tags,
             is_valid=True,
             content_type=content_type,
-            word_count=word_count
+            word_count=word_count,
+            quality_score=quality_score
         )
     
-    def _extract_title(self, html_content: str) -> str:
-        """提取页面标题"""
+    def _extract_title(self, html_content: Union[str, Tag], metadata: MetadataIndex = None) -> str:
+        """提取页面标题，可直接传入已解析的文档树和元数据索引"""
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            soup = _as_soup(html_content)
+            metadata = metadata or MetadataIndex(soup)
+            
+            # 优先使用og:title、JSON-LD、<title>等结构化元数据
+            for title in metadata.candidates('title'):
+                if len(title) > 10 and len(title) < 200:  # 合理的标题长度
+                    return title
             
             # 尝试多种标题选择器
             title_selectors = [
-                'title',
                 'h1',
                 '.title',
                 '.headline',
@@ -208,16 +285,19 @@ class ContentProcessor:
             logger.error(f"提取标题失败: {e}")
             return ""
     
-    def _extract_author(self, html_content: str) -> str:
-        """提取作者信息"""
+    def _extract_author(self, html_content: Union[str, Tag], metadata: MetadataIndex = None) -> str:
+        """提取作者信息，可直接传入已解析的文档树和元数据索引"""
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            soup = _as_soup(html_content)
+            metadata = metadata or MetadataIndex(soup)
+            
+            # 优先使用meta、JSON-LD、微数据中的作者
+            for author in metadata.candidates('author'):
+                if len(author) < 100:
+                    return re.sub(r'^(作者|作者：|by|BY|By)\s*', '', author)
             
             # 尝试多种作者选择器
             author_selectors = [
-                'meta[name="author"]',
-                'meta[property="article:author"]',
-                'meta[property="og:author"]',
                 '.author',
                 '.byline',
                 '.writer',
@@ -232,11 +312,7 @@ class ContentProcessor:
             for selector in author_selectors:
                 element = soup.select_one(selector)
                 if element:
-                    # 如果是meta标签，获取content属性
-                    if element.name == 'meta':
-                        author = element.get('content', '').strip()
-                    else:
-                        author = element.get_text().strip()
+                    author = element.get_text().strip()
                     
                     if author and len(author) < 100:  # 合理的作者名长度
                         # 清理作者名（移除"作者："、"by"等前缀）
@@ -248,17 +324,20 @@ class ContentProcessor:
             logger.error(f"提取作者失败: {e}")
             return ""
     
-    def _extract_publish_time(self, html_content: str) -> str:
-        """提取发布时间"""
+    def _extract_publish_time(self, html_content: Union[str, Tag], metadata: MetadataIndex = None) -> str:
+        """提取发布时间，可直接传入已解析的文档树和元数据索引"""
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            soup = _as_soup(html_content)
+            metadata = metadata or MetadataIndex(soup)
+            
+            # 优先使用meta、JSON-LD、微数据和<time datetime>中的时间
+            for time_str in metadata.candidates('published_time'):
+                formatted_time = self._format_time(time_str)
+                if formatted_time:
+                    return formatted_time
             
             # 尝试多种时间选择器
             time_selectors = [
-                'meta[name="publish_date"]',
-                'meta[property="article:published_time"]',
-                'meta[property="og:published_time"]',
-                'time[datetime]',
                 '.publish-time',
                 '.publish-date',
                 '.post-time',
@@ -271,14 +350,7 @@ class ContentProcessor:
             for selector in time_selectors:
                 element = soup.select_one(selector)
                 if element:
-                    # 如果是meta标签，获取content属性
-                    if element.name == 'meta':
-                        time_str = element.get('content', '').strip()
-                    # 如果是time标签，获取datetime属性
-                    elif element.name == 'time':
-                        time_str = element.get('datetime', '').strip()
-                    else:
-                        time_str = element.get_text().strip()
+                    time_str = element.get_text().strip()
                     
                     if time_str:
                         # 尝试解析和格式化时间
@@ -292,102 +364,43 @@ class ContentProcessor:
             return ""
     
     def _format_time(self, time_str: str) -> str:
-        """格式化时间字符串"""
+        """格式化时间字符串，无法解析时返回空字符串"""
         try:
-            import re
-            from datetime import datetime
-            
-            # 移除多余的空格
-            time_str = time_str.strip()
-            
-            # 尝试解析ISO格式时间
-            iso_patterns = [
-                r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}',
-                r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}',
-                r'\d{4}-\d{2}-\d{2}'
-            ]
-            
-            for pattern in iso_patterns:
-                match = re.search(pattern, time_str)
-                if match:
-                    time_part = match.group()
-                    try:
-                        if 'T' in time_part:
-                            dt = datetime.fromisoformat(time_part.replace('T', ' '))
-                        else:
-                            dt = datetime.fromisoformat(time_part)
-                        return dt.strftime('%Y-%m-%d %H:%M:%S')
-                    except:
-                        continue
-            
-            # 尝试解析中文时间格式
-            chinese_patterns = [
-                r'(\d{4})年(\d{1,2})月(\d{1,2})日',
-                r'(\d{4})-(\d{1,2})-(\d{1,2})',
-                r'(\d{4})/(\d{1,2})/(\d{1,2})'
-            ]
-            
-            for pattern in chinese_patterns:
-                match = re.search(pattern, time_str)
-                if match:
-                    year, month, day = match.groups()
-                    try:
-                        dt = datetime(int(year), int(month), int(day))
-                        return dt.strftime('%Y-%m-%d')
-                    except:
-                        continue
-            
-            # 如果无法解析，返回原始字符串
-            return time_str
-            
+            return format_datetime(time_str)
         except Exception as e:
             logger.error(f"格式化时间失败: {e}")
-            return time_str
+            return ""
     
-    def _extract_main_content(self, cleaned_content: str) -> str:
-        """提取主要内容"""
+    def _extract_main_content(self, cleaned_content: Union[str, Tag]) -> str:
+        """提取主要内容，传入文档树时会就地移除导航等元素"""
         try:
-            soup = BeautifulSoup(cleaned_content, 'html.parser')
+            soup = _as_soup(cleaned_content)
             
             # 移除不需要的元素
             for element in soup(['script', 'style', 'nav', 'footer', 'header', 'aside']):
                 element.decompose()
             
-            # 尝试找到主要内容区域
-            main_selectors = [
-                'main',
-                'article',
-                '.content',
-                '.main-content',
-                '.post-content',
-                '.entry-content',
-                '[class*="content"]',
-                '[class*="article"]'
-            ]
-            
-            for selector in main_selectors:
-                element = soup.select_one(selector)
-                if element:
-                    text = element.get_text(separator='\n', strip=True)
-                    if len(text) > 100:  # 确保有足够的内容
-                        return text
+            # 按文本密度、链接密度和标点打分找出正文子树
+            text = self.main_content_extractor.extract_text(soup)
+            if text:
+                return text
             
             # 如果没有找到主要内容区域，使用整个body
             body = soup.find('body')
             if body:
                 return body.get_text(separator='\n', strip=True)
             
-            return cleaned_content
+            return str(cleaned_content)
         except Exception as e:
             logger.error(f"提取主要内容失败: {e}")
-            return cleaned_content
+            return str(cleaned_content)
     
-    def _generate_summary(self, content: str) -> str:
-        """生成摘要"""
+    def _generate_summary(self, content: str, allow_ai: bool = True) -> str:
+        """生成摘要，allow_ai为False时不调用大模型"""
         if not content or len(content) < 50:
             return ""
         
-        if self.use_ai and self.ai_available:
+        if allow_ai and self.use_ai and self.ai_available:
             prompt = f"""
             请对以下内容生成简洁的摘要，控制在100字以内：
 
@@ -414,12 +427,12 @@ class ContentProcessor:
         
         return summary
     
-    def _generate_tags(self, content: str, title: str) -> List[str]:
-        """生成标签"""
+    def _generate_tags(self, content: str, title: str, allow_ai: bool = True) -> List[str]:
+        """生成标签，allow_ai为False时不调用大模型"""
         if not content:
             return []
         
-        if self.use_ai and self.ai_available:
+        if allow_ai and self.use_ai and self.ai_available:
             prompt = f"""
             请为以下内容生成3-5个相关标签：
 
@@ -433,13 +446,9 @@ class ContentProcessor:
             
             result = self._call_qwen_api(prompt, system_prompt)
             
-            try:
-                # 提取JSON数组
-                json_match = re.search(r'\[.*\]', result, re.DOTALL)
-                if json_match:
-                    return json.loads(json_match.group())
-            except:
-                pass
+            tags = extract_json(result, list)
+            if tags:
+                return tags
         
         # 如果AI不可用，使用规则生成标签
         return self._rule_based_tags(content, title)
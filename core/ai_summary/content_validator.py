@@ -5,10 +5,16 @@
 用于判断HTML内容是否包含有效的文章内容
 """
 
-import re
 import logging
 from typing import Dict, Any
 
+try:
+    from .keyword_matcher import KeywordMatcher
+    from .text_stats import TextStats
+except ImportError:
+    from core.ai_summary.keyword_matcher import KeywordMatcher
+    from core.ai_summary.text_stats import TextStats
+
 logger = logging.getLogger(__name__)
 
 class ContentValidator:
@@ -34,12 +40,60 @@ class ContentValidator:
             '首页', '关于我们', '联系我们', '服务条款',
             '隐私政策', '网站地图', '返回顶部'
         ]
+        
+        # 文章特征关键词
+        self.article_keywords = [
+            '文章', '报道', '新闻', '资讯', '博客', '评论',
+            '分析', '研究', '调查', '报告', '指南', '教程'
+        ]
+        
+        # 产品特征关键词
+        self.product_keywords = [
+            '产品', '商品', '服务', '解决方案', '功能', '特性',
+            '价格', '购买', '订购', '咨询', '试用', '演示'
+        ]
+        
+        self._matcher_key = None
+        self._matcher = None
+        self._last_hits = (None, None)
+    
+    def _keyword_matcher(self) -> KeywordMatcher:
+        """返回所有类别共用的关键词匹配器，关键词列表被修改后自动重建"""
+        categories = {
+            'invalid': self.invalid_keywords,
+            'ad': self.ad_keywords,
+            'nav': self.nav_keywords,
+            'article': self.article_keywords,
+            'product': self.product_keywords
+        }
+        key = tuple(tuple(keywords) for keywords in categories.values())
+        if key != self._matcher_key:
+            self._matcher = KeywordMatcher(categories)
+            self._matcher_key = key
+        return self._matcher
+    
+    def keyword_counts(self, content: str) -> Dict[str, int]:
+        """
+        扫描一遍内容，统计各类关键词命中的个数，同一内容连续检查时复用结果
+        Args:
+            content: 内容文本
+        Returns:
+            invalid/ad/nav/article/product -> 命中的不同关键词个数
+        """
+        matcher = self._keyword_matcher()
+        last_content, last_counts = self._last_hits
+        if last_content is content and last_counts is not None and last_counts[0] is matcher:
+            return last_counts[1]
+        counts = matcher.counts(content)
+        self._last_hits = (content, (matcher, counts))
+        return counts
     
-    def is_valid_content(self, content: str) -> bool:
+    def is_valid_content(self, content: str, stats: TextStats = None) -> bool:
         """
         判断内容是否有效
         Args:
             content: 内容文本
+            stats: 已计算的文本统计（如文档上下文中缓存的），默认由content计算
         Returns:
             是否有效
         """
@@ -63,65 +117,39 @@ class ContentValidator:
             return False
         
         # 检查是否有足够的文本内容
-        if not self._has_sufficient_text_content(content):
+        if not self._has_sufficient_text_content(content, stats):
             return False
         
         return True
     
     def _contains_invalid_keywords(self, content: str) -> bool:
         """检查是否包含无效关键词"""
-        content_lower = content.lower()
-        for keyword in self.invalid_keywords:
-            if keyword.lower() in content_lower:
-                return True
-        return False
+        return self.keyword_counts(content)['invalid'] > 0
     
     def _is_mainly_ad_content(self, content: str) -> bool:
         """检查是否主要是广告内容"""
-        content_lower = content.lower()
-        ad_count = 0
-        
-        for keyword in self.ad_keywords:
-            if keyword.lower() in content_lower:
-                ad_count += 1
-        
         # 如果广告关键词超过3个，认为是广告内容
-        return ad_count >= 3
+        return self.keyword_counts(content)['ad'] >= 3
     
     def _is_mainly_nav_content(self, content: str) -> bool:
         """检查是否主要是导航内容"""
-        content_lower = content.lower()
-        nav_count = 0
-        
-        for keyword in self.nav_keywords:
-            if keyword.lower() in content_lower:
-                nav_count += 1
-        
         # 如果导航关键词超过5个，认为是导航内容
-        return nav_count >= 5
+        return self.keyword_counts(content)['nav'] >= 5
     
-    def _has_sufficient_text_content(self, content: str) -> bool:
+    def _has_sufficient_text_content(self, content: str, stats: TextStats = None) -> bool:
         """检查是否有足够的文本内容"""
-        # 移除HTML标签
-        text_content = re.sub(r'<[^>]+>', '', content)
-        
-        # 计算中文字符数
-        chinese_chars = len(re.findall(r'[\u4e00-\u9fff]', text_content))
-        
-        # 计算英文字符数
-        english_chars = len(re.findall(r'[a-zA-Z]', text_content))
-        
-        # 总有效字符数
-        total_chars = chinese_chars + english_chars
+        # 去掉HTML标签后统计中文字符和英文字母
+        stats = stats or TextStats.from_html(content)
         
         # 如果有效字符数少于50，认为内容不足
-        return total_chars >= 50
+        return stats.meaningful_chars >= 50
     
-    def get_content_quality_score(self, content: str) -> Dict[str, Any]:
+    def get_content_quality_score(self, content: str, stats: TextStats = None) -> Dict[str, Any]:
         """
         获取内容质量评分
         Args:
             content: 内容文本
+            stats: 已计算的文本统计，默认由content计算
         Returns:
             质量评分信息
         """
@@ -134,6 +162,7 @@ class ContentValidator:
         
         score = 100
         reasons = []
+        stats = stats or TextStats.from_html(content)
         
         # 检查内容长度
         if len(content.strip()) < 100:
@@ -156,7 +185,7 @@ class ContentValidator:
             reasons.append('主要是导航内容')
         
         # 检查文本内容
-        if not self._has_sufficient_text_content(content):
+        if not self._has_sufficient_text_content(content, stats):
             score -= 25
             reasons.append('文本内容不足')
         
@@ -168,8 +197,8 @@ class ContentValidator:
             'is_valid': score >= 50,
             'reasons': reasons,
             'content_length': len(content.strip()),
-            'chinese_chars': len(re.findall(r'[\u4e00-\u9fff]', content)),
-            'english_chars': len(re.findall(r'[a-zA-Z]', content))
+            'chinese_chars': stats.cjk_chars,
+            'english_chars': stats.latin_chars
         }
     
     def is_article_content(self, content: str) -> bool:
@@ -183,21 +212,8 @@ class ContentValidator:
         if not self.is_valid_content(content):
             return False
         
-        # 文章特征关键词
-        article_keywords = [
-            '文章', '报道', '新闻', '资讯', '博客', '评论',
-            '分析', '研究', '调查', '报告', '指南', '教程'
-        ]
-        
-        content_lower = content.lower()
-        article_count = 0
-        
-        for keyword in article_keywords:
-            if keyword in content_lower:
-                article_count += 1
-        
         # 如果包含文章关键词，更可能是文章内容
-        return article_count >= 1
+        return self.keyword_counts(content)['article'] >= 1
     
     def is_product_content(self, content: str) -> bool:
         """
@@ -210,18 +226,5 @@ class ContentValidator:
         if not self.is_valid_content(content):
             return False
         
-        # 产品特征关键词
-        product_keywords = [
-            '产品', '商品', '服务', '解决方案', '功能', '特性',
-            '价格', '购买', '订购', '咨询', '试用', '演示'
-        ]
-        
-        content_lower = content.lower()
-        product_count = 0
-        
-        for keyword in product_keywords:
-            if keyword in content_lower:
-                product_count += 1
-        
         # 如果包含产品关键词，更可能是产品内容
-        return product_count >= 2 
\ No newline at end of file
+        return self.keyword_counts(content)['product'] >= 2 
\ No newline at end of file
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日期解析
+预编译的模式覆盖ISO、中文（年月日）、斜杠/点分隔、时间戳、RFC 2822和相对时间（3小时前、昨天），
+带时区的时间统一换算到DATE_TIMEZONE；绝对时间的解析结果按字符串做LRU缓存。
+相对时间只在整段文本就是一个时间（可带"发布于"等前缀）时识别，正文中出现的"今天""3天前"不会被当作时间
+"""
+
+import os
+import re
+import sys
+import logging
+from functools import lru_cache
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# 超过该长度的文本（如整段正文）不进入缓存
+_CACHE_MAX_LENGTH = 128
+# 超过该长度的文本不按相对时间解析
+_RELATIVE_MAX_LENGTH = 32
+
+# 年月日 + 可选的时分秒和时区，分隔符可以是 - / . 或 年月日
+_DATE_RE = re.compile(
+    r'(?P<year>\d{4})\s*(?:[-/.]|年)\s*(?P<month>\d{1,2})\s*(?:[-/.]|月)\s*(?P<day>\d{1,2})(?!\d)\s*日?'
+    r'(?:(?:T|\s+|日)?\s*(?P<hour>\d{1,2})\s*[:时点]\s*(?P<minute>\d{1,2})'
+    r'(?:\s*[:分]\s*(?P<second>\d{1,2}))?(?:\.\d+)?\s*秒?'
+    r'\s*(?P<tz>Z|[+-]\d{2}:?\d{2}(?!\d))?)?'
+)
+# 月日年（美式斜杠）
+_MDY_RE = re.compile(r'(?<!\d)(?P<month>\d{1,2})/(?P<day>\d{1,2})/(?P<year>\d{4})(?!\d)')
+# Unix时间戳（秒或毫秒）
+_TIMESTAMP_RE = re.compile(r'^(?P<seconds>\d{10})(?P<millis>\d{3})?$')
+# 相对时间，必须匹配整段文本（去掉前缀后）
+_RELATIVE_PREFIX_RE = re.compile(
+    r'^(?:(?:发布|更新)(?:时间|于)?|时间|posted|published|updated)?\s*(?:on|at)?\s*[：:]?\s*',
+    re.I
+)
+_RELATIVE_RE = re.compile(
+    r'(?P<count>\d+)\s*(?P<unit>秒|分钟|小时|天|周|个月|seconds?|minutes?|mins?|hours?|days?|weeks?)\s*(?:前|ago)',
+    re.I
+)
+_DAY_WORD_RE = re.compile(
+    r'(?P<word>刚刚|今天|昨天|前天|just now|today|yesterday)'
+    r'(?:\s*(?P<hour>\d{1,2})\s*[:时点]\s*(?P<minute>\d{1,2})\s*分?)?',
+    re.I
+)
+
+_RELATIVE_UNITS = {
+    '秒': 1, 'second': 1, 'seconds': 1,
+    '分钟': 60, 'minute': 60, 'minutes': 60, 'min': 60, 'mins': 60,
+    '小时': 3600, 'hour': 3600, 'hours': 3600,
+    '天': 86400, 'day': 86400, 'days': 86400,
+    '周': 7 * 86400, 'week': 7 * 86400, 'weeks': 7 * 86400,
+    '个月': 30 * 86400,
+}
+_DAY_OFFSETS = {'刚刚': 0, 'just now': 0, '今天': 0, 'today': 0, '昨天': 1, 'yesterday': 1, '前天': 2}
+
+
+def _parse_offset(value: str) -> timezone:
+    """解析 Z、+08:00、+0800 形式的UTC偏移"""
+    if not value or value.upper() == 'Z':
+        return timezone.utc
+    sign = -1 if value[0] == '-' else 1
+    digits = value[1:].replace(':', '')
+    return timezone(sign * timedelta(hours=int(digits[:2]), minutes=int(digits[2:4] or 0)))
+
+
+@lru_cache(maxsize=1)
+def _target_timezone(setting: str) -> Optional[timezone]:
+    try:
+        return _parse_offset(setting.strip())
+    except (ValueError, IndexError):
+        logger.warning(f"无效的DATE_TIMEZONE配置 {setting}，不做时区换算")
+        return None
+
+
+def _normalize(dt: datetime) -> datetime:
+    """带时区的时间换算到DATE_TIMEZONE并去掉时区信息"""
+    if dt.tzinfo is None:
+        return dt
+    target = _target_timezone(config.DATE_TIMEZONE or '')
+    if target is not None:
+        dt = dt.astimezone(target)
+    return dt.replace(tzinfo=None)
+
+
+def _parse_absolute(text: str) -> Optional[Tuple[datetime, bool]]:
+    """解析绝对时间，返回 (时间, 是否包含时分)"""
+    match = _DATE_RE.search(text)
+    if match:
+        try:
+            has_time = match.group('hour') is not None
+            dt = datetime(
+                int(match.group('year')), int(match.group('month')), int(match.group('day')),
+                int(match.group('hour') or 0), int(match.group('minute') or 0), int(match.group('second') or 0)
+            )
+            if match.group('tz'):
+                dt = _normalize(dt.replace(tzinfo=_parse_offset(match.group('tz'))))
+            return dt, has_time
+        except ValueError:
+            pass
+
+    match = _MDY_RE.search(text)
+    if match:
+        try:
+            return datetime(int(match.group('year')), int(match.group('month')), int(match.group('day'))), False
+        except ValueError:
+            pass
+
+    match = _TIMESTAMP_RE.match(text)
+    if match:
+        try:
+            dt = datetime.fromtimestamp(int(match.group('seconds')), tz=timezone.utc)
+            return _normalize(dt), True
+        except (OverflowError, OSError, ValueError):
+            pass
+
+    # RFC 2822，如 Tue, 05 Mar 2024 10:20:30 GMT
+    try:
+        return _normalize(parsedate_to_datetime(text)), True
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+@lru_cache(maxsize=4096)
+def _parse_absolute_cached(text: str) -> Optional[Tuple[datetime, bool]]:
+    return _parse_absolute(text)
+
+
+def _parse_relative(text: str, now: datetime) -> Optional[Tuple[datetime, bool]]:
+    """解析相对时间，只接受整段文本就是一个相对时间的短文本，结果依赖当前时间，不缓存"""
+    if len(text) > _RELATIVE_MAX_LENGTH:
+        return None
+    text = _RELATIVE_PREFIX_RE.sub('', text, count=1).rstrip('。.')
+    match = _RELATIVE_RE.fullmatch(text)
+    if match:
+        unit = match.group('unit').lower()
+        return now - timedelta(seconds=int(match.group('count')) * _RELATIVE_UNITS[unit]), True
+
+    match = _DAY_WORD_RE.fullmatch(text)
+    if match:
+        day = now - timedelta(days=_DAY_OFFSETS.get(match.group('word').lower(), 0))
+        if match.group('hour') is not None:
+            try:
+                return day.replace(hour=int(match.group('hour')), minute=int(match.group('minute')),
+                                   second=0, microsecond=0), True
+            except ValueError:
+                return None
+        if match.group('word').lower() in ('刚刚', 'just now'):
+            return now, True
+        return day.replace(hour=0, minute=0, second=0, microsecond=0), False
+    return None
+
+
+def parse_datetime_with_precision(text: str, now: datetime = None) -> Optional[Tuple[datetime, bool]]:
+    """
+    解析时间文本
+    Args:
+        text: 时间文本，绝对时间也可以包含在一段文字中，相对时间必须是整段文本
+        now: 相对时间的基准，默认当前时间
+    Returns:
+        (时间, 是否包含时分)，无法解析时返回None
+    """
+    if not text:
+        return None
+    text = text.strip()
+    if not text:
+        return None
+    result = _parse_absolute_cached(text) if len(text) <= _CACHE_MAX_LENGTH else _parse_absolute(text)
+    if result is None:
+        result = _parse_relative(text, now or datetime.now())
+    return result
+
+
+def parse_datetime(text: str, now: datetime = None) -> Optional[datetime]:
+    """
+    解析时间文本
+    Args:
+        text: 时间文本
+        now: 相对时间的基准，默认当前时间
+    Returns:
+        datetime，无法解析时返回None
+    """
+    result = parse_datetime_with_precision(text, now)
+    return result[0] if result else None
+
+
+def format_datetime(text: str, now: datetime = None) -> str:
+    """
+    把时间文本格式化为 %Y-%m-%d %H:%M:%S，只有日期时时分秒为 00:00:00
+    Args:
+        text: 时间文本
+        now: 相对时间的基准，默认当前时间
+    Returns:
+        格式化后的时间，无法解析时返回空字符串
+    """
+    result = parse_datetime_with_precision(text, now)
+    if result is None:
+        return ""
+    return result[0].strftime('%Y-%m-%d %H:%M:%S')
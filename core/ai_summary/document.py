@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTML文档上下文
+一次处理中只解析一次HTML，标题、作者、时间、正文和媒体信息共享同一棵文档树
+"""
+
+import copy
+import logging
+from typing import Any, Callable, Dict, Optional
+
+from bs4 import BeautifulSoup
+
+from core.parser_backend import make_soup
+from core.media_extractor import extract_media
+
+try:
+    from .html_cleaner import HTMLCleaner
+    from .metadata_index import MetadataIndex
+    from .text_stats import TextStats
+    from .quality_gate import dom_shape
+except ImportError:
+    from core.ai_summary.html_cleaner import HTMLCleaner
+    from core.ai_summary.metadata_index import MetadataIndex
+    from core.ai_summary.text_stats import TextStats
+    from core.ai_summary.quality_gate import dom_shape
+
+logger = logging.getLogger(__name__)
+
+
+class HTMLDocument:
+    """HTML文档上下文"""
+
+    def __init__(self, html: str, url: str = "", keep_pristine: bool = False, cleaner: HTMLCleaner = None):
+        """
+        初始化文档上下文
+        Args:
+            html: HTML内容
+            url: 页面URL
+            keep_pristine: 清理时是否保留原始文档树。为False时在原树上清理，
+                需要原始结构的数据（元数据、媒体）应在访问cleaned_soup之前读取
+            cleaner: HTML清理器
+        """
+        self.html = html or ""
+        self.url = url
+        self.keep_pristine = keep_pristine
+        self.cleaner = cleaner or HTMLCleaner()
+        self.parse_count = 0
+        self._soup: Optional[BeautifulSoup] = None
+        self._cleaned_soup: Optional[BeautifulSoup] = None
+        self._cleaned_html: Optional[str] = None
+        self._memo: Dict[str, Any] = {}
+
+    def _parse(self) -> BeautifulSoup:
+        self.parse_count += 1
+        return make_soup(self.html)
+
+    @property
+    def soup(self) -> BeautifulSoup:
+        """原始文档树，首次访问时解析"""
+        if self._soup is None:
+            # 原树已被就地清理时只能重新解析
+            if self._cleaned_soup is not None:
+                logger.debug("原始文档树已被清理，重新解析")
+            self._soup = self._parse()
+        return self._soup
+
+    @property
+    def cleaned_soup(self) -> BeautifulSoup:
+        """清理后的文档树，只清理一次"""
+        if self._cleaned_soup is None:
+            if self.keep_pristine:
+                tree = copy.copy(self.soup)
+            else:
+                tree = self._soup if self._soup is not None else self._parse()
+                self._soup = None
+            try:
+                self.cleaner.clean_soup(tree)
+            except Exception as e:
+                logger.error(f"HTML清理失败: {e}")
+            self._cleaned_soup = tree
+        return self._cleaned_soup
+
+    @property
+    def metadata(self) -> MetadataIndex:
+        """结构化元数据索引，依赖原始结构，应在访问cleaned_soup之前读取"""
+        return self.memo('metadata', lambda: MetadataIndex(self.soup))
+
+    @property
+    def media(self) -> tuple:
+        """(images, videos) 媒体信息，依赖原始结构，应在访问cleaned_soup之前读取"""
+        return self.memo('media_info', lambda: extract_media(self.soup, self.url))
+
+    @property
+    def dom_shape(self) -> Dict[str, int]:
+        """表单、输入框和密码框数量，依赖原始结构，应在访问cleaned_soup之前读取"""
+        return self.memo('dom_shape', lambda: dom_shape(self.soup))
+
+    @property
+    def text_stats(self) -> TextStats:
+        """清理后文档的文本统计（含链接文本比例），只计算一次"""
+        return self.memo('text_stats', lambda: TextStats.from_soup(self.cleaned_soup))
+
+    @property
+    def cleaned_html(self) -> str:
+        """清理后的HTML文本"""
+        if self._cleaned_html is None:
+            self._cleaned_html = str(self.cleaned_soup)
+        return self._cleaned_html
+
+    def memo(self, key: str, factory: Callable[[], Any]) -> Any:
+        """
+        缓存基于本文档计算的结果，同一文档上重复计算时直接复用
+        Args:
+            key: 结果名称
+            factory: 计算函数
+        """
+        if key not in self._memo:
+            self._memo[key] = factory()
+        return self._memo[key]
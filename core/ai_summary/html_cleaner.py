@@ -7,11 +7,16 @@ HTML清理器
 
 import re
 import logging
-from bs4 import BeautifulSoup
-from typing import List
+from bs4 import BeautifulSoup, Tag
+from typing import List, Tuple
+
+from core.parser_backend import make_soup
 
 logger = logging.getLogger(__name__)
 
+# 隐藏元素和绝对定位元素（通常是广告）的内联样式
+_STYLE_RE = re.compile(r'display:\s*none|position:\s*absolute', re.I)
+
 class HTMLCleaner:
     """HTML清理器"""
     
@@ -39,6 +44,26 @@ class HTMLCleaner:
             'menu', 'navigation', 'breadcrumb', 'pagination', 'footer',
             'header', 'logo', 'search', 'login', 'register', 'cookie'
         ]
+        self._matcher_key = None
+    
+    @staticmethod
+    def _keyword_re(keywords: List[str]):
+        """把关键词列表编译为一个不区分大小写的子串匹配正则"""
+        if not keywords:
+            return None
+        return re.compile('|'.join(re.escape(k) for k in keywords), re.I)
+    
+    def _matchers(self) -> Tuple[frozenset, object, object]:
+        """返回预编译的匹配器，关键词列表被修改后自动重新编译"""
+        key = (tuple(self.remove_tags), tuple(self.remove_classes), tuple(self.remove_ids))
+        if key != self._matcher_key:
+            self._matcher_key = key
+            self._compiled = (
+                frozenset(tag.lower() for tag in self.remove_tags),
+                self._keyword_re(self.remove_classes),
+                self._keyword_re(self.remove_ids)
+            )
+        return self._compiled
     
     def clean_html(self, html_content: str) -> str:
         """
@@ -53,52 +78,71 @@ class HTMLCleaner:
         
         try:
             # 解析HTML
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # 移除不需要的标签
-            self._remove_unwanted_tags(soup)
-            
-            # 移除不需要的元素
-            self._remove_unwanted_elements(soup)
-            
-            # 清理空白字符
-            self._clean_whitespace(soup)
-            
-            # 移除重复内容
-            self._remove_duplicates(soup)
-            
+            soup = make_soup(html_content)
+            self.clean_soup(soup)
             return str(soup)
             
         except Exception as e:
             logger.error(f"HTML清理失败: {e}")
             return html_content
     
-    def _remove_unwanted_tags(self, soup: BeautifulSoup):
-        """移除不需要的标签"""
-        for tag_name in self.remove_tags:
-            for tag in soup.find_all(tag_name):
-                tag.decompose()
-    
-    def _remove_unwanted_elements(self, soup: BeautifulSoup):
-        """移除不需要的元素"""
-        # 移除包含特定类名的元素
-        for class_keyword in self.remove_classes:
-            for element in soup.find_all(class_=re.compile(class_keyword, re.I)):
-                element.decompose()
+    def clean_soup(self, soup: BeautifulSoup) -> BeautifulSoup:
+        """
+        就地清理已解析的文档树
+        Args:
+            soup: 文档树
+        Returns:
+            清理后的同一棵文档树
+        """
+        # 移除不需要的标签和元素
+        self._remove_unwanted_elements(soup)
         
-        # 移除包含特定ID的元素
-        for id_keyword in self.remove_ids:
-            for element in soup.find_all(id=re.compile(id_keyword, re.I)):
-                element.decompose()
+        # 清理空白字符
+        self._clean_whitespace(soup)
         
-        # 移除隐藏元素
-        for element in soup.find_all(style=re.compile(r'display:\s*none', re.I)):
-            element.decompose()
+        # 移除重复内容
+        self._remove_duplicates(soup)
         
-        # 移除position: absolute的元素（通常是广告）
-        for element in soup.find_all(style=re.compile(r'position:\s*absolute', re.I)):
+        return soup
+    
+    def _remove_unwanted_elements(self, soup: BeautifulSoup):
+        """
+        一次遍历移除不需要的元素：标签名、类名、ID关键词（子串匹配）以及隐藏/绝对定位的内联样式。
+        命中的元素整棵子树移除，不再进入其子节点
+        """
+        tag_names, class_re, id_re = self._matchers()
+        removed = []
+        stack = [soup]
+        while stack:
+            for child in stack.pop().contents:
+                if not isinstance(child, Tag):
+                    continue
+                if self._should_remove(child, tag_names, class_re, id_re):
+                    removed.append(child)
+                else:
+                    stack.append(child)
+        
+        for element in removed:
             element.decompose()
     
+    @staticmethod
+    def _should_remove(element: Tag, tag_names, class_re, id_re) -> bool:
+        """判断单个元素是否需要移除"""
+        if element.name in tag_names:
+            return True
+        attrs = element.attrs
+        if not attrs:
+            return False
+        classes = attrs.get('class')
+        if classes and class_re is not None:
+            if class_re.search(classes if isinstance(classes, str) else ' '.join(classes)):
+                return True
+        element_id = attrs.get('id')
+        if element_id and id_re is not None and id_re.search(element_id):
+            return True
+        style = attrs.get('style')
+        return bool(style and _STYLE_RE.search(style))
+    
     def _clean_whitespace(self, soup: BeautifulSoup):
         """清理空白字符"""
         # 移除多余的空白字符
@@ -131,7 +175,7 @@ class HTMLCleaner:
             return ""
         
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            soup = make_soup(html_content)
             
             # 移除脚本和样式
             for script in soup(["script", "style"]):
@@ -161,7 +205,7 @@ class HTMLCleaner:
         links = []
         
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            soup = make_soup(html_content)
             
             for link in soup.find_all('a', href=True):
                 href = link.get('href')
@@ -190,7 +234,7 @@ class HTMLCleaner:
         images = []
         
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            soup = make_soup(html_content)
             
             for img in soup.find_all('img'):
                 src = img.get('src')
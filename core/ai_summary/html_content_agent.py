@@ -7,10 +7,12 @@ HTML内容提取智能体
 
 import os
 import sys
+import re
 import json
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Union
 import datetime
+from dataclasses import asdict
 
 # 动态添加项目根目录到sys.path，便于导入
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
@@ -20,14 +22,16 @@ from qwen_agent.utils.output_beautify import typewriter_print
 
 # 导入自定义工具
 from core.ai_summary.content_processor import ContentProcessor, ProcessedContent
-from core.ai_summary.html_cleaner import HTMLCleaner
-from core.ai_summary.content_validator import ContentValidator
+from core.ai_summary.document import HTMLDocument
+from core.ai_summary.date_parser import format_datetime
 from core.ai_summary.config import qwen_max_llm_cfg
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_PUBLISH_LABEL_RE = re.compile(r'发布时间[：:]?\s*([^\n\r]+)')
+
 class HTMLContentExtractorAgent:
     """HTML内容提取智能体"""
     
@@ -98,29 +102,61 @@ class HTMLContentExtractorAgent:
                 "data": None
             }
         
+        return self.complete_extraction(self.prepare(html_content, url), html_content)
+    
+    def prepare(self, html_content: Union[str, HTMLDocument], url: str = "") -> Dict[str, Any]:
+        """
+        解析、清理并按规则提取内容，不调用大模型
+        结果只包含字符串、列表和字典（不含原始HTML），可以在解析进程池中执行后交给complete_*方法
+        Args:
+            html_content: HTML内容或文档上下文
+            url: 页面URL
+        Returns:
+            dict: 规则提取结果、媒体信息和HTML长度
+        """
+        # 整个提取流程共享一次解析；媒体信息依赖原始结构，先于清理提取
+        doc = self._as_document(html_content, url)
+        images, videos = self._extract_media_info(doc, doc.url)
+        result = self.content_processor.process_document(doc, use_ai=False)
+        return {
+            "url": doc.url,
+            "html_length": len(doc.html),
+            "images": images,
+            "videos": videos,
+            "processed": asdict(result)
+        }
+    
+    def _enrich(self, prepared: Dict[str, Any]) -> ProcessedContent:
+        """在当前进程中用大模型补充摘要和标签，同一份prepare结果只调用一次"""
+        if '_enriched' not in prepared:
+            result = ProcessedContent(**prepared['processed'])
+            prepared['_enriched'] = self.content_processor.enrich_with_ai(result)
+        return prepared['_enriched']
+    
+    def complete_extraction(self, prepared: Dict[str, Any], html_content: str = "") -> Dict[str, Any]:
+        """
+        根据prepare的结果调用大模型并生成extract_content的结果
+        Args:
+            prepared: prepare的结果
+            html_content: 原始HTML，只用于填充结果中的html_content字段
+        Returns:
+            提取结果字典
+        """
+        url = prepared['url']
         try:
             # 使用AI智能体分析HTML内容
-            analysis_result = self.analyze_with_agent(html_content, url, "请提取这篇文章的标题、作者、发布时间、摘要、正文内容和相关标签")
-            
-            # 解析AI分析结果
-            try:
-                analysis_data = json.loads(analysis_result)
-            except json.JSONDecodeError:
-                # 如果AI返回的不是标准JSON，使用规则处理作为备选
-                logger.warning("AI分析结果不是标准JSON格式，使用规则处理作为备选")
-                return self._fallback_extract_content(html_content, url)
+            analysis_data = self._build_analysis(
+                prepared, self._enrich(prepared), "请提取这篇文章的标题、作者、发布时间、摘要、正文内容和相关标签"
+            )
             
             if not analysis_data.get('success', False):
                 # AI分析失败，使用规则处理作为备选
                 logger.warning("AI分析失败，使用规则处理作为备选")
-                return self._fallback_extract_content(html_content, url)
+                return self._build_fallback_result(prepared, html_content)
             
             # 提取AI分析的数据
             ai_data = analysis_data.get('data', {})
             
-            # 提取图片和视频信息
-            images, videos = self._extract_media_info(html_content, url)
-            
             # 构建返回结果
             result = {
                 "success": True,
@@ -131,8 +167,8 @@ class HTMLContentExtractorAgent:
                 "author": self._extract_author_from_ai_result(ai_data),
                 "source": url,
                 "language": 'zh',
-                "images": images,
-                "videos": videos,
+                "images": prepared['images'],
+                "videos": prepared['videos'],
                 "metadata": {
                     "publish_time": self._extract_publish_time_from_ai_result(ai_data),
                     "summary": ai_data.get('summary', ''),
@@ -147,25 +183,35 @@ class HTMLContentExtractorAgent:
         except Exception as e:
             logger.error(f"AI内容提取失败: {e}")
             # 使用规则处理作为备选
-            return self._fallback_extract_content(html_content, url)
+            return self._build_fallback_result(prepared, html_content)
     
-    def _fallback_extract_content(self, html_content: str, url: str = "") -> Dict[str, Any]:
+    def _fallback_extract_content(self, html_content: Union[str, HTMLDocument], url: str = "") -> Dict[str, Any]:
         """
         备选的内容提取方法（使用规则处理）
         Args:
-            html_content: HTML内容
+            html_content: HTML内容或文档上下文（复用已有的解析和处理结果）
             url: 页面URL
         Returns:
             提取结果字典
         """
+        doc = self._as_document(html_content, url)
+        return self._build_fallback_result(self.prepare(doc), doc.html)
+    
+    def _build_fallback_result(self, prepared: Dict[str, Any], html_content: str = "") -> Dict[str, Any]:
+        """
+        由prepare的结果生成备选提取结果
+        Args:
+            prepared: prepare的结果
+            html_content: 原始HTML，只用于填充结果中的html_content字段
+        Returns:
+            提取结果字典
+        """
         try:
-            # 使用内容处理器处理HTML
-            result = self.content_processor.process_html_content(html_content, url)
+            # 使用内容处理器的结果
+            result = self._enrich(prepared)
             
             # 转换为字典格式
             if result.is_valid:
-                # 提取图片和视频信息
-                images, videos = self._extract_media_info(html_content, url)
                 
                 return {
                     "success": True,
@@ -174,10 +220,10 @@ class HTMLContentExtractorAgent:
                     "html_content": html_content,
                     "html_text": result.content,
                     "author": result.author,
-                    "source": url,
+                    "source": prepared['url'],
                     "language": 'zh',
-                    "images": images,
-                    "videos": videos,
+                    "images": prepared['images'],
+                    "videos": prepared['videos'],
                     "metadata": {
                         "publish_time": result.publish_time,
                         "summary": result.summary,
@@ -238,98 +284,38 @@ class HTMLContentExtractorAgent:
         Returns:
             发布时间
         """
-        # 尝试从AI分析结果中提取发布时间
+        # AI结果中已有的发布时间优先
+        publish_time = format_datetime(ai_data.get('publish_time') or '')
+        if publish_time:
+            return publish_time
+        
         summary = ai_data.get('summary', '')
         content_preview = ai_data.get('content_preview', '')
         
-        # 在摘要和内容预览中查找时间信息
-        time_patterns = [
-            r'(\d{4})年(\d{1,2})月(\d{1,2})日',
-            r'(\d{4})-(\d{1,2})-(\d{1,2})',
-            r'(\d{4})/(\d{1,2})/(\d{1,2})',
-            r'发布时间[：:]\s*([^\n\r]+)',
-            r'发布时间\s*([^\n\r]+)'
-        ]
-        
-        import re
-        for pattern in time_patterns:
-            match = re.search(pattern, summary + content_preview)
-            if match:
-                if len(match.groups()) == 3:
-                    # 日期格式
-                    year, month, day = match.groups()
-                    return f"{year}-{month.zfill(2)}-{day.zfill(2)}"
-                else:
-                    # 文本格式
-                    return match.group(1).strip()
-        
+        # 其次是摘要或内容预览中"发布时间："标签后的时间，正文中其他的日期不一定是发布时间
+        match = _PUBLISH_LABEL_RE.search(summary + '\n' + content_preview)
+        if match:
+            return format_datetime(match.group(1))
         return ""
     
-    def _extract_media_info(self, html_content: str, base_url: str = "") -> tuple:
+    def _as_document(self, html_content: Union[str, HTMLDocument], url: str = "") -> HTMLDocument:
+        """HTML文本包装为文档上下文，已有的文档上下文直接返回"""
+        if isinstance(html_content, HTMLDocument):
+            return html_content
+        return HTMLDocument(html_content, url, cleaner=self.content_processor.html_cleaner)
+    
+    def _extract_media_info(self, html_content: Union[str, HTMLDocument], base_url: str = "") -> tuple:
         """
         提取HTML中的图片和视频信息
         Args:
-            html_content: HTML内容
+            html_content: HTML内容或文档上下文
             base_url: 基础URL
         Returns:
             (images, videos) 元组
         """
         try:
-            from bs4 import BeautifulSoup
-            
-            soup = BeautifulSoup(html_content, 'html.parser')
-            images = []
-            videos = []
-            
-            # 提取图片
-            for img in soup.find_all('img'):
-                src = img.get('src', '')
-                alt = img.get('alt', '')
-                
-                if src:
-                    # 处理相对URL
-                    if src.startswith('//'):
-                        src = 'https:' + src
-                    elif src.startswith('/'):
-                        src = base_url.rstrip('/') + src
-                    elif not src.startswith('http'):
-                        src = base_url.rstrip('/') + '/' + src.lstrip('/')
-                    
-                    images.append({
-                        'original_url': src,
-                        'alt_text': alt
-                    })
-            
-            # 提取视频
-            for video in soup.find_all(['video', 'iframe']):
-                src = video.get('src', '')
-                poster = video.get('poster', '')
-                
-                if src:
-                    # 处理相对URL
-                    if src.startswith('//'):
-                        src = 'https:' + src
-                    elif src.startswith('/'):
-                        src = base_url.rstrip('/') + src
-                    elif not src.startswith('http'):
-                        src = base_url.rstrip('/') + '/' + src.lstrip('/')
-                    
-                    # 处理poster URL
-                    if poster:
-                        if poster.startswith('//'):
-                            poster = 'https:' + poster
-                        elif poster.startswith('/'):
-                            poster = base_url.rstrip('/') + poster
-                        elif not poster.startswith('http'):
-                            poster = base_url.rstrip('/') + '/' + poster.lstrip('/')
-                    
-                    videos.append({
-                        'original_url': src,
-                        'poster_url': poster
-                    })
-            
-            return images, videos
-            
+            doc = self._as_document(html_content, base_url)
+            return doc.media
         except Exception as e:
             logger.error(f"媒体信息提取失败: {e}")
             return [], []
@@ -351,105 +337,74 @@ class HTMLContentExtractorAgent:
                 "data": None
             }, ensure_ascii=False, indent=2)
         
+        return self.complete_analysis(self.prepare(html_content, url), user_query)
+    
+    def complete_analysis(self, prepared: Dict[str, Any], user_query: str = "") -> str:
+        """
+        根据prepare的结果调用大模型并生成analyze_with_agent的结果
+        Args:
+            prepared: prepare的结果
+            user_query: 用户查询（可选）
+        Returns:
+            JSON格式的智能体分析结果
+        """
         try:
-            # 构建更详细的AI分析提示
-            if "提取" in user_query or "标题" in user_query or "作者" in user_query:
-                # 如果是提取请求，使用更详细的提示
-                detailed_prompt = f"""
-请详细分析以下HTML内容，并提取以下信息：
-
-1. 标题：提取页面标题
-2. 作者：提取作者信息
-3. 发布时间：提取发布时间
-4. 摘要：生成100字以内的内容摘要
-5. 正文内容：提取主要正文内容
-6. 标签：生成3-5个相关标签
-7. 内容类型：判断是文章、产品介绍、公司介绍等
-8. 字数统计：统计正文字数
-
-HTML内容：
-{html_content[:3000]}...
-
-请以JSON格式返回结果，格式如下：
-{{
-    "title": "标题",
-    "author": "作者",
-    "publish_time": "发布时间",
-    "summary": "摘要",
-    "content": "正文内容",
-    "tags": ["标签1", "标签2"],
-    "content_type": "article/product/company/help/contact/unknown",
-    "word_count": 字数
-}}
-"""
-            else:
-                # 使用默认提示
-                detailed_prompt = user_query if user_query else "请分析这篇文章的主要内容"
-            
-            # 使用AI智能体进行分析
-            # 这里可以调用实际的AI模型进行分析
-            # 由于我们使用的是qwen-agent框架，这里模拟AI分析结果
-            
-            # 首先使用规则处理获取基础信息
-            result = self.content_processor.process_html_content(html_content, url)
-            
-            if result.is_valid:
-                # 构建AI分析结果
-                ai_analysis_data = {
-                    "title": result.title,
-                    "author": result.author,
-                    "publish_time": result.publish_time,
-                    "summary": result.summary,
-                    "content": result.content,
-                    "tags": result.tags,
-                    "content_type": result.content_type,
-                    "word_count": result.word_count
-                }
-                
-                # 生成JSON格式的分析报告
-                analysis_result = {
-                    "success": True,
-                    "analysis_type": "ai_content_extraction",
-                    "timestamp": str(datetime.datetime.now()),
-                    "url": url if url else "未知",
-                    "user_query": user_query if user_query else "无",
-                    "data": {
-                        "title": ai_analysis_data.get('title', ''),
-                        "author": ai_analysis_data.get('author', ''),
-                        "publish_time": ai_analysis_data.get('publish_time', ''),
-                        "summary": ai_analysis_data.get('summary', ''),
-                        "content_preview": ai_analysis_data.get('content', '')[:2000] + ('...' if len(ai_analysis_data.get('content', '')) > 2000 else ''),
-                        "tags": ai_analysis_data.get('tags', []),
-                        "content_type": ai_analysis_data.get('content_type', 'unknown'),
-                        "word_count": ai_analysis_data.get('word_count', 0),
-                        "quality_assessment": {
-                            "is_valid": True,
-                            "extraction_status": "AI分析成功"
-                        }
-                    },
-                    "metadata": {
-                        "html_length": len(html_content),
-                        "extraction_method": "ai_enhanced",
-                        "version": "2.0"
-                    }
-                }
-            else:
-                # 内容无效
-                analysis_result = {
-                    "success": False,
-                    "message": "内容无效或无文章内容",
-                    "data": None
-                }
-            
-            return json.dumps(analysis_result, ensure_ascii=False, indent=2)
-            
+            analysis_result = self._build_analysis(prepared, self._enrich(prepared), user_query)
         except Exception as e:
             logger.error(f"智能体分析失败: {e}")
-            return json.dumps({
+            analysis_result = {
                 "success": False,
                 "message": f"分析失败: {str(e)}",
                 "data": None
-            }, ensure_ascii=False, indent=2)
+            }
+        return json.dumps(analysis_result, ensure_ascii=False, indent=2)
+    
+    def _build_analysis(self, prepared: Dict[str, Any], result: ProcessedContent, user_query: str = "") -> Dict[str, Any]:
+        """
+        由处理结果生成分析报告
+        Args:
+            prepared: prepare的结果
+            result: 经大模型补充后的处理结果
+            user_query: 用户查询（可选）
+        Returns:
+            分析报告字典
+        """
+        if not result.is_valid:
+            # 内容无效
+            return {
+                "success": False,
+                "message": "内容无效或无文章内容",
+                "data": None
+            }
+        
+        url = prepared['url']
+        content = result.content or ''
+        return {
+            "success": True,
+            "analysis_type": "ai_content_extraction",
+            "timestamp": str(datetime.datetime.now()),
+            "url": url if url else "未知",
+            "user_query": user_query if user_query else "无",
+            "data": {
+                "title": result.title or '',
+                "author": result.author or '',
+                "publish_time": result.publish_time or '',
+                "summary": result.summary or '',
+                "content_preview": content[:2000] + ('...' if len(content) > 2000 else ''),
+                "tags": result.tags or [],
+                "content_type": result.content_type or 'unknown',
+                "word_count": result.word_count or 0,
+                "quality_assessment": {
+                    "is_valid": True,
+                    "extraction_status": "AI分析成功"
+                }
+            },
+            "metadata": {
+                "html_length": prepared['html_length'],
+                "extraction_method": "ai_enhanced",
+                "version": "2.0"
+            }
+        }
     
     def batch_extract(self, html_contents: list) -> str:
         """
@@ -459,6 +414,23 @@ HTML内容：
         Returns:
             JSON格式的批量提取结果
         """
+        results = []
+        for i, content_data in enumerate(html_contents):
+            print(f"正在处理第 {i+1} 个内容...")
+            results.append(self.extract_content(content_data.get('html_content', ''), content_data.get('url', '')))
+        
+        return self.build_batch_result(html_contents, results)
+    
+    @staticmethod
+    def build_batch_result(html_contents: list, results: list) -> str:
+        """
+        汇总批量提取结果
+        Args:
+            html_contents: HTML内容列表，每个元素包含html_content和url
+            results: 与html_contents一一对应的extract_content结果
+        Returns:
+            JSON格式的批量提取结果
+        """
         batch_results = {
             "success": True,
             "batch_type": "html_content_extraction",
@@ -469,14 +441,10 @@ HTML内容：
             "results": []
         }
         
-        for i, content_data in enumerate(html_contents):
+        for i, (content_data, result) in enumerate(zip(html_contents, results)):
             html_content = content_data.get('html_content', '')
             url = content_data.get('url', '')
             
-            print(f"正在处理第 {i+1} 个内容...")
-            
-            result = self.extract_content(html_content, url)
-            
             # 添加处理结果
             result_item = {
                 "index": i + 1,
@@ -489,10 +457,10 @@ HTML内容：
             
             if result['success']:
                 batch_results["successful_count"] += 1
-                data = result['data']
-                print(f"✅ 标题: {data.get('title', 'N/A')}")
-                print(f"📄 摘要: {data.get('summary', 'N/A')[:100]}...")
-                print(f"🏷️ 标签: {', '.join(data.get('tags', []))}")
+                metadata = result.get('metadata', {})
+                print(f"✅ 标题: {result.get('title', 'N/A')}")
+                print(f"📄 摘要: {metadata.get('summary', 'N/A')[:100]}...")
+                print(f"🏷️ 标签: {', '.join(metadata.get('tags', []))}")
             else:
                 batch_results["failed_count"] += 1
                 print(f"❌ 处理失败: {result.get('message', '')}")
@@ -507,10 +475,8 @@ HTML内容：
         Returns:
             质量评分信息
         """
-        validator = ContentValidator()
-        cleaned_content = HTMLCleaner().clean_html(html_content)
-        
-        return validator.get_content_quality_score(cleaned_content)
+        doc = self._as_document(html_content)
+        return self.content_processor.content_validator.get_content_quality_score(doc.cleaned_html, doc.text_stats)
 
 # 定义工具函数
 def html_content_extractor(html_content: str, url: str = "") -> str:
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多类别关键词匹配
+把所有类别的关键词合并为一个按前缀树组织的正则，文本只转小写一次、扫描一遍即可得到
+每个类别命中的关键词，结果与逐个关键词做子串判断相同（等同Aho-Corasick自动机）
+"""
+
+import re
+from typing import Dict, Iterable, List, Set
+
+
+def _trie_pattern(node: Dict) -> str:
+    """把前缀树转换为正则，同一位置优先匹配更长的关键词"""
+    terminal = '' in node
+    branches = []
+    for char in sorted(key for key in node if key):
+        branches.append(re.escape(char) + _trie_pattern(node[char]))
+    if not branches:
+        return ''
+    if len(branches) == 1 and not terminal:
+        return branches[0]
+    pattern = '(?:' + '|'.join(branches) + ')'
+    return pattern + '?' if terminal else pattern
+
+
+def build_trie_regex(keywords: Iterable[str], flags: int = 0) -> re.Pattern:
+    """
+    把关键词编译为一个前缀树正则，同一位置匹配最长的关键词
+    Args:
+        keywords: 关键词
+        flags: 正则标志。re.I会使正则引擎无法按首字符快速跳过，不区分大小写时应先把文本转小写
+    """
+    trie: Dict = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = True
+    return re.compile(_trie_pattern(trie), flags)
+
+
+class KeywordMatcher:
+    """多类别关键词匹配器"""
+
+    def __init__(self, categories: Dict[str, Iterable[str]]):
+        """
+        初始化匹配器
+        Args:
+            categories: 类别名 -> 关键词列表，匹配不区分大小写
+        """
+        # 关键词 -> 所属类别
+        self._owners: Dict[str, List[str]] = {}
+        for category, keywords in categories.items():
+            for keyword in keywords:
+                keyword = keyword.lower()
+                if keyword:
+                    self._owners.setdefault(keyword, []).append(category)
+        self.categories = list(categories)
+        keywords = list(self._owners)
+        # 扫描不重叠，命中一个关键词时，包含在其中的其他关键词也算命中
+        self._contained: Dict[str, List[str]] = {
+            keyword: [other for other in keywords if other != keyword and other in keyword]
+            for keyword in keywords
+        }
+        # 开头可能与另一个关键词的结尾重叠的关键词会被不重叠扫描漏掉，扫描后单独补查
+        self._overlapping = [
+            keyword for keyword in keywords
+            if any(other != keyword and self._overlaps(other, keyword) for other in keywords)
+        ]
+        self._regex = build_trie_regex(keywords) if keywords else None
+
+    @staticmethod
+    def _overlaps(first: str, second: str) -> bool:
+        """first的某个真后缀是否为second的真前缀"""
+        return any(second.startswith(first[i:]) and len(first) - i < len(second)
+                   for i in range(1, len(first)))
+
+    def scan(self, text: str) -> Dict[str, Set[str]]:
+        """
+        扫描一遍文本
+        Args:
+            text: 文本
+        Returns:
+            类别名 -> 命中的关键词集合（每个类别都有键）
+        """
+        hits: Dict[str, Set[str]] = {category: set() for category in self.categories}
+        if not text or self._regex is None:
+            return hits
+        text = text.lower()
+        found = set()
+        for keyword in self._regex.findall(text):
+            if keyword not in found:
+                found.add(keyword)
+                found.update(self._contained[keyword])
+        for keyword in self._overlapping:
+            if keyword not in found and keyword in text:
+                found.add(keyword)
+        for keyword in found:
+            for category in self._owners.get(keyword, ()):
+                hits[category].add(keyword)
+        return hits
+
+    def counts(self, text: str) -> Dict[str, int]:
+        """
+        扫描一遍文本
+        Args:
+            text: 文本
+        Returns:
+            类别名 -> 命中的不同关键词个数
+        """
+        return {category: len(keywords) for category, keywords in self.scan(text).items()}
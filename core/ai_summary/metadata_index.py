@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+结构化元数据索引
+遍历一次文档树，收集meta标签、OpenGraph、JSON-LD和微数据(itemprop)中的标题、作者、时间、
+站点名、语言和图片，之后按字段查询不再扫描文档树
+"""
+
+import json
+import logging
+from typing import Dict, List, Optional
+
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+# 字段 -> 按优先级排列的来源键
+FIELD_SOURCES = {
+    'title': ['og:title', 'twitter:title', 'jsonld:headline', 'itemprop:headline', 'title', 'jsonld:name'],
+    'author': ['author', 'article:author', 'og:author', 'jsonld:author', 'itemprop:author', 'byl', 'dc.creator'],
+    'published_time': [
+        'article:published_time', 'og:published_time', 'publish_date', 'pubdate', 'publishdate',
+        'jsonld:datePublished', 'itemprop:datePublished', 'dc.date', 'time:datetime'
+    ],
+    'modified_time': ['article:modified_time', 'og:updated_time', 'jsonld:dateModified', 'itemprop:dateModified'],
+    'site_name': ['og:site_name', 'application-name', 'jsonld:publisher'],
+    'language': ['html:lang', 'og:locale', 'content-language', 'jsonld:inLanguage'],
+    'image': ['og:image', 'twitter:image', 'jsonld:image', 'itemprop:image'],
+    'description': ['og:description', 'description', 'twitter:description', 'jsonld:description'],
+}
+
+# 从JSON-LD对象中读取的键
+_JSONLD_KEYS = ('headline', 'name', 'author', 'datePublished', 'dateModified', 'publisher', 'inLanguage',
+                'image', 'description')
+_ITEMPROP_KEYS = {'headline', 'author', 'datePublished', 'dateModified', 'image'}
+
+
+def _jsonld_value(value) -> str:
+    """把JSON-LD中的值（字符串、对象或列表）转换为文本"""
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, dict):
+        return _jsonld_value(value.get('name') or value.get('url') or '')
+    if isinstance(value, list):
+        names = [_jsonld_value(item) for item in value]
+        return ', '.join(name for name in names if name)
+    return ''
+
+
+class MetadataIndex:
+    """文档元数据索引"""
+
+    def __init__(self, soup: BeautifulSoup):
+        """
+        遍历文档树建立索引，同一来源键以先出现的值为准
+        Args:
+            soup: 原始文档树（清理前）
+        """
+        self._values: Dict[str, str] = {}
+        try:
+            self._build(soup)
+        except Exception as e:
+            logger.error(f"建立元数据索引失败: {e}")
+
+    def _add(self, key: str, value) -> None:
+        if value and key not in self._values:
+            value = value.strip() if isinstance(value, str) else value
+            if value:
+                self._values[key] = value
+
+    def _build(self, soup: BeautifulSoup) -> None:
+        html = soup.find('html')
+        if html is not None:
+            self._add('html:lang', html.get('lang'))
+
+        for element in soup.find_all(True):
+            name = element.name
+            if name == 'meta':
+                content = element.get('content')
+                if not content:
+                    continue
+                for attr in ('property', 'name', 'http-equiv', 'itemprop'):
+                    key = element.get(attr)
+                    if key:
+                        self._add(key.strip().lower() if attr != 'itemprop' else f'itemprop:{key.strip()}', content)
+                        break
+            elif name == 'title':
+                self._add('title', element.get_text())
+            elif name == 'script':
+                if (element.get('type') or '').strip().lower() == 'application/ld+json':
+                    self._add_jsonld(element.string or element.get_text())
+            elif name == 'time' and element.get('datetime'):
+                self._add('time:datetime', element.get('datetime'))
+            else:
+                itemprop = element.get('itemprop')
+                if itemprop in _ITEMPROP_KEYS:
+                    if name == 'img':
+                        value = element.get('src')
+                    else:
+                        value = element.get('datetime') or element.get('content') or element.get_text()
+                    self._add(f'itemprop:{itemprop}', value)
+
+    def _add_jsonld(self, text: str) -> None:
+        try:
+            data = json.loads(text)
+        except (TypeError, ValueError):
+            return
+        # 展开列表和@graph
+        pending = [data]
+        while pending:
+            item = pending.pop(0)
+            if isinstance(item, list):
+                pending.extend(item)
+            elif isinstance(item, dict):
+                if isinstance(item.get('@graph'), list):
+                    pending.extend(item['@graph'])
+                for key in _JSONLD_KEYS:
+                    if key in item:
+                        self._add(f'jsonld:{key}', _jsonld_value(item[key]))
+
+    def candidates(self, field: str) -> List[str]:
+        """
+        按优先级返回字段的所有候选值
+        Args:
+            field: 字段名，见FIELD_SOURCES
+        """
+        return [self._values[key] for key in FIELD_SOURCES.get(field, ()) if key in self._values]
+
+    def get(self, field: str, default: str = "") -> str:
+        """
+        返回字段优先级最高的值
+        Args:
+            field: 字段名，见FIELD_SOURCES
+            default: 没有值时的默认值
+        """
+        for key in FIELD_SOURCES.get(field, ()):
+            value = self._values.get(key)
+            if value:
+                return value
+        return default
+
+    def raw(self, key: str) -> Optional[str]:
+        """按来源键（如og:title、jsonld:author）查询原始值"""
+        return self._values.get(key)
+
+    def to_dict(self) -> Dict[str, str]:
+        """所有字段的值"""
+        return {field: self.get(field) for field in FIELD_SOURCES}
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+调用大模型前的页面质量判断
+用已经算好的文本统计、链接密度和文档结构（表单、密码框）构造少量特征，由随包发布的
+逻辑回归模型（quality_model.json）打分。登录页、Cookie提示、导航列表等得分低于阈值的页面
+不再调用大模型，直接使用规则结果
+"""
+
+import os
+import sys
+import json
+import math
+import logging
+import threading
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from bs4 import Tag
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config import config
+
+try:
+    from .text_stats import TextStats
+    from .keyword_matcher import KeywordMatcher
+except ImportError:
+    from core.ai_summary.text_stats import TextStats
+    from core.ai_summary.keyword_matcher import KeywordMatcher
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'quality_model.json')
+
+# 模型可以使用的特征，取值都在0~1.5之间
+FEATURE_NAMES = (
+    'text_length',          # 正文有效字符数的对数，log(5000)处为1
+    'link_ratio',           # 链接文本占全文的比例
+    'punctuation_density',  # 正文标点密度，10%及以上为1
+    'line_length',          # 正文平均行长，100字符及以上为1
+    'content_ratio',        # 正文占全文的比例
+    'login_signal',         # 有密码框或多个登录/注册用语
+    'consent_signal',       # 多个Cookie/隐私同意用语
+    'form_density',         # 可见输入框数量，10个及以上为1
+)
+
+_SIGNAL_KEYWORDS = {
+    'login': ['登录', '登陆', '注册', '忘记密码', '验证码', 'sign in', 'log in', 'login', 'sign up', 'password'],
+    'consent': ['cookie', '隐私政策', '同意', 'consent', 'privacy policy', 'accept all'],
+}
+# 登录/同意用语只在正文开头查找
+_SIGNAL_SCAN_CHARS = 3000
+_HIDDEN_INPUT_TYPES = {'hidden', 'submit', 'button', 'reset', 'image'}
+
+
+def dom_shape(soup: Tag) -> Dict[str, int]:
+    """
+    统计文档结构，需要在清理（会移除表单）之前调用
+    Args:
+        soup: 原始文档树
+    Returns:
+        dict: 表单数、可见输入框数和密码框数
+    """
+    shape = {'forms': 0, 'inputs': 0, 'password_inputs': 0}
+    for tag in soup.find_all(('form', 'input', 'textarea', 'select')):
+        if tag.name == 'form':
+            shape['forms'] += 1
+            continue
+        input_type = (tag.get('type') or '').lower()
+        if input_type in _HIDDEN_INPUT_TYPES:
+            continue
+        shape['inputs'] += 1
+        if input_type == 'password':
+            shape['password_inputs'] += 1
+    return shape
+
+
+class QualityGate:
+    """基于逻辑回归的页面质量判断"""
+
+    def __init__(self, model_path: str = None, threshold: float = None, enabled: bool = None):
+        """
+        加载模型
+        Args:
+            model_path: 模型JSON路径，默认取QUALITY_MODEL_PATH配置，未配置时使用随包发布的模型
+            threshold: 调用大模型的最低得分，默认取QUALITY_GATE_THRESHOLD配置
+            enabled: 是否启用，默认取QUALITY_GATE_ENABLED配置，不启用时所有页面都放行
+        """
+        self.enabled = config.QUALITY_GATE_ENABLED if enabled is None else enabled
+        self.threshold = config.QUALITY_GATE_THRESHOLD if threshold is None else threshold
+        self.model_path = model_path or config.QUALITY_MODEL_PATH or DEFAULT_MODEL_PATH
+        with open(self.model_path, 'r', encoding='utf-8') as f:
+            model = json.load(f)
+
+        self.feature_names: List[str] = list(model['features'])
+        unknown = [name for name in self.feature_names if name not in FEATURE_NAMES]
+        if unknown:
+            raise ValueError(f"质量模型包含未知特征: {unknown}")
+        self.weights = np.asarray(model['weights'], dtype=np.float64)
+        if self.weights.shape != (len(self.feature_names),):
+            raise ValueError("质量模型的权重数与特征数不一致")
+        self.bias = float(model.get('bias', 0.0))
+        self._matcher = KeywordMatcher(_SIGNAL_KEYWORDS)
+
+    def features(self, stats: TextStats, content: str = "", content_stats: TextStats = None,
+                 shape: Dict[str, int] = None) -> Dict[str, float]:
+        """
+        构造特征
+        Args:
+            stats: 全文统计（含链接文本长度）
+            content: 正文，用于查找登录/同意用语
+            content_stats: 正文统计，默认与全文相同
+            shape: dom_shape的结果，没有文档树时为空
+        Returns:
+            特征名 -> 特征值
+        """
+        content_stats = content_stats or stats
+        shape = shape or {}
+        length = content_stats.length
+        signals = self._matcher.counts(content[:_SIGNAL_SCAN_CHARS])
+        return {
+            'text_length': min(1.5, math.log1p(content_stats.meaningful_chars) / math.log(5000)),
+            'link_ratio': stats.link_ratio,
+            'punctuation_density': min(1.0, content_stats.punctuation * 10 / length) if length else 0.0,
+            'line_length': min(1.0, length / max(content_stats.lines, 1) / 100),
+            'content_ratio': min(1.0, length / stats.length) if stats.length else 1.0,
+            'login_signal': 1.0 if shape.get('password_inputs') or signals['login'] >= 2 else 0.0,
+            'consent_signal': 1.0 if signals['consent'] >= 2 else 0.0,
+            'form_density': min(1.0, shape.get('inputs', 0) / 10),
+        }
+
+    def score_batch(self, features: Sequence[Dict[str, float]]) -> np.ndarray:
+        """
+        批量打分
+        Args:
+            features: features()的结果列表
+        Returns:
+            每个页面值得调用大模型的概率
+        """
+        if not features:
+            return np.zeros(0)
+        matrix = np.array([[item[name] for name in self.feature_names] for item in features], dtype=np.float64)
+        return 1.0 / (1.0 + np.exp(-(matrix @ self.weights + self.bias)))
+
+    def score(self, features: Dict[str, float]) -> float:
+        """单个页面的得分"""
+        return float(self.score_batch([features])[0])
+
+    def score_texts(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        为没有文档树的纯文本页面打分，链接和表单特征按0处理
+        Args:
+            texts: 页面文本列表
+        """
+        features = []
+        for text in texts:
+            stats = TextStats.from_text(text or "")
+            features.append(self.features(stats, text or ""))
+        return self.score_batch(features)
+
+    def allows(self, score: Optional[float]) -> bool:
+        """得分是否达到调用大模型的阈值，未启用时总是放行"""
+        return not self.enabled or score is None or score >= self.threshold
+
+
+_shared_gate = None
+_shared_gate_lock = threading.Lock()
+
+
+def get_quality_gate() -> QualityGate:
+    """获取进程内共享的质量判断模型"""
+    global _shared_gate
+    if _shared_gate is None:
+        with _shared_gate_lock:
+            if _shared_gate is None:
+                _shared_gate = QualityGate()
+    return _shared_gate
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文本统计
+一次str.translate把每个字符映射为类别标记（中文、英文字母、数字、标点），再按标记计数，
+得到验证、质量评分和结果中字数统计共用的TextStats，每个文档只计算一次
+"""
+
+import re
+import string
+from dataclasses import dataclass
+
+from bs4 import NavigableString, Tag
+from bs4.element import PreformattedString
+
+_CJK, _LATIN, _DIGIT, _PUNCT = '\x01', '\x02', '\x03', '\x04'
+
+_PUNCTUATION = string.punctuation + '，。、；：？！“”‘’（）《》〈〉【】「」『』…—～·'
+
+
+def _build_table() -> dict:
+    table = {ord(marker): None for marker in (_CJK, _LATIN, _DIGIT, _PUNCT)}
+    table.update({code: _CJK for code in range(0x4e00, 0xa000)})
+    table.update({ord(char): _LATIN for char in string.ascii_letters})
+    table.update({ord(char): _DIGIT for char in string.digits})
+    table.update({ord(char): _PUNCT for char in _PUNCTUATION})
+    return table
+
+
+_CATEGORY_TABLE = _build_table()
+_TAG_RE = re.compile(r'<[^>]+>')
+# 不计入文本的标签
+_SKIP_TAGS = {'script', 'style', 'noscript', 'template', 'head'}
+
+
+@dataclass
+class TextStats:
+    """文本统计结果"""
+    length: int = 0  # 去掉首尾空白后的字符数
+    cjk_chars: int = 0
+    latin_chars: int = 0
+    digits: int = 0
+    punctuation: int = 0
+    lines: int = 0  # 非空行数
+    link_text_length: int = 0  # 链接文本的字符数
+
+    @property
+    def meaningful_chars(self) -> int:
+        """中文字符与英文字母数之和"""
+        return self.cjk_chars + self.latin_chars
+
+    @property
+    def link_ratio(self) -> float:
+        """链接文本占全部文本的比例"""
+        return min(1.0, self.link_text_length / self.length) if self.length else 0.0
+
+    @classmethod
+    def from_text(cls, text: str, link_text_length: int = 0) -> 'TextStats':
+        """
+        统计纯文本
+        Args:
+            text: 文本
+            link_text_length: 其中链接文本的字符数
+        """
+        if not text:
+            return cls()
+        marked = text.translate(_CATEGORY_TABLE)
+        return cls(
+            length=len(text.strip()),
+            cjk_chars=marked.count(_CJK),
+            latin_chars=marked.count(_LATIN),
+            digits=marked.count(_DIGIT),
+            punctuation=marked.count(_PUNCT),
+            lines=sum(1 for line in text.splitlines() if line.strip()),
+            link_text_length=link_text_length
+        )
+
+    @classmethod
+    def from_html(cls, html: str) -> 'TextStats':
+        """统计HTML文本（用正则去掉标签，不统计链接文本）"""
+        return cls.from_text(_TAG_RE.sub('', html or ''))
+
+    @classmethod
+    def from_soup(cls, root: Tag) -> 'TextStats':
+        """
+        遍历一次文档树统计文本，同时累计<a>中的文本长度
+        Args:
+            root: 文档树或其子树
+        """
+        parts = []
+        link_text_length = 0
+        stack = [(root, False)]
+        while stack:
+            node, in_link = stack.pop()
+            if isinstance(node, Tag):
+                if node.name in _SKIP_TAGS:
+                    continue
+                in_link = in_link or node.name == 'a'
+                stack.extend((child, in_link) for child in reversed(node.contents))
+            elif isinstance(node, NavigableString) and not isinstance(node, PreformattedString):
+                parts.append(node)
+                if in_link:
+                    link_text_length += len(node.strip())
+        return cls.from_text(''.join(parts), link_text_length)
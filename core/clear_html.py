@@ -1,64 +1,135 @@
-""" 
+"""
 Module for minimizing the code
 """
-from bs4 import BeautifulSoup
-from minify_html import minify
+import re
+from bs4 import BeautifulSoup, NavigableString, Tag
+from bs4.element import PreformattedString
 from urllib.parse import urljoin
 
+from core.parser_backend import make_soup
+from core.media_extractor import MEDIA_TAGS, MediaCollector
+
+# 不输出文本的标签，其中script/style会从文档树中移除
+_SKIP_TAGS = {'script', 'style', 'noscript', 'template', 'head'}
+_REMOVE_TAGS = {'script', 'style'}
+
+# 块级元素，前后各断一行
+_BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'dd', 'details', 'dialog', 'div', 'dl', 'dt',
+    'fieldset', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'header', 'hr', 'li', 'main', 'nav', 'ol', 'p', 'pre', 'section', 'summary', 'table',
+    'tbody', 'thead', 'tfoot', 'tr', 'td', 'th', 'caption', 'ul', 'option', 'body', 'html'
+}
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# 块结束标记
+_BLOCK_END = object()
+
+
+class CleanupResult:
+    """
+    cleanup_html的结果
+    body（最小化后的body HTML）在首次访问时才计算；
+    仍可按 (title, body, link_urls, image_urls, text) 解包，解包时会计算body
+    """
+
+    def __init__(self, title, body_tag, link_urls, image_urls, text):
+        self.title = title
+        self.link_urls = link_urls
+        self.image_urls = image_urls
+        self.text = text
+        self._body_tag = body_tag
+        self._body = None
+
+    @property
+    def body(self) -> str:
+        if self._body is None:
+            from minify_html import minify
+            # 最小化body标签内的HTML内容
+            self._body = minify(str(self._body_tag))
+        return self._body
 
-def cleanup_html(html_content: str, base_url: str) -> str:
+    def __iter__(self):
+        return iter((self.title, self.body, self.link_urls, self.image_urls, self.text))
+
+
+def cleanup_html(html_content, base_url: str) -> CleanupResult:
     """
-    清理HTML内容并提取相关信息
+    清理HTML内容并提取相关信息，只遍历一次文档树
 
-    :param html_content: 输入的HTML内容
+    :param html_content: 输入的HTML内容，也可以直接传入已解析的BeautifulSoup以避免重复解析（会被就地移除脚本和样式）
     :param base_url: 基础URL，用于处理相对路径
-    :return: 返回标题、最小化的HTML内容、链接URL列表、图片URL列表和文本内容
+    :return: CleanupResult，包含标题、链接URL列表、图片URL列表、按块分行的文本内容，以及按需最小化的body
     """
 
-    soup = BeautifulSoup(html_content, 'html.parser')
+    if isinstance(html_content, BeautifulSoup):
+        soup = html_content
+    else:
+        soup = make_soup(html_content)
+
+    title = None
+    body_tag = None
+    link_urls = []
+    media = MediaCollector(base_url)
+    removed = []
+    parts = []
+
+    # 栈中元素为 (节点, 是否输出文本)
+    stack = [(soup, True)]
+    while stack:
+        node, emit = stack.pop()
+        if node is _BLOCK_END:
+            parts.append('\n')
+            continue
+
+        if isinstance(node, Tag):
+            name = node.name
+            if name in _REMOVE_TAGS:
+                removed.append(node)
+                continue
+            if name == 'title':
+                if title is None:
+                    title = node.get_text()
+                continue
+            if name == 'body' and body_tag is None:
+                body_tag = node
+            elif name == 'a':
+                # 提取链接
+                href = node.get('href')
+                if href is not None:
+                    link_urls.append(urljoin(base_url, href))
+            elif name in MEDIA_TAGS:
+                # 提取图片（含srcset、懒加载属性和<picture>），补全相对地址并去重
+                media.add(node)
+            elif name == 'br' and emit:
+                parts.append('\n')
+
+            child_emit = emit and name not in _SKIP_TAGS
+            if child_emit and name in _BLOCK_TAGS:
+                parts.append('\n')
+                stack.append((_BLOCK_END, False))
+            stack.extend((child, child_emit) for child in reversed(node.contents))
+
+        elif emit and isinstance(node, NavigableString) and not isinstance(node, PreformattedString):
+            parts.append(_WHITESPACE_RE.sub(' ', node))
 
-    # 提取标题
-    title_tag = soup.find('title')
-    title = title_tag.get_text() if title_tag else ""
-    
-    # 提取文本内容并去除空格和换行符
-    text = soup.get_text().replace(' ', '').replace("\n", "")
-    
     # 移除脚本和样式标签
-    for tag in soup.find_all(['script', 'style']):
+    for tag in removed:
         tag.extract()
 
-    # 提取链接
-    links = soup.find_all('a')
-    link_urls = []
-    for link in links:
-        if 'href' in link.attrs:
-            link_urls.append(urljoin(base_url, link['href']))
-
-    # 提取图片
-    images = soup.find_all('img')
-    image_urls = []
-    for image in images:
-        if 'src' in image.attrs:
-            # 如果图片URL中没有http或https，则将其与基础URL连接
-            if 'http' not in image['src']:
-                image_urls.append(urljoin(base_url, image['src']))
-            else:
-                image_urls.append(image['src'])
-
-    # 提取并最小化body内容（如果存在）
-    body_content = soup.find('body')
-    if body_content:
-        # 最小化body标签内的HTML内容
-        minimized_body = minify(str(body_content))
-
-        return title, minimized_body, link_urls, image_urls, text
-        # return "Title: " + title + ", Body: " + minimized_body + ", Links: " + str(link_urls) + ", Images: " + str(image_urls)
-
-    # 如果没有找到body内容，抛出错误
-    raise ValueError("No HTML body content found, please try setting the 'headless' flag to False in the graph configuration.")
+    # 每个块一行，去掉行首尾空白和空行
+    lines = (line.strip() for line in ''.join(parts).split('\n'))
+    text = '\n'.join(line for line in lines if line)
+
+    if body_tag is None:
+        # 如果没有找到body内容，抛出错误
+        raise ValueError("No HTML body content found, please try setting the 'headless' flag to False in the graph configuration.")
+
+    return CleanupResult(title or "", body_tag, link_urls, media.image_urls, text)
 
 
 if __name__ == "__main__":
     html_content = "<html><head><title>Example</title></head><body><p>Hello World!</p></body></html>"
-    print(cleanup_html(html_content, ""))
+    result = cleanup_html(html_content, "")
+    print(result.title, result.text, result.link_urls, result.image_urls)
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+解析前的HTML预处理
+有的页面内嵌数MB的SVG、base64图片或JSON状态数据，会拖慢解析和最小化并一直占用内存。
+在完整解析之前按标签流扫描一遍HTML文本或字节：超长的<script>/<style>/<svg>内容和data URI
+被清空，嵌套过深的标签被丢弃（保留其中的文本），属性过多或过长的标签只保留限制内的属性，
+节点总数超限后截断文档
+"""
+
+import os
+import re
+import sys
+import logging
+from typing import Dict, Optional, Tuple, Union
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import config
+
+logger = logging.getLogger(__name__)
+
+Markup = Union[str, bytes]
+
+# 内容整体保留或整体清空的标签
+_BLOCK_TAGS = {'script', 'style', 'svg'}
+# 没有结束标签的元素
+_VOID_TAGS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param',
+    'source', 'track', 'wbr'
+}
+# 结束标签常被省略的元素，不计入嵌套深度
+_OPTIONAL_END_TAGS = {'p', 'li', 'dt', 'dd', 'tr', 'td', 'th', 'option', 'colgroup', 'tbody', 'thead', 'tfoot'}
+
+
+def _compile(pattern: str, flags: int = 0) -> Dict[type, 're.Pattern']:
+    """同时编译文本和字节两种版本的模式"""
+    return {str: re.compile(pattern, flags), bytes: re.compile(pattern.encode('ascii'), flags)}
+
+
+# 注释、<!DOCTYPE>/<?xml>、开始或结束标签
+_TOKEN_RE = _compile(r'<(?:!--.*?-->|[!?][^>]*>|(/?)([a-zA-Z][^\s/>]*)([^>]*)>)', re.S)
+_CLOSE_RE = {name: _compile(rf'</{name}\s*>', re.I) for name in _BLOCK_TAGS}
+# 开始标签中的单个属性
+_ATTR_RE = _compile(r'[^\s"\'>/=]+(?:\s*=\s*(?:"[^"]*"|\'[^\']*\'|[^\s"\'>]*))?')
+_EMPTY = {str: '', bytes: b''}
+_SPACE = {str: ' ', bytes: b' '}
+_TAG_PARTS = {str: ('<', ' /', '>'), bytes: (b'<', b' /', b'>')}
+_EMPTY_DATA_URI = {str: 'data:,', bytes: b'data:,'}
+
+
+class HTMLScrubber:
+    """解析前的HTML预处理器"""
+
+    def __init__(self, max_inline_bytes: int = None, max_data_uri: int = None,
+                 max_depth: int = None, max_nodes: int = None,
+                 max_attributes: int = None, max_attribute_length: int = None):
+        """
+        初始化预处理器，参数为0表示不做该项限制
+        Args:
+            max_inline_bytes: <script>/<style>/<svg>内容的最大长度，默认取HTML_SCRUB_MAX_INLINE_BYTES配置
+            max_data_uri: data URI的最大长度，默认取HTML_SCRUB_MAX_DATA_URI配置
+            max_depth: 最大嵌套深度，默认取HTML_SCRUB_MAX_DEPTH配置
+            max_nodes: 最大标签数，默认取HTML_SCRUB_MAX_NODES配置
+            max_attributes: 单个标签保留的最大属性数，默认取HTML_SCRUB_MAX_ATTRIBUTES配置
+            max_attribute_length: 单个属性（含名称和值）的最大长度，超过的属性被丢弃，
+                默认取HTML_SCRUB_MAX_ATTRIBUTE_LENGTH配置
+        """
+        pick = lambda value, default: default if value is None else value
+        self.max_inline_bytes = pick(max_inline_bytes, config.HTML_SCRUB_MAX_INLINE_BYTES)
+        self.max_data_uri = pick(max_data_uri, config.HTML_SCRUB_MAX_DATA_URI)
+        self.max_depth = pick(max_depth, config.HTML_SCRUB_MAX_DEPTH)
+        self.max_nodes = pick(max_nodes, config.HTML_SCRUB_MAX_NODES)
+        self.max_attributes = pick(max_attributes, config.HTML_SCRUB_MAX_ATTRIBUTES)
+        self.max_attribute_length = pick(max_attribute_length, config.HTML_SCRUB_MAX_ATTRIBUTE_LENGTH)
+        self._data_uri_re = None
+        if self.max_data_uri > 0:
+            self._data_uri_re = _compile(rf'data:[^"\'\s<>()]{{{self.max_data_uri},}}', re.I)
+
+    def scrub(self, markup: Markup) -> Markup:
+        """
+        预处理HTML
+        Args:
+            markup: HTML文本或字节
+        Returns:
+            与输入同类型的HTML
+        """
+        return self.scrub_with_stats(markup)[0]
+
+    def scrub_with_stats(self, markup: Markup) -> Tuple[Markup, Dict[str, int]]:
+        """
+        预处理HTML并返回处理统计
+        Args:
+            markup: HTML文本或字节
+        Returns:
+            (与输入同类型的HTML, 统计) 统计包括清空的内嵌块、data URI、丢弃的深层标签数、
+            精简了属性的标签数以及是否截断
+        """
+        stats = {'inline_blocks': 0, 'data_uris': 0, 'deep_tags': 0, 'attribute_tags': 0, 'truncated': 0}
+        kind = type(markup)
+        if kind not in _TOKEN_RE or not markup:
+            return markup, stats
+
+        if self._data_uri_re is not None:
+            markup, stats['data_uris'] = self._data_uri_re[kind].subn(_EMPTY_DATA_URI[kind], markup)
+
+        token_re = _TOKEN_RE[kind]
+        slash = b'/' if kind is bytes else '/'
+        parts = []
+        last = pos = 0
+        depth = nodes = 0
+        while True:
+            match = token_re.search(markup, pos)
+            if match is None:
+                break
+            pos = match.end()
+            if match.group(2) is None:
+                continue
+            name = match.group(2).lower()
+            if kind is bytes:
+                name = name.decode('ascii', 'ignore')
+            is_end = bool(match.group(1))
+
+            if not is_end:
+                nodes += 1
+                if self.max_nodes and nodes > self.max_nodes:
+                    # 节点过多，截断剩余部分，由解析器补全未闭合的标签
+                    parts.append(markup[last:match.start()])
+                    last = len(markup)
+                    stats['truncated'] = 1
+                    break
+
+            rewritten = False
+            if not is_end:
+                tag = self._limit_attributes(match, kind)
+                if tag is not None:
+                    parts.append(markup[last:match.start()])
+                    parts.append(tag)
+                    last = pos
+                    rewritten = True
+                    stats['attribute_tags'] += 1
+
+            if name in _VOID_TAGS or name in _OPTIONAL_END_TAGS:
+                continue
+            self_closing = match.group(3).rstrip().endswith(slash)
+            if name in _BLOCK_TAGS and not is_end and not self_closing:
+                close = _CLOSE_RE[name][kind].search(markup, pos)
+                end = close.start() if close else len(markup)
+                if self.max_inline_bytes and end - pos > self.max_inline_bytes:
+                    parts.append(markup[last:pos])
+                    last = end
+                    stats['inline_blocks'] += 1
+                pos = close.end() if close else len(markup)
+                if close:
+                    parts.append(markup[last:pos])
+                    last = pos
+                continue
+
+            if self_closing or not self.max_depth:
+                continue
+            if is_end:
+                dropped = depth > self.max_depth
+                depth = max(0, depth - 1)
+            else:
+                depth += 1
+                dropped = depth > self.max_depth
+            if dropped:
+                # 丢弃过深的标签本身，保留其中的文本
+                if rewritten:
+                    parts.pop()
+                else:
+                    parts.append(markup[last:match.start()])
+                last = pos
+                stats['deep_tags'] += 1
+
+        if not any(stats.values()):
+            return markup, stats
+        parts.append(markup[last:])
+        logger.debug(f"HTML预处理: {stats}")
+        return _EMPTY[kind].join(parts), stats
+
+    def _limit_attributes(self, match: 're.Match', kind: type) -> Optional[Markup]:
+        """
+        属性过多或过长时重建开始标签
+        Args:
+            match: _TOKEN_RE匹配到的开始标签
+            kind: str或bytes
+        Returns:
+            只保留前max_attributes个、长度不超过max_attribute_length的属性的标签；无需处理时返回None
+        """
+        attrs = match.group(3)
+        too_long = self.max_attribute_length and len(attrs) > self.max_attribute_length
+        # 属性数不会超过等号数+空白段数，长度和数量都明显在限制内时跳过逐个解析
+        if not too_long and (not self.max_attributes or len(attrs.split()) <= self.max_attributes):
+            return None
+        found = [item.group() for item in _ATTR_RE[kind].finditer(attrs)]
+        kept = [item for item in found
+                if not self.max_attribute_length or len(item) <= self.max_attribute_length]
+        if self.max_attributes:
+            kept = kept[:self.max_attributes]
+        if len(kept) == len(found):
+            return None
+        open_, self_close, close = _TAG_PARTS[kind]
+        space = _SPACE[kind]
+        tag = open_ + match.group(2) + _EMPTY[kind].join(space + item for item in kept)
+        if attrs.rstrip().endswith(self_close[-1:]):
+            tag += self_close
+        return tag + close
+
+
+_default_scrubber = None
+
+
+def scrub_html(markup: Markup) -> Markup:
+    """
+    使用配置的限制预处理HTML，HTML_SCRUB_ENABLED为false时原样返回
+    Args:
+        markup: HTML文本或字节
+    Returns:
+        与输入同类型的HTML
+    """
+    global _default_scrubber
+    if not config.HTML_SCRUB_ENABLED:
+        return markup
+    if _default_scrubber is None:
+        _default_scrubber = HTMLScrubber()
+    return _default_scrubber.scrub(markup)
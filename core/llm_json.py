@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+从大模型回复中提取JSON
+回复常带有说明文字、```json代码块、末尾多余的逗号，或因max_tokens被截断。
+逐个候选位置用JSONDecoder.raw_decode增量解析，只解析到值结束处，不会像贪婪的
+re.search(r'\\{.*\\}')那样把两段JSON之间的文字也包进来；解析失败时去掉多余逗号、
+补全被截断的字符串和括号后再试一次
+"""
+
+import json
+import re
+from typing import Any, Iterator, Optional, Tuple
+
+_decoder = json.JSONDecoder()
+_START_RE = re.compile(r'[{\[]')
+_CLOSERS = {'{': '}', '[': ']'}
+# 最多尝试的起始位置数，避免对大量无关括号逐一解析
+_MAX_CANDIDATES = 64
+# 截断修复时最多尝试的回退位置数
+_MAX_REPAIR_ATTEMPTS = 4
+
+
+def _repair(text: str, start: int) -> Optional[Tuple[Any, int]]:
+    """
+    从start处的括号开始修复并解析一个JSON值
+    去掉}或]前多余的逗号；文本在值结束前就结束（被截断）时，保留到最后一个完整的成员
+    （如["a","b"保留"b"），丢弃之后不完整的部分并补全括号
+    Returns:
+        (解析结果, 结束位置)，无法修复时返回None
+    """
+    out = []
+    stack = []
+    in_string = escaped = False
+    # 可以截断的位置（out的长度）：字符串或括号结束处、逗号前
+    safe_lengths = []
+    end = len(text)
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            out.append(char)
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+                safe_lengths.append(len(out))
+            continue
+        if char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            stack.append(_CLOSERS[char])
+        elif char in '}]':
+            if not stack or stack[-1] != char:
+                return None
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ',':
+                out.pop()
+            stack.pop()
+            out.append(char)
+            safe_lengths.append(len(out))
+            if not stack:
+                end = index + 1
+                break
+            continue
+        elif char == ',':
+            safe_lengths.append(len(out))
+        out.append(char)
+
+    if not stack:
+        try:
+            return json.loads(''.join(out)), end
+        except json.JSONDecodeError:
+            return None
+
+    # 被截断：从最后一个完整成员开始回退，补全括号后能解析即返回
+    # （字符串结束处可能是对象的键，此时解析失败，继续回退到上一个位置）
+    for safe_length in reversed(safe_lengths[-_MAX_REPAIR_ATTEMPTS:]):
+        try:
+            return json.loads(_close(out[:safe_length])), end
+        except json.JSONDecodeError:
+            continue
+    return None
+
+
+def _close(out: list) -> str:
+    """去掉末尾的逗号，按顺序补全未闭合的括号"""
+    while out and (out[-1].isspace() or out[-1] == ','):
+        out.pop()
+    depth = []
+    in_string = escaped = False
+    for char in out:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            depth.append(_CLOSERS[char])
+        elif char in '}]':
+            depth.pop()
+    return ''.join(out) + ''.join(reversed(depth))
+
+
+def iter_json_values(text: str) -> Iterator[Tuple[int, Any]]:
+    """
+    按出现顺序逐个解析文本中的顶层JSON对象或数组
+    Args:
+        text: 大模型回复
+    Returns:
+        (起始位置, 解析结果) 的迭代器
+    """
+    if not text:
+        return
+    pos = 0
+    for _ in range(_MAX_CANDIDATES):
+        match = _START_RE.search(text, pos)
+        if match is None:
+            return
+        start = match.start()
+        try:
+            value, end = _decoder.raw_decode(text, start)
+        except json.JSONDecodeError:
+            repaired = _repair(text, start)
+            if repaired is None:
+                pos = start + 1
+                continue
+            value, end = repaired
+        yield start, value
+        pos = end
+
+
+def extract_json(text: str, expect: type = None, default: Any = None) -> Any:
+    """
+    提取回复中第一个JSON值
+    Args:
+        text: 大模型回复
+        expect: 期望的类型（dict或list）；顶层值类型不符时在其内部按层查找，
+            如expect=list时{"categories": [...]}返回其中的列表
+        default: 没有找到时的返回值
+    Returns:
+        解析结果
+    """
+    for _, value in iter_json_values(text):
+        if expect is None:
+            return value
+        found = _find_nested(value, expect)
+        if found is not None:
+            return found
+    return default
+
+
+def _find_nested(value: Any, expect: type) -> Any:
+    """按层（广度优先）查找第一个expect类型的值，包括value本身，找不到时返回None"""
+    queue = [value]
+    for item in queue:
+        if isinstance(item, expect):
+            return item
+        if isinstance(item, dict):
+            queue.extend(item.values())
+        elif isinstance(item, list):
+            queue.extend(item)
+    return None
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+图片和视频提取
+cleanup_html、HTMLDocument和内容提取智能体共用的实现：支持srcset（取分辨率最高的候选）、
+懒加载属性（data-src等）和<picture>，相对地址统一用带缓存的urljoin补全并去重
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, List, Tuple
+from urllib.parse import urljoin
+
+from bs4 import Tag
+
+# 需要交给MediaCollector处理的标签
+MEDIA_TAGS = ('picture', 'img', 'video', 'iframe')
+
+# 懒加载插件常用的真实地址属性，按优先级排列
+_LAZY_SRC_ATTRS = ('data-src', 'data-original', 'data-lazy-src', 'data-lazyload', 'data-actualsrc', 'data-url')
+_SRCSET_ATTRS = ('data-srcset', 'srcset')
+# srcset按HTML规范逐个解析：候选之间的分隔符、地址（到空白为止，地址本身可以含逗号）、
+# 描述符（到括号外的逗号为止）
+_SRCSET_SEPARATOR_RE = re.compile(r'[\s,]*')
+_SRCSET_URL_RE = re.compile(r'\S+')
+_SRCSET_DESCRIPTOR_RE = re.compile(r'[^,(]*(?:\([^)]*\)?[^,(]*)*')
+_SKIP_SCHEMES = ('data:', 'javascript:', 'about:', 'blob:')
+
+
+@lru_cache(maxsize=8192)
+def resolve_url(base_url: str, url: str) -> str:
+    """
+    把相对地址补全为绝对地址
+    Args:
+        base_url: 页面URL
+        url: 属性中的地址
+    Returns:
+        绝对地址，空地址或data:/javascript:等地址返回空字符串
+    """
+    url = (url or '').strip()
+    if not url or url.lower().startswith(_SKIP_SCHEMES):
+        return ''
+    if url.startswith('//') and not base_url:
+        return 'https:' + url
+    return urljoin(base_url, url) if base_url else url
+
+
+def parse_srcset(srcset: str) -> List[Tuple[str, float]]:
+    """
+    解析srcset
+    Args:
+        srcset: 如 "a.jpg 480w, b.jpg 960w" 或 "a.jpg 1x, b.jpg 2x"，
+            地址中的逗号（如 "img,w_200.jpg 200w"）不作为分隔符
+    Returns:
+        [(地址, 宽度或像素密度)]，没有描述符时按1x处理
+    """
+    candidates = []
+    pos = 0
+    length = len(srcset)
+    while True:
+        pos = _SRCSET_SEPARATOR_RE.match(srcset, pos).end()
+        if pos >= length:
+            break
+        url = _SRCSET_URL_RE.match(srcset, pos).group()
+        pos += len(url)
+        descriptors = []
+        if url.endswith(','):
+            # 地址末尾的逗号是分隔符，该候选没有描述符
+            url = url.rstrip(',')
+        else:
+            match = _SRCSET_DESCRIPTOR_RE.match(srcset, pos)
+            descriptors = match.group().split()
+            pos = match.end() + 1
+        size = 1.0
+        if descriptors:
+            descriptor = descriptors[-1].lower()
+            try:
+                size = float(descriptor[:-1]) if descriptor[-1:] in ('w', 'x') else 1.0
+            except ValueError:
+                size = 1.0
+        if url:
+            candidates.append((url, size))
+    return candidates
+
+
+def best_srcset_candidate(srcset: str) -> str:
+    """返回srcset中宽度或像素密度最大的地址"""
+    candidates = [item for item in parse_srcset(srcset) if not item[0].lower().startswith(_SKIP_SCHEMES)]
+    if not candidates:
+        return ''
+    return max(candidates, key=lambda item: item[1])[0]
+
+
+def _image_source(tag: Tag) -> str:
+    """元素的图片地址：srcset中最大的候选优先，其次是懒加载属性和src"""
+    for attr in _SRCSET_ATTRS:
+        if tag.get(attr):
+            url = best_srcset_candidate(tag[attr])
+            if url:
+                return url
+    for attr in _LAZY_SRC_ATTRS + ('src',):
+        url = tag.get(attr)
+        if url and not url.strip().lower().startswith(_SKIP_SCHEMES):
+            return url
+    return ''
+
+
+class MediaCollector:
+    """按文档顺序收集图片和视频"""
+
+    def __init__(self, base_url: str = ""):
+        """
+        初始化收集器
+        Args:
+            base_url: 页面URL，用于补全相对地址
+        """
+        self.base_url = base_url or ""
+        self.images: List[Dict[str, str]] = []
+        self.videos: List[Dict[str, str]] = []
+        self._seen_images = set()
+        self._seen_videos = set()
+        self._handled = set()
+
+    @property
+    def image_urls(self) -> List[str]:
+        return [image['original_url'] for image in self.images]
+
+    def add(self, tag: Tag) -> None:
+        """
+        处理一个媒体标签（MEDIA_TAGS中的标签），其他标签忽略
+        Args:
+            tag: 文档树中的元素，<picture>应先于其中的<img>传入
+        """
+        name = tag.name
+        if name == 'img':
+            if id(tag) not in self._handled:
+                self._add_image(_image_source(tag), tag.get('alt', ''))
+        elif name == 'picture':
+            self._add_picture(tag)
+        elif name in ('video', 'iframe'):
+            self._add_video(tag)
+
+    def _add_image(self, src: str, alt: str) -> None:
+        url = resolve_url(self.base_url, src)
+        if url and url not in self._seen_images:
+            self._seen_images.add(url)
+            self.images.append({'original_url': url, 'alt_text': alt})
+
+    def _add_picture(self, picture: Tag) -> None:
+        """<picture>中所有<source>和<img>的候选合并，取最大的一个"""
+        candidates = []
+        img = picture.find('img')
+        for source in picture.find_all('source'):
+            for attr in _SRCSET_ATTRS:
+                if source.get(attr):
+                    candidates.extend(parse_srcset(source[attr]))
+                    break
+        if img is not None:
+            self._handled.add(id(img))
+            for attr in _SRCSET_ATTRS:
+                if img.get(attr):
+                    candidates.extend(parse_srcset(img[attr]))
+                    break
+        candidates = [item for item in candidates if not item[0].lower().startswith(_SKIP_SCHEMES)]
+        if candidates:
+            src = max(candidates, key=lambda item: item[1])[0]
+        else:
+            src = _image_source(img) if img is not None else ''
+        self._add_image(src, img.get('alt', '') if img is not None else '')
+
+    def _add_video(self, tag: Tag) -> None:
+        src = tag.get('src') or tag.get('data-src') or ''
+        if not src and tag.name == 'video':
+            source = tag.find('source', src=True)
+            src = source['src'] if source is not None else ''
+        url = resolve_url(self.base_url, src)
+        if url and url not in self._seen_videos:
+            self._seen_videos.add(url)
+            self.videos.append({
+                'original_url': url,
+                'poster_url': resolve_url(self.base_url, tag.get('poster', ''))
+            })
+
+
+def extract_media(soup: Tag, base_url: str = "") -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+    """
+    从文档树中提取图片和视频
+    Args:
+        soup: 文档树或其子树
+        base_url: 页面URL
+    Returns:
+        (images, videos) 图片为 {original_url, alt_text}，视频为 {original_url, poster_url}
+    """
+    collector = MediaCollector(base_url)
+    for tag in soup.find_all(MEDIA_TAGS):
+        collector.add(tag)
+    return collector.images, collector.videos
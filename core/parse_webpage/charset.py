@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+网页字符集分级解析
+依次尝试 BOM -> 响应头 -> <meta charset>/http-equiv -> 同站点历史结果 -> 前缀统计探测，
+只有前面都拿不到时才对有限长度的前缀做统计探测，避免apparent_encoding扫描整个正文
+"""
+
+import re
+import codecs
+import logging
+import threading
+from collections import OrderedDict
+from typing import Mapping, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# <meta>只在文档开头几KB内查找
+META_SNIFF_BYTES = 8 * 1024
+# 统计探测只看前64KB
+DETECT_SNIFF_BYTES = 64 * 1024
+
+_BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32-le'),
+    (codecs.BOM_UTF32_BE, 'utf-32-be'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16-le'),
+    (codecs.BOM_UTF16_BE, 'utf-16-be'),
+)
+
+# 同时匹配 <meta charset="x"> 和 <meta http-equiv="Content-Type" content="text/html; charset=x">
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+?charset\s*=\s*["\']?\s*([a-zA-Z0-9_.:-]+)', re.I)
+_HEADER_CHARSET_RE = re.compile(r'charset\s*=\s*["\']?\s*([a-zA-Z0-9_.:-]+)', re.I)
+
+# 按浏览器的习惯把常见标签映射到超集编码
+_ENCODING_ALIASES = {
+    'gb2312': 'gb18030',
+    'gbk': 'gb18030',
+    'x-gbk': 'gb18030',
+    'iso-8859-1': 'cp1252',
+    'latin1': 'cp1252',
+    'latin-1': 'cp1252',
+    'ascii': 'cp1252',
+    'us-ascii': 'cp1252',
+    'big5': 'big5hkscs',
+}
+
+
+def normalize_encoding(label: Optional[str]) -> Optional[str]:
+    """
+    规范化编码名称，无法识别的编码返回None
+    Args:
+        label: 响应头或meta中声明的编码名称
+    Returns:
+        str: Python可用的编码名称
+    """
+    if not label:
+        return None
+    label = label.strip().strip('"\'').lower()
+    label = _ENCODING_ALIASES.get(label, label)
+    try:
+        codecs.lookup(label)
+    except LookupError:
+        return None
+    return label
+
+
+class CharsetResolver:
+    """网页字符集分级解析器，按站点缓存解析结果"""
+
+    def __init__(self, max_hosts: int = 10000):
+        """
+        初始化字符集解析器
+        Args:
+            max_hosts: 站点编码缓存的最大条目数
+        """
+        self.max_hosts = max_hosts
+        self._host_cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def from_bom(prefix: bytes) -> Optional[str]:
+        for bom, encoding in _BOMS:
+            if prefix.startswith(bom):
+                return encoding
+        return None
+
+    @staticmethod
+    def from_headers(headers: Mapping[str, str]) -> Optional[str]:
+        content_type = (headers or {}).get('Content-Type') or ''
+        match = _HEADER_CHARSET_RE.search(content_type)
+        return normalize_encoding(match.group(1)) if match else None
+
+    @staticmethod
+    def from_meta(prefix: bytes) -> Optional[str]:
+        match = _META_CHARSET_RE.search(prefix[:META_SNIFF_BYTES])
+        return normalize_encoding(match.group(1).decode('ascii', 'ignore')) if match else None
+
+    @staticmethod
+    def detect(prefix: bytes) -> Optional[str]:
+        """对有限长度的前缀做字符集统计探测"""
+        result = requests.compat.chardet.detect(prefix[:DETECT_SNIFF_BYTES])
+        return normalize_encoding(result.get('encoding'))
+
+    def _host_encoding(self, host: str) -> Optional[str]:
+        with self._lock:
+            encoding = self._host_cache.get(host)
+            if encoding:
+                self._host_cache.move_to_end(host)
+            return encoding
+
+    def _remember(self, host: str, encoding: str):
+        if not host:
+            return
+        with self._lock:
+            self._host_cache[host] = encoding
+            self._host_cache.move_to_end(host)
+            while len(self._host_cache) > self.max_hosts:
+                self._host_cache.popitem(last=False)
+
+    def resolve(self, prefix: bytes, headers: Mapping[str, str] = None, url: str = '') -> Tuple[str, str]:
+        """
+        解析正文编码
+        Args:
+            prefix: 正文开头的字节（至少包含前几KB）
+            headers: 响应头
+            url: 页面URL，用于按站点缓存结果
+        Returns:
+            (encoding, source) 元组，source为 bom/header/meta/host/detect/default
+        """
+        host = (urlparse(url).hostname or '').lower() if url else ''
+
+        encoding = self.from_bom(prefix)
+        if encoding:
+            return encoding, 'bom'
+
+        for source, finder in (('header', lambda: self.from_headers(headers)),
+                               ('meta', lambda: self.from_meta(prefix))):
+            encoding = finder()
+            if encoding:
+                self._remember(host, encoding)
+                return encoding, source
+
+        encoding = self._host_encoding(host) if host else None
+        if encoding:
+            return encoding, 'host'
+
+        encoding = self.detect(prefix)
+        if encoding:
+            self._remember(host, encoding)
+            return encoding, 'detect'
+        return 'utf-8', 'default'
+
+
+# 进程内共享的解析器，站点编码缓存在所有请求之间复用
+charset_resolver = CharsetResolver()
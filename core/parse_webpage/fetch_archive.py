@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+获取结果的录制与回放
+录制模式把每次获取的响应（URL、响应头、正文、耗时）追加写入WARC归档（每条记录一个gzip成员），
+回放模式从归档读取响应，可按录制时的耗时模拟延迟，用于离线、可复现地测试爬取和解析性能
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import zlib
+import gzip
+import logging
+import threading
+from http import HTTPStatus
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows下没有fcntl，退化为进程内锁
+    fcntl = None
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config import config
+from core.parse_webpage.fetch_response import FetchResponse
+from core.parse_webpage.response_cache import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+# 扩展的WARC头，保存编码、工具、耗时等获取元数据
+META_HEADER = 'WebExtracto-Fetch'
+# 正文已经解压，去掉这些头使归档中的HTTP报文与正文一致
+_DROP_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length'}
+_SCAN_CHUNK = 256 * 1024
+
+
+def _http_block(response: FetchResponse) -> bytes:
+    """把响应序列化为HTTP报文"""
+    try:
+        reason = HTTPStatus(response.status_code).phrase
+    except ValueError:
+        reason = ''
+    lines = [f"HTTP/1.1 {response.status_code} {reason}".rstrip()]
+    for name, value in response.headers.items():
+        if name.lower() not in _DROP_HEADERS:
+            lines.append(f"{name}: {value}")
+    lines.append(f"Content-Length: {len(response.content)}")
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('utf-8') + response.content
+
+
+def _warc_record(warc_type: str, headers: Dict[str, str], block: bytes) -> bytes:
+    head = [
+        'WARC/1.1',
+        f'WARC-Type: {warc_type}',
+        f'WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>',
+        f"WARC-Date: {datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')}",
+    ]
+    head.extend(f"{name}: {value}" for name, value in headers.items())
+    head.append(f'Content-Length: {len(block)}')
+    return ('\r\n'.join(head) + '\r\n\r\n').encode('utf-8') + block + b'\r\n\r\n'
+
+
+def _parse_record(data: bytes) -> Tuple[Dict[str, str], bytes]:
+    """解析一条WARC记录，返回 (WARC头, 内容块)"""
+    head, _, rest = data.partition(b'\r\n\r\n')
+    headers = {}
+    for line in head.decode('utf-8', 'replace').split('\r\n')[1:]:
+        name, _, value = line.partition(':')
+        headers[name.strip()] = value.strip()
+    return headers, rest[:int(headers.get('Content-Length', len(rest)))]
+
+
+def _parse_http_block(block: bytes) -> Tuple[int, Dict[str, str], bytes]:
+    """解析HTTP报文，返回 (状态码, 响应头, 正文)"""
+    head, _, body = block.partition(b'\r\n\r\n')
+    lines = head.decode('utf-8', 'replace').split('\r\n')
+    status_code = int(lines[0].split(' ')[1])
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(':')
+        if name.strip().lower() != 'content-length':
+            headers[name.strip()] = value.strip()
+    return status_code, headers, body
+
+
+class FetchArchive:
+    """WARC格式的获取结果归档"""
+
+    def __init__(self, path: str = None, latency_scale: float = None):
+        """
+        初始化归档
+        Args:
+            path: 归档文件路径，默认取FETCH_ARCHIVE_PATH配置
+            latency_scale: 回放时按录制耗时的多少倍模拟延迟，0表示不模拟，默认取FETCH_ARCHIVE_LATENCY配置
+        """
+        self.path = path or config.FETCH_ARCHIVE_PATH
+        self.latency_scale = config.FETCH_ARCHIVE_LATENCY if latency_scale is None else latency_scale
+        self._lock = threading.Lock()
+        self._index: Optional[Dict[str, Tuple[int, int]]] = None
+
+    def record(self, response: FetchResponse):
+        """
+        追加写入一条响应记录，整条记录压缩为一个gzip成员后一次写入
+        Args:
+            response: 获取结果
+        """
+        meta = {
+            'final_url': response.final_url,
+            'encoding': response.encoding,
+            'tool': response.tool,
+            'truncated': response.truncated,
+            'retries': response.retries,
+            'redirects': response.redirects,
+            'timings': response.timings
+        }
+        data = gzip.compress(_warc_record('response', {
+            'WARC-Target-URI': response.url,
+            'Content-Type': 'application/http;msgtype=response',
+            META_HEADER: json.dumps(meta, ensure_ascii=True)
+        }, _http_block(response)))
+
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, 'ab') as f:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    f.write(data)
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(f, fcntl.LOCK_UN)
+            self._index = None
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        """扫描归档，建立 规范化URL -> (偏移, 长度) 索引，同一URL以最后一条记录为准"""
+        index = {}
+        if not os.path.exists(self.path):
+            logger.warning(f"回放归档不存在: {self.path}")
+            return index
+
+        with open(self.path, 'rb') as f:
+            offset = 0
+            buffer = b''
+            while True:
+                buffer = buffer or f.read(_SCAN_CHUNK)
+                if not buffer:
+                    break
+                decompressor = zlib.decompressobj(wbits=31)
+                parts = []
+                length = 0
+                while True:
+                    parts.append(decompressor.decompress(buffer))
+                    if decompressor.eof:
+                        length += len(buffer) - len(decompressor.unused_data)
+                        buffer = decompressor.unused_data
+                        break
+                    length += len(buffer)
+                    buffer = f.read(_SCAN_CHUNK)
+                    if not buffer:
+                        logger.warning(f"回放归档末尾的记录不完整，已忽略: {self.path}")
+                        return index
+                headers, _ = _parse_record(b''.join(parts))
+                if headers.get('WARC-Type') == 'response' and headers.get('WARC-Target-URI'):
+                    index[canonicalize_url(headers['WARC-Target-URI'])] = (offset, length)
+                offset += length
+        logger.info(f"回放归档已加载 {len(index)} 个页面: {self.path}")
+        return index
+
+    def replay(self, url: str) -> Optional[FetchResponse]:
+        """
+        从归档读取响应，按配置模拟录制时的耗时
+        Args:
+            url: 目标网页URL
+        Returns:
+            FetchResponse，归档中没有该URL时返回None
+        """
+        start = time.perf_counter()
+        with self._lock:
+            if self._index is None:
+                self._index = self._scan()
+            entry = self._index.get(canonicalize_url(url))
+        if entry is None:
+            return None
+
+        offset, length = entry
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            headers, block = _parse_record(gzip.decompress(f.read(length)))
+        meta = json.loads(headers.get(META_HEADER) or '{}')
+        status_code, http_headers, body = _parse_http_block(block)
+
+        timings = dict(meta.get('timings') or {})
+        if self.latency_scale > 0:
+            delay = timings.get('fetch', 0.0) * self.latency_scale - (time.perf_counter() - start)
+            if delay > 0:
+                time.sleep(delay)
+        timings['fetch'] = time.perf_counter() - start
+
+        return FetchResponse(
+            url=url,
+            content=body,
+            encoding=meta.get('encoding', 'utf-8'),
+            final_url=meta.get('final_url', url),
+            headers=http_headers,
+            status_code=status_code,
+            tool=meta.get('tool', ''),
+            truncated=meta.get('truncated', False),
+            timings=timings,
+            retries=meta.get('retries', 0),
+            redirects=meta.get('redirects', 0)
+        )
+
+
+_shared_archive = None
+_shared_archive_lock = threading.Lock()
+
+
+def get_fetch_archive() -> FetchArchive:
+    """获取进程内共享的归档实例"""
+    global _shared_archive
+    if _shared_archive is None:
+        with _shared_archive_lock:
+            if _shared_archive is None:
+                _shared_archive = FetchArchive()
+    return _shared_archive
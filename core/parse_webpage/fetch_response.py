@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+获取层的统一返回对象
+保存原始字节、编码、最终URL、响应头和耗时，文本解码和HTML解析都按需进行且只做一次
+"""
+
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from bs4 import BeautifulSoup
+
+from core.parse_webpage.fetch_timing import PHASES
+from core.parser_backend import make_soup
+
+_NON_SPACE_RE = re.compile(rb'\S')
+
+
+@dataclass
+class FetchResponse:
+    """网页获取结果"""
+    url: str
+    content: bytes = b''
+    encoding: str = 'utf-8'
+    final_url: str = ''
+    headers: Dict[str, str] = field(default_factory=dict)
+    status_code: int = 200
+    tool: str = ''
+    truncated: bool = False
+    from_cache: bool = False
+    timings: Dict[str, float] = field(default_factory=dict)
+    retries: int = 0
+    redirects: int = 0
+    attempts: List[Dict[str, Any]] = field(default_factory=list)
+    _text: Optional[str] = field(default=None, init=False, repr=False)
+    _soup: Optional[BeautifulSoup] = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        if not self.final_url:
+            self.final_url = self.url
+
+    def __bool__(self) -> bool:
+        """正文为空或只有空白时视为获取失败，调用方可以直接用if response判断并降级到下一个工具"""
+        return _NON_SPACE_RE.search(self.content) is not None
+
+    @property
+    def text(self) -> str:
+        """解码后的HTML文本，首次访问时解码"""
+        if self._text is None:
+            self._text = self.content.decode(self.encoding or 'utf-8', errors='replace')
+        return self._text
+
+    @property
+    def soup(self) -> BeautifulSoup:
+        """解析后的文档树，首次访问时解析，之后复用同一棵树"""
+        if self._soup is None:
+            start = time.perf_counter()
+            self._soup = make_soup(self.text)
+            self.timings['parse'] = time.perf_counter() - start
+        return self._soup
+
+    @property
+    def is_parsed(self) -> bool:
+        return self._soup is not None
+
+    def timing_report(self) -> Dict[str, Any]:
+        """
+        本次获取的耗时分解
+        Returns:
+            dict: 各阶段耗时（秒）、字节数、使用的工具、重试和重定向次数，以及每个尝试过的工具的耗时
+        """
+        return {
+            'url': self.url,
+            'tool': self.tool,
+            'from_cache': self.from_cache,
+            'bytes': len(self.content),
+            'retries': self.retries,
+            'redirects': self.redirects,
+            'attempts': self.attempts,
+            'phases': {phase: round(self.timings[phase], 4) for phase in PHASES if phase in self.timings}
+        }
+
+    @classmethod
+    def from_text(cls, url: str, html: str, **kwargs) -> 'FetchResponse':
+        """由浏览器渲染得到的HTML文本构造（统一按UTF-8保存字节）"""
+        response = cls(url=url, content=html.encode('utf-8'), encoding='utf-8', **kwargs)
+        response._text = html
+        return response
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+获取耗时分解
+通过带计时的urllib3连接类记录建连和TLS握手耗时，供RequestsTool汇总为每次获取的阶段耗时，
+并提供按一次爬取汇总的统计。DNS解析发生在建连的socket创建过程中，计入connect阶段
+"""
+
+import time
+import threading
+from typing import Any, Dict, Iterable, List
+
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.connection import HTTPConnection, HTTPSConnection
+from requests.packages.urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# 汇总时参与累加的阶段
+PHASES = ('queue', 'connect', 'tls', 'ttfb', 'download', 'navigate', 'render', 'cache', 'parse', 'clean', 'fetch')
+
+_local = threading.local()
+
+
+def start_connection_timing() -> Dict[str, float]:
+    """开始记录当前线程上的建连耗时，返回被连接类累加写入的字典"""
+    _local.timings = {'connect': 0.0, 'tls': 0.0}
+    return _local.timings
+
+
+def stop_connection_timing():
+    _local.timings = None
+
+
+def _add(phase: str, elapsed: float):
+    timings = getattr(_local, 'timings', None)
+    if timings is not None:
+        timings[phase] = timings.get(phase, 0.0) + elapsed
+
+
+class TimedHTTPConnection(HTTPConnection):
+    """记录DNS+TCP建连耗时的HTTP连接"""
+
+    def _new_conn(self):
+        start = time.perf_counter()
+        try:
+            return super()._new_conn()
+        finally:
+            _add('connect', time.perf_counter() - start)
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+    """记录DNS+TCP建连耗时，connect中除建连外的部分（代理隧道+TLS握手）计入tls"""
+
+    def _new_conn(self):
+        start = time.perf_counter()
+        try:
+            return super()._new_conn()
+        finally:
+            self._socket_elapsed = time.perf_counter() - start
+            _add('connect', self._socket_elapsed)
+
+    def connect(self):
+        self._socket_elapsed = 0.0
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            _add('tls', time.perf_counter() - start - self._socket_elapsed)
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """使用带计时连接类的HTTPAdapter，直连和HTTP代理都生效（SOCKS代理使用自己的连接类，不计时）"""
+
+    _pool_classes = {'http': TimedHTTPConnectionPool, 'https': TimedHTTPSConnectionPool}
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = dict(self._pool_classes)
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        manager = super().proxy_manager_for(proxy, **proxy_kwargs)
+        if not proxy.lower().startswith('socks'):
+            manager.pool_classes_by_scheme = dict(self._pool_classes)
+        return manager
+
+
+def summarize_timings(records: Iterable[Dict[str, Any]], slowest: int = 5) -> Dict[str, Any]:
+    """
+    汇总一次爬取中所有页面的耗时记录
+    Args:
+        records: FetchResponse.timing_report()的返回值列表
+        slowest: 返回最慢页面的个数
+    Returns:
+        dict: 页面数、总字节数、各阶段总耗时、各工具使用次数、重试/重定向/降级次数及最慢的页面
+    """
+    records: List[Dict[str, Any]] = [r for r in records if r]
+    phases = {}
+    tools = {}
+    for record in records:
+        for phase, elapsed in record.get('phases', {}).items():
+            phases[phase] = round(phases.get(phase, 0.0) + elapsed, 4)
+        tool = record.get('tool') or 'unknown'
+        tools[tool] = tools.get(tool, 0) + 1
+
+    by_total = sorted(records, key=lambda r: r.get('phases', {}).get('fetch', 0.0), reverse=True)
+    return {
+        'pages': len(records),
+        'bytes': sum(r.get('bytes', 0) for r in records),
+        'phases': phases,
+        'tools': tools,
+        'cache_hits': sum(1 for r in records if r.get('from_cache')),
+        'retries': sum(r.get('retries', 0) for r in records),
+        'redirects': sum(r.get('redirects', 0) for r in records),
+        'fallbacks': sum(max(0, len(r.get('attempts', [])) - 1) for r in records),
+        'slowest': [
+            {'url': r.get('url'), 'tool': r.get('tool'), 'fetch': r.get('phases', {}).get('fetch', 0.0)}
+            for r in by_total[:slowest]
+        ]
+    }
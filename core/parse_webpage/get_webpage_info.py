@@ -1,90 +1,178 @@
 import os
 import sys
+import time
+import importlib
+import threading
 # 添加项目路径
 current_dir = os.path.dirname(os.path.abspath(__file__))
 parent_dir = os.path.dirname(os.path.dirname(current_dir))
 sys.path.append(parent_dir)
 
-from core.parse_webpage.selenium_tool import SeleniumTool 
-from core.parse_webpage.playwright_tool import PlaywrightScraper
-from core.parse_webpage.requests_tool import RequestsTool
+from core.parse_webpage.response_cache import get_response_cache
+from core.parse_webpage.fetch_response import FetchResponse
+from core.parse_webpage.fetch_archive import get_fetch_archive
+from config import config
 import logging
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 获取工具所在模块和类名，首次使用时才导入(selenium/playwright导入开销较大)
+_TOOL_CLASSES = {
+    'requests': ('core.parse_webpage.requests_tool', 'RequestsTool'),
+    'selenium': ('core.parse_webpage.selenium_tool', 'SeleniumTool'),
+    'playwright': ('core.parse_webpage.playwright_tool', 'PlaywrightScraper'),
+}
+_shared_tools = {}
+_shared_tools_lock = threading.Lock()
+
+
+def get_fetch_tool(name):
+    """
+    获取进程内共享的获取工具实例,首次使用时构造
+    Args:
+        name: 工具名称,可选值:'requests','selenium','playwright'
+    """
+    tool = _shared_tools.get(name)
+    if tool is None:
+        with _shared_tools_lock:
+            tool = _shared_tools.get(name)
+            if tool is None:
+                module_name, class_name = _TOOL_CLASSES[name]
+                tool = _shared_tools[name] = getattr(importlib.import_module(module_name), class_name)()
+    return tool
+
+
 class WebPageParser:
-    def __init__(self):
-        """初始化三种解析工具"""
-        self.requests_tool = RequestsTool()
-        self.selenium_tool = SeleniumTool()
-        self.rpa_tool = PlaywrightScraper()
+    # 未指定工具时的尝试顺序
+    TOOL_ORDER = ['requests', 'selenium', 'playwright']
 
-    def get_webpage_content(self, url, tool_type=None):
+    def __init__(self, use_cache=None, archive_mode=None):
         """
-        获取网页内容,可指定解析工具或按默认顺序尝试
+        初始化网页解析器,三种获取工具在首次使用时构造并在进程内共享
+        Args:
+            use_cache: 是否使用响应缓存,默认取CACHE_ENABLED配置
+            archive_mode: 录制/回放模式,可选值:'off','record','replay',默认取FETCH_ARCHIVE_MODE配置
+        """
+        self.archive_mode = (archive_mode or config.FETCH_ARCHIVE_MODE).lower()
+        self.archive = get_fetch_archive() if self.archive_mode in ('record', 'replay') else None
+        if use_cache is None:
+            use_cache = config.CACHE_ENABLED
+        # 录制要反映真实的获取过程,回放不访问网络,两种模式都不读写响应缓存
+        self.cache = get_response_cache() if use_cache and not self.archive else None
+
+    @property
+    def requests_tool(self):
+        return get_fetch_tool('requests')
+
+    @property
+    def selenium_tool(self):
+        return get_fetch_tool('selenium')
+
+    @property
+    def rpa_tool(self):
+        return get_fetch_tool('playwright')
+
+    def _fetch_with_tool(self, url, tool_type):
+        """
+        使用指定工具获取页面
+        Returns:
+            FetchResponse,失败时返回None
+        """
+        return get_fetch_tool(tool_type).fetch(url)
+
+    def _load_cached(self, url, cache_tool):
+        """从响应缓存构造FetchResponse,未命中返回None"""
+        cached = self.cache.get(url, cache_tool)
+        if not cached:
+            return None
+        body, meta = cached
+        logger.info(f"命中响应缓存: {url}")
+        return FetchResponse(
+            url=url,
+            content=body,
+            encoding=meta.get('encoding', 'utf-8'),
+            final_url=meta.get('final_url', url),
+            headers=meta.get('headers', {}),
+            status_code=meta.get('status_code', 200),
+            tool=meta.get('fetch_tool', cache_tool),
+            truncated=meta.get('truncated', False),
+            from_cache=True
+        )
+
+    def fetch(self, url, tool_type=None):
+        """
+        获取网页,优先读取响应缓存,返回未解析的原始响应
         Args:
             url: 目标网页URL
             tool_type: 指定解析工具类型,可选值:'requests','selenium','playwright',默认None表示按顺序尝试
         Returns:
-            BeautifulSoup对象或None
+            FetchResponse或None,HTML在首次访问.soup时才解析
         """
-        if tool_type == 'requests':
-            logger.info("使用requests获取页面内容...")
-            soup = self.requests_tool.get_url_content_by_requests(url)
-            if soup:
-                logger.info("使用requests成功获取页面内容")
-                return soup
-            logger.error("使用requests获取页面失败")
-            return None
-            
-        elif tool_type == 'selenium':
-            logger.info("使用selenium获取页面内容...")
-            soup = self.selenium_tool.get_page_soup(url)
-            if soup:
-                logger.info("使用selenium成功获取页面内容")
-                return soup
-            logger.error("使用selenium获取页面失败")
-            return None
-            
-        elif tool_type == 'playwright':
-            logger.info("使用playwright获取页面内容...")
-            try:
-                soup = self.rpa_tool.fetch_and_parse(url)
-                if soup:
-                    logger.info("使用playwright成功获取页面内容")
-                    return soup
-            except Exception as e:
-                logger.error(f"使用playwright获取页面失败: {str(e)}")
-                return None
-                
-        else:
-            # 按默认顺序尝试
-            # 1. 首先尝试requests
-            logger.info("尝试使用requests获取页面内容...")
-            soup = self.requests_tool.get_url_content_by_requests(url)
-            if soup:
-                logger.info("使用requests成功获取页面内容")
-                return soup
-
-            # 2. requests失败则尝试selenium
-            logger.info("requests失败,尝试使用selenium获取页面内容...")
-            soup = self.selenium_tool.get_page_soup(url)
-            if soup:
-                logger.info("使用selenium成功获取页面内容")
-                return soup
-
-            # 3. selenium失败则尝试playwright
-            logger.info("selenium失败,尝试使用playwright获取页面内容...")
+        if self.archive_mode == 'replay':
+            response = self.archive.replay(url)
+            if not response:
+                logger.error(f"回放归档中没有该页面: {url}")
+            return response
+
+        cache_tool = tool_type if tool_type in self.TOOL_ORDER else 'auto'
+        if self.cache:
+            start = time.perf_counter()
+            response = self._load_cached(url, cache_tool)
+            if response:
+                response.timings['cache'] = response.timings['fetch'] = time.perf_counter() - start
+                return response
+
+        # 记录每个尝试过的工具及耗时，用于定位降级带来的延迟
+        attempts = []
+        tools = [tool_type] if tool_type in self.TOOL_ORDER else self.TOOL_ORDER
+        for name in tools:
+            logger.info(f"使用{name}获取页面内容...")
+            start = time.perf_counter()
             try:
-                soup = self.rpa_tool.fetch_and_parse(url)
-                if soup:
-                    logger.info("使用playwright成功获取页面内容")
-                    return soup
+                response = self._fetch_with_tool(url, name)
             except Exception as e:
-                logger.error(f"使用playwright获取页面失败: {str(e)}")
-                return None
+                logger.error(f"使用{name}获取页面失败: {str(e)}")
+                response = None
+            attempts.append({'tool': name, 'ok': bool(response), 'elapsed': round(time.perf_counter() - start, 4)})
+            if response:
+                response.attempts = attempts
+                logger.info(f"使用{name}成功获取页面内容, 耗时{attempts[-1]['elapsed']:.2f}s")
+                if self.archive:
+                    self.archive.record(response)
+                if self.cache:
+                    self.cache.set(
+                        url, cache_tool, response.content, response.headers,
+                        encoding=response.encoding,
+                        final_url=response.final_url,
+                        status_code=response.status_code,
+                        fetch_tool=response.tool,
+                        truncated=response.truncated
+                    )
+                return response
+            logger.error(f"使用{name}获取页面失败")
 
         logger.error("所有方法均未能成功获取页面内容")
         return None
+
+    def get_webpage_html(self, url, tool_type=None):
+        """
+        获取网页HTML文本
+        Returns:
+            HTML文本或None
+        """
+        response = self.fetch(url, tool_type)
+        return response.text if response else None
+
+    def get_webpage_content(self, url, tool_type=None):
+        """
+        获取网页内容,可指定解析工具或按默认顺序尝试
+        Args:
+            url: 目标网页URL
+            tool_type: 指定解析工具类型,可选值:'requests','selenium','playwright',默认None表示按顺序尝试
+        Returns:
+            BeautifulSoup对象或None
+        """
+        response = self.fetch(url, tool_type)
+        return response.soup if response else None
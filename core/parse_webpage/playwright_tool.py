@@ -1,26 +1,107 @@
+import time
 import asyncio
+import logging
 from playwright.async_api import async_playwright
-from bs4 import BeautifulSoup
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from core.parse_webpage.fetch_response import FetchResponse
+from core.parse_webpage.proxy_pool import proxy_pool, parse_proxy
+from core.parse_webpage.rate_limiter import rate_limiter
+from core.parse_webpage.render_wait import RenderWaitStrategy, RENDER_PROBE_JS, DOM_QUIET_JS
+from core.parser_backend import make_soup
+
+logger = logging.getLogger(__name__)
 
 class PlaywrightScraper:
     def __init__(self, headless=True):
         self.headless = headless
 
-    async def _get_page_content(self, url):
+    @staticmethod
+    def _launch_proxy(proxy):
+        """把代理URL转换为playwright的proxy启动参数"""
+        if not proxy:
+            return None
+        parts = parse_proxy(proxy)
+        settings = {'server': f"{parts['scheme']}://{parts['host']}:{parts['port']}"}
+        if parts['username']:
+            settings['username'] = parts['username']
+            settings['password'] = parts['password'] or ''
+        return settings
+
+    async def _get_page_content(self, url, proxy=None):
         async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=self.headless)
+            browser = await p.chromium.launch(headless=self.headless, proxy=self._launch_proxy(proxy))
             page = await browser.new_page()
-            await page.goto(url)
+            # 在页面脚本执行前安装DOM变更监听
+            await page.add_init_script(RENDER_PROBE_JS)
+            start = time.perf_counter()
+            await page.goto(url, wait_until='domcontentloaded')
+            loaded_at = time.perf_counter()
+            await self._wait_for_render(page, url)
+            timings = {'navigate': loaded_at - start, 'render': time.perf_counter() - loaded_at}
             content = await page.content()
+            final_url = page.url
             await browser.close()
-            return content
+            return content, final_url, timings
+
+    async def _wait_for_render(self, page, url):
+        """
+        等待页面渲染完成：网络空闲、站点就绪选择器、DOM静默，共享一个总时长上限
+        Args:
+            page: playwright页面对象
+            url: 目标网页URL，用于匹配站点专用的就绪选择器
+        """
+        strategy = RenderWaitStrategy.for_url(url)
+        deadline = strategy.deadline()
+
+        waits = [
+            ('网络空闲', lambda timeout: page.wait_for_load_state('networkidle', timeout=timeout)),
+            ('DOM静默', lambda timeout: page.wait_for_function(
+                DOM_QUIET_JS,
+                arg=strategy.dom_quiet_ms,
+                polling=int(strategy.poll_interval * 1000),
+                timeout=timeout
+            ))
+        ]
+        if strategy.wait_selector:
+            waits.insert(1, ('选择器 ' + strategy.wait_selector,
+                             lambda timeout: page.wait_for_selector(strategy.wait_selector, timeout=timeout)))
+
+        for name, wait in waits:
+            # playwright中timeout=0表示不限时，剩余时间耗尽时直接跳过
+            timeout = strategy.remaining(deadline) * 1000
+            if timeout <= 0:
+                logger.info("页面渲染等待达到上限，使用当前内容")
+                return
+            try:
+                await wait(timeout)
+            except PlaywrightTimeoutError:
+                logger.warning(f"等待{name}超时")
 
     def parse_content(self, html_content):
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = make_soup(html_content)
         return soup
 
+    def fetch(self, url):
+        # 渲染等待时长不代表站点延迟，不参与延迟突增判断
+        proxy = proxy_pool.choose(url)
+        start = time.perf_counter()
+        try:
+            with rate_limiter.acquire(url, track_latency=False) as slot:
+                content, final_url, timings = asyncio.run(self._get_page_content(url, proxy))
+        except Exception:
+            proxy_pool.report(proxy, False)
+            raise
+        # 渲染耗时不代表代理延迟，只反馈成败
+        proxy_pool.report(proxy, True)
+        timings.update(queue=slot.queued, fetch=time.perf_counter() - start)
+        return FetchResponse.from_text(url, content, final_url=final_url, tool='playwright', timings=timings)
+
+    def fetch_content(self, url):
+        return self.fetch(url).text
+
     def fetch_and_parse(self, url):
-        html_content = asyncio.run(self._get_page_content(url))
+        html_content = self.fetch_content(url)
         soup = self.parse_content(html_content)
         return soup
 
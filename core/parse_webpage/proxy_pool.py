@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+代理池
+按代理统计延迟和错误率并加权选择，连续失败的代理被剔除并在冷却后重新探测，
+依赖Cookie的站点可以按host固定使用同一个代理
+"""
+
+import os
+import sys
+import time
+import random
+import logging
+import threading
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# 重新探测的冷却时间上限（秒）
+MAX_REPROBE_SECONDS = 3600
+# 说明出口IP被拒绝或代理本身异常的状态码，记为该代理的失败
+PROXY_FAILURE_STATUS = {403, 407, 429}
+
+
+class _ProxyStats:
+    """单个代理的健康状态"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.latency_ewma = None
+        self.ejected_until = 0.0
+        self.reprobe_seconds = 0.0
+        self.probing = False
+
+    @property
+    def weight(self) -> float:
+        """成功率（拉普拉斯平滑）除以延迟，延迟未知时按1秒计"""
+        success_rate = (self.successes + 1) / (self.successes + self.failures + 2)
+        return success_rate / max(0.05, self.latency_ewma or 1.0)
+
+
+def parse_proxy(proxy_url: str) -> Dict[str, Optional[str]]:
+    """
+    拆分代理URL，供浏览器配置使用
+    Returns:
+        dict: scheme/host/port/username/password
+    """
+    parsed = urlparse(proxy_url if '//' in proxy_url else 'http://' + proxy_url)
+    return {
+        'scheme': parsed.scheme,
+        'host': parsed.hostname,
+        'port': parsed.port or (1080 if parsed.scheme.startswith('socks') else 8080),
+        'username': parsed.username,
+        'password': parsed.password
+    }
+
+
+class ProxyPool:
+    """带健康评分和粘性分配的代理池"""
+
+    def __init__(self, proxies: List[str] = None, sticky_hosts: List[str] = None,
+                 eject_after: int = None, reprobe_seconds: float = None):
+        """
+        初始化代理池
+        Args:
+            proxies: 代理URL列表，默认取PROXY_LIST配置
+            sticky_hosts: 需要固定代理的host列表，"*"表示所有站点，默认取PROXY_STICKY_HOSTS配置
+            eject_after: 连续失败多少次后剔除
+            reprobe_seconds: 剔除后多久重新探测，之后每次探测失败翻倍
+        """
+        if proxies is None:
+            proxies = [p.strip() for p in config.PROXY_LIST.split(',') if p.strip()]
+        if sticky_hosts is None:
+            sticky_hosts = [h.strip().lower() for h in config.PROXY_STICKY_HOSTS.split(',') if h.strip()]
+        self.eject_after = eject_after or config.PROXY_EJECT_AFTER
+        self.reprobe_seconds = reprobe_seconds or config.PROXY_REPROBE_SECONDS
+        self.sticky_hosts = set(sticky_hosts)
+        self._proxies = {url: _ProxyStats(url) for url in proxies}
+        self._sticky: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def __bool__(self):
+        return bool(self._proxies)
+
+    def _is_sticky(self, host: str) -> bool:
+        return '*' in self.sticky_hosts or host in self.sticky_hosts
+
+    def _available(self, stats: _ProxyStats, now: float) -> bool:
+        if stats.ejected_until <= 0:
+            return True
+        # 冷却结束后放行一个探测请求
+        return stats.ejected_until <= now and not stats.probing
+
+    def choose(self, url: str) -> Optional[str]:
+        """
+        为一次请求选择代理
+        Args:
+            url: 目标URL
+        Returns:
+            代理URL；未配置代理或全部被剔除时返回None（直连）
+        """
+        if not self._proxies:
+            return None
+        host = (urlparse(url).hostname or '').lower()
+        now = time.monotonic()
+        with self._lock:
+            sticky = self._sticky.get(host)
+            if sticky and self._proxies[sticky].ejected_until <= 0:
+                return sticky
+
+            candidates = [s for s in self._proxies.values() if self._available(s, now)]
+            if not candidates:
+                logger.warning("所有代理均已被剔除，本次请求直连")
+                return None
+
+            chosen = random.choices(candidates, weights=[s.weight for s in candidates])[0]
+            if chosen.ejected_until > 0:
+                chosen.probing = True
+                logger.info(f"重新探测代理 {chosen.url}")
+            if self._is_sticky(host):
+                self._sticky[host] = chosen.url
+            return chosen.url
+
+    def report(self, proxy: Optional[str], success: bool, latency: float = None):
+        """
+        反馈代理的使用结果
+        Args:
+            proxy: choose返回的代理URL
+            success: 请求是否成功（连接失败、超时、429/407等视为失败）
+            latency: 请求耗时（秒）
+        """
+        if not proxy or proxy not in self._proxies:
+            return
+        with self._lock:
+            stats = self._proxies[proxy]
+            stats.probing = False
+            if success:
+                stats.successes += 1
+                stats.consecutive_failures = 0
+                stats.ejected_until = 0.0
+                stats.reprobe_seconds = 0.0
+                if latency is not None:
+                    stats.latency_ewma = latency if stats.latency_ewma is None else 0.8 * stats.latency_ewma + 0.2 * latency
+                return
+
+            stats.failures += 1
+            stats.consecutive_failures += 1
+            if stats.ejected_until > 0 or stats.consecutive_failures >= self.eject_after:
+                stats.reprobe_seconds = min(MAX_REPROBE_SECONDS, stats.reprobe_seconds * 2 or self.reprobe_seconds)
+                stats.ejected_until = time.monotonic() + stats.reprobe_seconds
+                # 被剔除的代理不再承担粘性站点
+                for host in [h for h, p in self._sticky.items() if p == proxy]:
+                    del self._sticky[host]
+                logger.warning(f"代理 {proxy} 已剔除，{stats.reprobe_seconds:.0f}秒后重新探测")
+
+    def release(self, proxy: Optional[str]):
+        """
+        请求结束时调用（无论是否已经report），清除探测标记，
+        避免请求因未预期的异常中断时该代理一直处于探测中而不再被探测
+        Args:
+            proxy: choose返回的代理URL
+        """
+        if not proxy or proxy not in self._proxies:
+            return
+        with self._lock:
+            self._proxies[proxy].probing = False
+
+    def stats(self) -> List[dict]:
+        """返回所有代理的当前状态"""
+        with self._lock:
+            return [{
+                'proxy': s.url,
+                'successes': s.successes,
+                'failures': s.failures,
+                'latency_ewma': s.latency_ewma,
+                'ejected': s.ejected_until > 0,
+                'weight': s.weight
+            } for s in self._proxies.values()]
+
+
+# 进程内共享的代理池
+proxy_pool = ProxyPool()
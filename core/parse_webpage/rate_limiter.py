@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按站点的自适应限流器
+每个host一个令牌桶控制请求速率，并用AIMD调整并发上限：
+响应健康时加性增加，遇到429/5xx、连接错误或延迟突增时乘性减少。
+requests、浏览器和搜索引擎共用同一个实例，使每个站点的总吞吐保持在它能承受的水平
+"""
+
+import os
+import sys
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Mapping, Optional
+from urllib.parse import urlparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# 触发乘性减少的状态码
+THROTTLE_STATUS = {429, 500, 502, 503, 504}
+# Retry-After最多暂停的秒数
+MAX_PAUSE = 60.0
+
+
+class _HostState:
+    """单个站点的限流状态"""
+
+    def __init__(self, rate: float, concurrency: float):
+        self.rate = rate                  # 令牌生成速率（请求/秒）
+        self.tokens = 1.0
+        self.last_refill = time.monotonic()
+        self.concurrency = concurrency    # 并发上限（浮点，向下取整使用）
+        self.in_flight = 0
+        self.latency_ewma = None          # 健康响应的延迟基线
+        self.samples = 0
+        self.paused_until = 0.0
+        self.last_decrease = 0.0
+
+    def refill(self, now: float):
+        burst = max(1.0, self.rate)
+        self.tokens = min(burst, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+
+class _Slot:
+    """一次请求占用的并发槽位，请求结束后通过record反馈结果"""
+
+    def __init__(self, limiter: 'HostRateLimiter', host: str, track_latency: bool):
+        self.limiter = limiter
+        self.host = host
+        self.track_latency = track_latency
+        self.start = time.monotonic()
+        self.queued = 0.0
+        self.recorded = False
+
+    def record(self, status_code: Optional[int] = None, headers: Mapping[str, str] = None, error: bool = False):
+        """
+        反馈本次请求结果
+        Args:
+            status_code: HTTP状态码，浏览器等拿不到状态码时传None
+            headers: 响应头，用于读取Retry-After
+            error: 是否为连接错误/超时等失败
+        """
+        if self.recorded:
+            return
+        self.recorded = True
+        latency = time.monotonic() - self.start if self.track_latency else None
+        self.limiter._feedback(self.host, status_code, headers, error, latency)
+
+
+class HostRateLimiter:
+    """按站点的令牌桶+AIMD并发限流器"""
+
+    def __init__(self, rate: float = None, max_rate: float = None,
+                 concurrency: int = None, max_concurrency: int = None,
+                 spike_factor: float = 3.0, enabled: bool = None):
+        """
+        初始化限流器
+        Args:
+            rate: 每个站点的初始请求速率（请求/秒）
+            max_rate: 速率上限
+            concurrency: 每个站点的初始并发上限
+            max_concurrency: 并发上限的最大值
+            spike_factor: 延迟超过基线多少倍视为延迟突增
+            enabled: 是否启用，默认取RATE_LIMIT_ENABLED配置
+        """
+        self.initial_rate = rate or config.RATE_LIMIT_RPS
+        self.max_rate = max_rate or config.RATE_LIMIT_MAX_RPS
+        self.min_rate = min(0.2, self.initial_rate)
+        self.initial_concurrency = concurrency or config.RATE_LIMIT_CONCURRENCY
+        self.max_concurrency = max_concurrency or config.RATE_LIMIT_MAX_CONCURRENCY
+        self.spike_factor = spike_factor
+        self.enabled = config.RATE_LIMIT_ENABLED if enabled is None else enabled
+        self._hosts: Dict[str, _HostState] = {}
+        self._cond = threading.Condition()
+
+    @staticmethod
+    def host_of(url_or_host: str) -> str:
+        if '//' in url_or_host:
+            return (urlparse(url_or_host).hostname or '').lower()
+        return url_or_host.lower()
+
+    def _state(self, host: str) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostState(self.initial_rate, self.initial_concurrency)
+        return state
+
+    @contextmanager
+    def acquire(self, url_or_host: str, track_latency: bool = True):
+        """
+        申请访问某个站点，阻塞直到令牌和并发槽位都可用
+        Args:
+            url_or_host: 目标URL或host
+            track_latency: 是否用本次耗时做延迟突增判断（浏览器渲染等待不宜计入）
+        Yields:
+            _Slot: 请求结束前调用slot.record反馈结果；抛出异常且未反馈时按错误处理
+        """
+        host = self.host_of(url_or_host)
+        if not self.enabled or not host:
+            slot = _Slot(self, host, track_latency)
+            slot.recorded = True
+            yield slot
+            return
+
+        queued_at = time.monotonic()
+        with self._cond:
+            state = self._state(host)
+            while True:
+                now = time.monotonic()
+                state.refill(now)
+                wait = 0.0
+                if state.paused_until > now:
+                    wait = state.paused_until - now
+                elif state.in_flight >= max(1, int(state.concurrency)):
+                    wait = None
+                elif state.tokens < 1:
+                    wait = (1 - state.tokens) / state.rate
+                else:
+                    state.tokens -= 1
+                    state.in_flight += 1
+                    break
+                self._cond.wait(wait)
+
+        slot = _Slot(self, host, track_latency)
+        slot.queued = slot.start - queued_at
+        try:
+            yield slot
+        except Exception:
+            slot.record(error=True)
+            raise
+        finally:
+            slot.record()
+            with self._cond:
+                state.in_flight -= 1
+                self._cond.notify_all()
+
+    def _feedback(self, host: str, status_code: Optional[int], headers: Optional[Mapping[str, str]],
+                  error: bool, latency: Optional[float]):
+        if not self.enabled or not host:
+            return
+        with self._cond:
+            state = self._state(host)
+            now = time.monotonic()
+            throttled = error or status_code in THROTTLE_STATUS
+            spike = (
+                latency is not None
+                and state.latency_ewma is not None
+                and state.samples >= 5
+                and latency > self.spike_factor * state.latency_ewma
+            )
+
+            if status_code in (429, 503) and headers:
+                retry_after = headers.get('Retry-After')
+                if retry_after and retry_after.strip().isdigit():
+                    state.paused_until = max(state.paused_until, now + min(MAX_PAUSE, float(retry_after)))
+
+            if throttled or spike:
+                # 一个延迟周期内只减少一次，避免同一波并发错误把速率压到底
+                window = max(1.0, state.latency_ewma or 1.0)
+                if now - state.last_decrease >= window:
+                    state.last_decrease = now
+                    state.concurrency = max(1.0, state.concurrency / 2)
+                    state.rate = max(self.min_rate, state.rate / 2)
+                    logger.info(f"站点 {host} 限流收紧: 并发 {state.concurrency:.1f}, 速率 {state.rate:.2f}/s"
+                                f"（{'状态码 ' + str(status_code) if status_code else '延迟突增' if spike else '请求失败'}）")
+            else:
+                state.concurrency = min(self.max_concurrency, state.concurrency + 1 / state.concurrency)
+                state.rate = min(self.max_rate, state.rate + 1 / state.rate)
+
+            if latency is not None and not throttled:
+                state.samples += 1
+                state.latency_ewma = latency if state.latency_ewma is None else 0.8 * state.latency_ewma + 0.2 * latency
+            self._cond.notify_all()
+
+    def stats(self, url_or_host: str) -> Optional[dict]:
+        """返回某个站点当前的限流状态"""
+        with self._cond:
+            state = self._hosts.get(self.host_of(url_or_host))
+            if state is None:
+                return None
+            return {
+                'rate': state.rate,
+                'concurrency': state.concurrency,
+                'in_flight': state.in_flight,
+                'latency_ewma': state.latency_ewma
+            }
+
+
+# 进程内共享的限流器
+rate_limiter = HostRateLimiter()
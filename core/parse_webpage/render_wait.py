@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+页面渲染完成判定
+用网络空闲、DOM变更静默窗口和可选的站点CSS选择器判断动态页面是否渲染完成，
+替代固定时长的sleep，所有等待共享一个总时长上限
+"""
+
+import os
+import sys
+import time
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+from urllib.parse import urlparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# 在页面中安装MutationObserver并返回当前渲染状态，selenium和playwright共用
+RENDER_PROBE_JS = """(() => {
+    if (!window.__webextractoRender) {
+        window.__webextractoRender = {lastMutation: performance.now()};
+        new MutationObserver(() => {
+            window.__webextractoRender.lastMutation = performance.now();
+        }).observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+    }
+    const entries = performance.getEntriesByType('resource');
+    let lastNetwork = 0;
+    for (const entry of entries) {
+        lastNetwork = Math.max(lastNetwork, entry.responseEnd);
+    }
+    return {
+        now: performance.now(),
+        lastMutation: window.__webextractoRender.lastMutation,
+        lastNetwork: lastNetwork,
+        resourceCount: entries.length,
+        readyState: document.readyState
+    };
+})()"""
+
+# playwright的wait_for_function使用：DOM静默超过指定毫秒数时返回true
+DOM_QUIET_JS = """(quietMs) => {
+    const state = window.__webextractoRender;
+    return !!state && performance.now() - state.lastMutation >= quietMs;
+}"""
+
+
+def _parse_wait_selectors(raw: str) -> Dict[str, str]:
+    """解析 "host=selector;host2=selector2" 格式的站点选择器配置"""
+    selectors = {}
+    for item in raw.split(';'):
+        if '=' not in item:
+            continue
+        host, selector = item.split('=', 1)
+        host, selector = host.strip().lower(), selector.strip()
+        if host and selector:
+            selectors[host] = selector
+    return selectors
+
+
+_SITE_SELECTORS = _parse_wait_selectors(config.RENDER_WAIT_SELECTORS)
+
+
+@dataclass
+class RenderWaitStrategy:
+    """渲染等待策略"""
+    max_wait: float = 10.0           # 渲染等待总上限（秒）
+    network_idle_ms: int = 500       # 无新网络请求完成的持续时长
+    dom_quiet_ms: int = 500          # DOM无变更的持续时长
+    wait_selector: Optional[str] = None  # 站点专用的就绪选择器
+    poll_interval: float = 0.1
+
+    @classmethod
+    def for_url(cls, url: str) -> 'RenderWaitStrategy':
+        """
+        按配置生成针对某个URL的等待策略
+        Args:
+            url: 目标网页URL
+        Returns:
+            RenderWaitStrategy: 等待策略，站点选择器按host匹配（兼容去掉www.的写法）
+        """
+        host = (urlparse(url).hostname or '').lower()
+        selector = _SITE_SELECTORS.get(host)
+        if selector is None and host.startswith('www.'):
+            selector = _SITE_SELECTORS.get(host[4:])
+        return cls(
+            max_wait=config.RENDER_MAX_WAIT,
+            network_idle_ms=config.RENDER_NETWORK_IDLE_MS,
+            dom_quiet_ms=config.RENDER_DOM_QUIET_MS,
+            wait_selector=selector
+        )
+
+    def deadline(self) -> float:
+        """返回本次等待的截止时间（time.monotonic）"""
+        return time.monotonic() + self.max_wait
+
+    @staticmethod
+    def remaining(deadline: float) -> float:
+        """距离截止时间的剩余秒数"""
+        return max(0.0, deadline - time.monotonic())
+
+    def wait_until_quiet(self, probe: Callable[[], dict], deadline: float) -> bool:
+        """
+        轮询页面状态直到网络空闲且DOM静默
+        Args:
+            probe: 执行RENDER_PROBE_JS并返回结果字典的函数
+            deadline: 截止时间（time.monotonic）
+        Returns:
+            bool: 在截止时间前达到静默返回True，超时返回False
+        """
+        last_count = None
+        while True:
+            try:
+                state = probe() or {}
+            except Exception as e:
+                logger.warning(f"读取页面渲染状态失败: {str(e)}")
+                return False
+
+            now = state.get('now', 0)
+            resource_count = state.get('resourceCount', 0)
+            network_idle = (
+                resource_count == last_count
+                and now - state.get('lastNetwork', 0) >= self.network_idle_ms
+            )
+            dom_quiet = now - state.get('lastMutation', 0) >= self.dom_quiet_ms
+            if state.get('readyState') != 'loading' and network_idle and dom_quiet:
+                return True
+
+            last_count = resource_count
+            if self.remaining(deadline) <= self.poll_interval:
+                logger.info("页面渲染等待达到上限，使用当前内容")
+                return False
+            time.sleep(self.poll_interval)
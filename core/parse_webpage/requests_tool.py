@@ -1,47 +1,167 @@
+import os
+import sys
+import time
+import codecs
+import logging
 import requests
-from bs4 import BeautifulSoup
-from fake_useragent import UserAgent
 
 
-from requests.adapters import HTTPAdapter
 from requests.packages.urllib3.util.retry import Retry
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config import config
+from core.parse_webpage.charset import charset_resolver
+from core.parse_webpage.fetch_response import FetchResponse
+from core.parse_webpage.fetch_timing import TimedHTTPAdapter, start_connection_timing, stop_connection_timing
+from core.parse_webpage.proxy_pool import proxy_pool, PROXY_FAILURE_STATUS
+from core.parse_webpage.rate_limiter import rate_limiter
+from core.parse_webpage.user_agents import random_user_agent
+
+# 站点级的退避由rate_limiter负责，这里只保留少量重试
 retry_strategy = Retry(
-    total=10,  # 重试次数
+    total=config.DEFAULT_RETRY_TIMES,  # 重试次数
     backoff_factor=2,  # 等待时间，指数增长
     status_forcelist=[429, 500, 502, 503, 504],  # 需要重试的HTTP状态码
     allowed_methods=["HEAD", "GET", "OPTIONS"]  # 需要重试的HTTP方法
 )
 
-adapter = HTTPAdapter(max_retries=retry_strategy)
+# 带计时连接类的adapter，记录建连和TLS握手耗时
+adapter = TimedHTTPAdapter(max_retries=retry_strategy)
 http = requests.Session()
 http.mount("http://", adapter)
 http.mount("https://", adapter)
 
-ua = UserAgent()
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 16 * 1024
+# 编码解析使用的正文前缀长度
+ENCODING_SNIFF_BYTES = 64 * 1024
+
+# 常见二进制文件的魔数，首个数据块命中即中止下载
+BINARY_MAGIC_NUMBERS = (
+    b'%PDF', b'PK\x03\x04', b'\x89PNG', b'GIF87a', b'GIF89a', b'\xff\xd8\xff',
+    b'\x1f\x8b', b'Rar!', b'7z\xbc\xaf', b'ID3', b'OggS', b'fLaC',
+    b'\x7fELF', b'wOFF', b'wOF2', b'\xd0\xcf\x11\xe0'
+)
+BINARY_CONTENT_TYPES = ('image/', 'audio/', 'video/', 'font/', 'application/pdf', 'application/zip')
+
+
+def is_binary_prefix(prefix: bytes) -> bool:
+    """根据魔数和NUL字节判断数据是否为二进制内容"""
+    if prefix.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return False
+    if prefix.startswith(BINARY_MAGIC_NUMBERS) or prefix[4:8] in (b'ftyp', b'WEBP'):
+        return True
+    return b'\x00' in prefix[:1024]
+
+
+def truncate_at_tag_boundary(html):
+    """
+    在安全的标签边界截断HTML：截到最后一个完整标签之后，
+    且不把未闭合的script/style/注释的一半留给解析器。
+    支持str和bytes：ASCII兼容编码的多字节字符内部不会出现'<'和'>'
+    """
+    as_bytes = isinstance(html, bytes)
+    if as_bytes:
+        html = html.decode('latin-1')
+    cut = html.rfind('>') + 1
+    html = html[:cut]
+    lowered = html.lower()
+    for opener, closer in (('<script', '</script'), ('<style', '</style'), ('<!--', '-->')):
+        start = lowered.rfind(opener)
+        if start != -1 and lowered.rfind(closer) < start:
+            html, lowered = html[:start], lowered[:start]
+    return html.encode('latin-1') if as_bytes else html
+
 
 class RequestsTool:
     def __init__(self):
-        self.headers = {'User-Agent': ua.random}
+        self.headers = {}
 
     @staticmethod
     def get_encoding_from_headers(response):
         """尝试从响应头中获取编码"""
-        content_type = response.headers.get('Content-Type')
-        if 'charset=' in str(content_type):
-            return content_type.split('charset=')[-1]
-        return None
+        return charset_resolver.from_headers(response.headers)
 
-    def get_url_content_by_requests(self, url):
-        """使用requests获取页面内容"""
+    def fetch(self, url, max_bytes=None):
+        """
+        使用requests流式获取页面原始字节
+        二进制内容在首个数据块即中止，超过大小上限的页面在安全的标签边界截断，
+        编码只根据正文前缀解析，解码和HTML解析推迟到使用时进行
+        Args:
+            url: 目标网页URL
+            max_bytes: 正文大小上限，默认取FETCH_MAX_BODY_BYTES配置
+        Returns:
+            FetchResponse，失败时返回None
+        """
+        max_bytes = max_bytes or config.FETCH_MAX_BODY_BYTES
+        start = time.perf_counter()
+        proxy = proxy_pool.choose(url)
+        proxies = {'http': proxy, 'https': proxy} if proxy else None
+        # 实例在进程内共享，User-Agent按请求轮换
+        headers = {'User-Agent': random_user_agent(), **self.headers}
+        timings = start_connection_timing()
         try:
-            response = http.get(url, headers=self.headers, timeout=(2, 5))
-            response.raise_for_status()
-            encoding = self.get_encoding_from_headers(response) or response.apparent_encoding
-            response.encoding = encoding
-            content = response.text
-            soup = BeautifulSoup(content, 'html.parser')
-            return soup
+            with rate_limiter.acquire(url) as slot, \
+                    http.get(url, headers=headers, timeout=(2, 5), stream=True, proxies=proxies) as response:
+                headers_at = time.perf_counter()
+                slot.record(response.status_code, response.headers)
+                proxy_pool.report(proxy, response.status_code not in PROXY_FAILURE_STATUS,
+                                  time.perf_counter() - slot.start)
+                # 建连耗时在请求过程中由连接类写入，剩余部分即为首字节时间（含重试等待）
+                timings['queue'] = slot.queued
+                timings['ttfb'] = max(0.0, headers_at - slot.start - timings['connect'] - timings['tls'])
+                retries = response.raw.retries
+                response.raise_for_status()
+                content_type = response.headers.get('Content-Type', '').lower()
+                if content_type.startswith(BINARY_CONTENT_TYPES):
+                    logger.warning(f"跳过非HTML内容 {url}: {content_type}")
+                    return None
+
+                body = bytearray()
+                truncated = False
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    if not body and is_binary_prefix(chunk):
+                        logger.warning(f"跳过二进制内容 {url}")
+                        return None
+                    body += chunk
+                    if len(body) > max_bytes:
+                        del body[max_bytes:]
+                        truncated = True
+                        break
+
+                content = bytes(body)
+                timings['download'] = time.perf_counter() - headers_at
+                encoding, _ = charset_resolver.resolve(content[:ENCODING_SNIFF_BYTES], response.headers, url)
+                if truncated:
+                    logger.warning(f"页面超过 {max_bytes} 字节，已截断: {url}")
+                    content = truncate_at_tag_boundary(content)
+
+                return FetchResponse(
+                    url=url,
+                    content=content,
+                    encoding=encoding,
+                    final_url=response.url,
+                    headers=dict(response.headers),
+                    status_code=response.status_code,
+                    tool='requests',
+                    truncated=truncated,
+                    timings={**timings, 'fetch': time.perf_counter() - start},
+                    retries=len(retries.history) if retries else 0,
+                    redirects=len(response.history)
+                )
         except requests.RequestException as e:
+            if isinstance(e, (requests.ConnectionError, requests.Timeout)):
+                proxy_pool.report(proxy, False)
             print(f"Error fetching {url}: {e}")
+            return None
+        finally:
+            proxy_pool.release(proxy)
+            stop_connection_timing()
+
+    def get_url_content_by_requests(self, url):
+        """使用requests获取页面内容"""
+        response = self.fetch(url)
+        if not response:
             return False
+        return response.soup
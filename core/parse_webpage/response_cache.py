@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP响应磁盘缓存
+按规范化URL+获取工具做内容寻址，压缩保存正文和响应头，
+支持TTL、Cache-Control、按总大小的LRU淘汰，多个worker之间通过文件锁共享
+"""
+
+import os
+import sys
+import gzip
+import json
+import time
+import zlib
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+try:
+    import fcntl
+except ImportError:  # Windows下没有fcntl，退化为进程内锁
+    fcntl = None
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config import config
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    规范化URL：scheme和host小写、去掉默认端口和片段、查询参数排序、空路径补"/"
+    Args:
+        url: 原始URL
+    Returns:
+        str: 规范化后的URL
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or '/', query, ''))
+
+
+def parse_cache_control(headers: Dict[str, str], default_ttl: int) -> Optional[int]:
+    """
+    根据Cache-Control/Pragma计算可缓存时长
+    Args:
+        headers: 响应头
+        default_ttl: 响应未声明max-age时使用的缓存秒数
+    Returns:
+        int: 缓存秒数；None表示响应不允许缓存
+    """
+    lowered = {k.lower(): v for k, v in (headers or {}).items()}
+    directives = {}
+    for item in lowered.get('cache-control', '').split(','):
+        name, _, value = item.strip().partition('=')
+        if name:
+            directives[name.lower()] = value.strip('"')
+
+    if 'no-store' in directives or 'no-cache' in directives:
+        return None
+    if 'no-cache' in lowered.get('pragma', '').lower():
+        return None
+    for name in ('s-maxage', 'max-age'):
+        if name in directives:
+            try:
+                ttl = int(directives[name])
+            except ValueError:
+                continue
+            return ttl if ttl > 0 else None
+    return default_ttl
+
+
+class ResponseCache:
+    """HTTP响应磁盘缓存"""
+
+    def __init__(self, cache_dir: str = None, ttl: int = None, max_size_mb: int = None):
+        """
+        初始化响应缓存
+        Args:
+            cache_dir: 缓存目录，默认取CACHE_DIR配置
+            ttl: 默认缓存秒数，默认取CACHE_TTL配置
+            max_size_mb: 缓存总大小上限（MB），超出后按最近访问时间淘汰
+        """
+        self.cache_dir = cache_dir or config.CACHE_DIR
+        self.ttl = config.CACHE_TTL if ttl is None else ttl
+        self.max_size = (config.CACHE_MAX_SIZE_MB if max_size_mb is None else max_size_mb) * 1024 * 1024
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._lock_path = os.path.join(self.cache_dir, '.lock')
+        self._thread_lock = threading.Lock()
+        self._approx_size = self._scan_size()
+
+    @staticmethod
+    def make_key(url: str, tool: str) -> str:
+        """生成缓存键：规范化URL+获取工具的sha256"""
+        raw = f"{tool or 'auto'}\n{canonicalize_url(url)}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + '.gz')
+
+    @contextmanager
+    def _locked(self):
+        """进程内线程锁+跨进程文件锁"""
+        with self._thread_lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self._lock_path, 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def get(self, url: str, tool: str) -> Optional[Tuple[bytes, Dict[str, Any]]]:
+        """
+        读取缓存
+        Args:
+            url: 目标网页URL
+            tool: 获取工具名称
+        Returns:
+            (正文, 元数据) 元组，元数据包含headers及写入时附带的字段；未命中或已过期时返回None
+        """
+        path = self._entry_path(self.make_key(url, tool))
+        try:
+            with gzip.open(path, 'rb') as f:
+                meta = json.loads(f.readline())
+                body = f.read()
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, ValueError, zlib.error) as e:
+            logger.warning(f"缓存条目损坏，已忽略: {path}: {str(e)}")
+            self._remove(path)
+            return None
+
+        if meta.get('expires_at', 0) < time.time():
+            self._remove(path)
+            return None
+
+        # 更新修改时间作为LRU的访问时间
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return body, meta
+
+    def set(self, url: str, tool: str, body: bytes, headers: Dict[str, str] = None, **extra) -> bool:
+        """
+        写入缓存，先写临时文件再原子替换，读者不会看到写了一半的条目
+        Args:
+            url: 目标网页URL
+            tool: 获取工具名称
+            body: 响应正文
+            headers: 响应头
+            extra: 随条目保存的其他元数据（如encoding、final_url）
+        Returns:
+            bool: 是否写入（响应声明不可缓存时返回False）
+        """
+        headers = dict(headers or {})
+        ttl = parse_cache_control(headers, self.ttl)
+        if not ttl:
+            return False
+
+        key = self.make_key(url, tool)
+        path = self._entry_path(key)
+        meta = {
+            **extra,
+            'url': canonicalize_url(url),
+            'tool': tool or 'auto',
+            'headers': headers,
+            'stored_at': time.time(),
+            'expires_at': time.time() + ttl
+        }
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with gzip.open(tmp_path, 'wb', compresslevel=6) as f:
+                f.write(json.dumps(meta, ensure_ascii=False).encode('utf-8') + b'\n')
+                f.write(body)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"写入缓存失败: {str(e)}")
+            self._remove(tmp_path)
+            return False
+
+        self._approx_size += os.path.getsize(path)
+        if self._approx_size > self.max_size:
+            self._evict()
+        return True
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _iter_entries(self):
+        """遍历所有缓存条目，返回 (修改时间, 大小, 路径)"""
+        for sub_dir in os.scandir(self.cache_dir):
+            if not sub_dir.is_dir():
+                continue
+            for entry in os.scandir(sub_dir.path):
+                if entry.name.endswith('.gz'):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    yield stat.st_mtime, stat.st_size, entry.path
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._iter_entries())
+
+    def _evict(self):
+        """淘汰最久未访问的条目，直到总大小降到上限的90%"""
+        with self._locked():
+            entries = sorted(self._iter_entries())
+            total = sum(size for _, size, _ in entries)
+            target = self.max_size * 0.9
+            now = time.time()
+            for mtime, size, path in entries:
+                if total <= target:
+                    break
+                self._remove(path)
+                total -= size
+            self._approx_size = total
+            logger.info(f"响应缓存淘汰完成，当前大小 {total / 1024 / 1024:.1f}MB，耗时 {time.time() - now:.2f}s")
+
+    def clear(self):
+        """清空缓存"""
+        with self._locked():
+            for _, _, path in list(self._iter_entries()):
+                self._remove(path)
+            self._approx_size = 0
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """获取进程内共享的响应缓存实例"""
+    global _shared_cache
+    if _shared_cache is None:
+        with _shared_cache_lock:
+            if _shared_cache is None:
+                _shared_cache = ResponseCache()
+    return _shared_cache
@@ -1,13 +1,21 @@
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.firefox.service import Service as FirefoxService
-from webdriver_manager.firefox import GeckoDriverManager
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
 from bs4 import BeautifulSoup
 import logging
 import time
+import threading
 import shutil
 import platform
 
+from core.parse_webpage.fetch_response import FetchResponse
+from core.parse_webpage.proxy_pool import proxy_pool, parse_proxy
+from core.parse_webpage.rate_limiter import rate_limiter
+from core.parse_webpage.render_wait import RenderWaitStrategy, RENDER_PROBE_JS
+
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -15,11 +23,22 @@ logger = logging.getLogger(__name__)
 class SeleniumTool:
     def __init__(self):
         """初始化SeleniumTool类"""
-        self.driver = None
+        # 实例在进程内共享，每个线程使用自己的浏览器
+        self._local = threading.local()
+
+    @property
+    def driver(self):
+        return getattr(self._local, 'driver', None)
+
+    @driver.setter
+    def driver(self, value):
+        self._local.driver = value
         
-    def init_browser(self) -> webdriver.Firefox:
+    def init_browser(self, proxy: str = None) -> webdriver.Firefox:
         """
         初始化Firefox浏览器
+        Args:
+            proxy: 代理URL，为空时直连
         Returns:
             webdriver.Firefox: Firefox浏览器实例
         """
@@ -33,7 +52,11 @@ class SeleniumTool:
             options.add_argument('--no-sandbox')
             options.add_argument('--marionette-port=2828')  # 指定marionette端口
             options.set_preference('marionette.port', 2828)
+            if proxy:
+                self._set_proxy_preferences(options, proxy)
             
+            # webdriver_manager只在真正需要启动浏览器时导入
+            from webdriver_manager.firefox import GeckoDriverManager
             driver_path = GeckoDriverManager().install()
             service = FirefoxService(driver_path)
             
@@ -54,6 +77,28 @@ class SeleniumTool:
             logger.error(f"初始化浏览器失败: {str(e)}")
             raise
 
+    @staticmethod
+    def _set_proxy_preferences(options, proxy: str):
+        """
+        通过Firefox首选项配置代理
+        Args:
+            options: Firefox启动选项
+            proxy: 代理URL
+        """
+        parts = parse_proxy(proxy)
+        if parts['username']:
+            logger.warning("Firefox首选项不支持代理认证，浏览器请求将不带代理凭据")
+        options.set_preference('network.proxy.type', 1)
+        if parts['scheme'].startswith('socks'):
+            options.set_preference('network.proxy.socks', parts['host'])
+            options.set_preference('network.proxy.socks_port', parts['port'])
+            options.set_preference('network.proxy.socks_version', 4 if parts['scheme'] == 'socks4' else 5)
+            options.set_preference('network.proxy.socks_remote_dns', True)
+        else:
+            for scheme in ('http', 'ssl'):
+                options.set_preference(f'network.proxy.{scheme}', parts['host'])
+                options.set_preference(f'network.proxy.{scheme}_port', parts['port'])
+
     def _check_firefox_installation(self):
         """检查Firefox浏览器是否已安装"""
         system = platform.system()
@@ -81,22 +126,62 @@ class SeleniumTool:
             BeautifulSoup: 页面内容的BeautifulSoup对象
             None: 如果获取失败
         """
+        response = self.fetch(url)
+        return response.soup if response else None
+
+    def get_page_source(self, url: str) -> str:
+        """
+        从URL获取渲染后的页面HTML
+        Args:
+            url: 目标网页URL
+        Returns:
+            str: 渲染后的页面HTML
+            None: 如果获取失败
+        """
+        response = self.fetch(url)
+        return response.text if response else None
+
+    def fetch(self, url: str) -> FetchResponse:
+        """
+        从URL获取渲染后的页面
+        Args:
+            url: 目标网页URL
+        Returns:
+            FetchResponse: 渲染后的页面HTML及最终URL
+            None: 如果获取失败
+        """
+        proxy = proxy_pool.choose(url)
+        start = time.perf_counter()
         try:
             if not self.driver:
-                self.init_browser()
+                self.init_browser(proxy)
             
             # 增加页面加载超时设置
             self.driver.set_page_load_timeout(30)
-            self.driver.get(url)
-            
-            # 等待页面加载完成
-            time.sleep(2)
+            # 渲染等待时长不代表站点延迟，不参与延迟突增判断
+            with rate_limiter.acquire(url, track_latency=False) as slot:
+                self.driver.get(url)
+                loaded_at = time.perf_counter()
+                
+                # 等待页面渲染完成（站点选择器、网络空闲、DOM静默），总时长有上限
+                self._wait_for_render(url)
+            timings = {
+                'queue': slot.queued,
+                'navigate': loaded_at - slot.start,
+                'render': time.perf_counter() - loaded_at
+            }
             
-            page_content = self.driver.page_source
-            soup = BeautifulSoup(page_content, 'html.parser')
-            return soup
+            # 渲染耗时不代表代理延迟，只反馈成败
+            proxy_pool.report(proxy, True)
+            html = self.driver.page_source
+            timings['fetch'] = time.perf_counter() - start
+            return FetchResponse.from_text(
+                url, html,
+                final_url=self.driver.current_url, tool='selenium', timings=timings
+            )
             
         except Exception as e:
+            proxy_pool.report(proxy, False)
             logger.error(f"获取页面内容失败: {str(e)}")
             return None
             
@@ -109,6 +194,28 @@ class SeleniumTool:
                 finally:
                     self.driver = None
 
+    def _wait_for_render(self, url: str):
+        """
+        等待页面渲染完成，替代固定sleep
+        Args:
+            url: 目标网页URL，用于匹配站点专用的就绪选择器
+        """
+        strategy = RenderWaitStrategy.for_url(url)
+        deadline = strategy.deadline()
+
+        if strategy.wait_selector:
+            try:
+                WebDriverWait(self.driver, strategy.remaining(deadline)).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, strategy.wait_selector))
+                )
+            except TimeoutException:
+                logger.warning(f"等待选择器 {strategy.wait_selector} 超时")
+
+        strategy.wait_until_quiet(
+            lambda: self.driver.execute_script("return " + RENDER_PROBE_JS),
+            deadline
+        )
+
 # if __name__ == "__main__":
 #     selenium_tool = SeleniumTool()
 #     soup = selenium_tool.get_page_soup('http://www.flag-ms.com')
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+User-Agent列表
+从随包发布的user_agents.txt读取，每个进程只加载一次，不访问网络
+"""
+
+import os
+import sys
+import random
+import logging
+from functools import lru_cache
+from typing import Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config import config
+
+logger = logging.getLogger(__name__)
+
+USER_AGENTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'user_agents.txt')
+
+
+@lru_cache(maxsize=None)
+def load_user_agents(path: str = USER_AGENTS_FILE) -> Tuple[str, ...]:
+    """
+    读取User-Agent列表
+    Args:
+        path: 列表文件路径，每行一个，#开头为注释
+    Returns:
+        tuple: User-Agent列表；文件不存在或为空时只包含USER_AGENT配置
+    """
+    try:
+        with open(path, encoding='utf-8') as f:
+            agents = tuple(line.strip() for line in f if line.strip() and not line.startswith('#'))
+    except OSError as e:
+        logger.warning(f"读取User-Agent列表失败，使用默认配置: {str(e)}")
+        agents = ()
+    return agents or (config.USER_AGENT,)
+
+
+def random_user_agent() -> str:
+    """随机返回一个User-Agent"""
+    return random.choice(load_user_agents())
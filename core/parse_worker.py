@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTML解析进程池
+BeautifulSoup的解析和清理是纯Python代码，同一进程内并发获取的页面仍只能逐个解析。
+爬虫和/html/*接口把原始字节或HTML文本提交到进程池，子进程完成解析、清理和提取后
+只返回精简的结果（字符串、列表和字典），不在进程间传递文档树
+"""
+
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import config
+
+logger = logging.getLogger(__name__)
+
+
+# ==================== 在子进程中执行的任务 ====================
+# 任务必须是模块级函数，参数和返回值都要能被pickle
+
+def parse_page(content: bytes, encoding: str, base_url: str) -> Dict[str, Any]:
+    """
+    解析并清理一个抓取到的页面
+    Args:
+        content: 原始字节
+        encoding: 编码
+        base_url: 页面URL，用于补全相对链接
+    Returns:
+        dict: 标题、链接、图片、按块分行的文本，以及parse/clean耗时
+    """
+    from core.parser_backend import make_soup
+    from core.clear_html import cleanup_html
+
+    start = time.perf_counter()
+    soup = make_soup(content.decode(encoding or 'utf-8', errors='replace'))
+    parsed = time.perf_counter()
+    cleaned = cleanup_html(soup, base_url)
+    return {
+        'title': cleaned.title,
+        'link_urls': cleaned.link_urls,
+        'image_urls': cleaned.image_urls,
+        'text': cleaned.text,
+        'timings': {'parse': parsed - start, 'clean': time.perf_counter() - parsed}
+    }
+
+
+_worker_agent = None
+
+
+def _get_worker_agent():
+    """每个子进程只创建一次内容提取智能体"""
+    global _worker_agent
+    if _worker_agent is None:
+        from core.ai_summary.html_content_agent import HTMLContentExtractorAgent
+        _worker_agent = HTMLContentExtractorAgent()
+    return _worker_agent
+
+
+def prepare_html_content(html_content: str, url: str = "") -> Dict[str, Any]:
+    """
+    解析、清理HTML并按规则提取标题、作者、时间、正文和媒体，不调用大模型
+    大模型调用由父进程拿到结果后交给HTMLContentExtractorAgent.complete_extraction/complete_analysis
+    Args:
+        html_content: HTML内容
+        url: 页面URL
+    Returns:
+        dict: HTMLContentExtractorAgent.prepare的结果，不含原始HTML
+    """
+    return _get_worker_agent().prepare(html_content, url)
+
+
+# ==================== 进程池 ====================
+
+class ParseWorkerPool:
+    """HTML解析进程池，进程数为1时在当前进程直接执行（协程中在线程池执行）"""
+
+    def __init__(self, workers: int = None):
+        """
+        初始化进程池，子进程在首次提交任务时才启动
+        Args:
+            workers: 进程数，0表示CPU核数，默认取PARSE_WORKERS配置
+        """
+        workers = config.PARSE_WORKERS if workers is None else workers
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 1
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                    logger.info(f"HTML解析进程池已启动，进程数: {self.workers}")
+        return self._executor
+
+    @staticmethod
+    def _run_inline(fn: Callable, *args) -> Future:
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def submit(self, fn: Callable, *args) -> Future:
+        """
+        提交任务
+        Args:
+            fn: 本模块中的任务函数
+            *args: 任务参数
+        Returns:
+            Future: 未启用进程池或进程池不可用时返回已完成的Future
+        """
+        if not self.enabled:
+            return self._run_inline(fn, *args)
+        try:
+            return self._get_executor().submit(fn, *args)
+        except BrokenProcessPool:
+            # 子进程异常退出后重建进程池，本次在当前进程执行
+            logger.warning("HTML解析进程池已损坏，重新创建")
+            self.shutdown(wait=False)
+            return self._run_inline(fn, *args)
+        except RuntimeError as e:
+            # 解释器退出过程中不能再提交任务
+            logger.warning(f"HTML解析进程池不可用，在当前进程执行: {e}")
+            return self._run_inline(fn, *args)
+
+    def result(self, future: Future, fn: Callable, *args) -> Any:
+        """
+        等待任务结果，子进程异常退出导致进程池损坏时在当前进程重新执行
+        Args:
+            future: submit返回的Future
+            fn: 提交时的任务函数
+            *args: 提交时的任务参数
+        """
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            logger.warning("HTML解析进程池已损坏，在当前进程重新执行")
+            self.shutdown(wait=False)
+            return fn(*args)
+
+    def run(self, fn: Callable, *args) -> Any:
+        """提交任务并等待结果"""
+        return self.result(self.submit(fn, *args), fn, *args)
+
+    async def run_async(self, fn: Callable, *args) -> Any:
+        """
+        在协程中提交任务并等待结果，不阻塞事件循环
+        未启用进程池或进程池不可用时在事件循环的默认线程池中执行
+        """
+        loop = asyncio.get_running_loop()
+        if not self.enabled:
+            return await loop.run_in_executor(None, fn, *args)
+        try:
+            return await asyncio.wrap_future(self._get_executor().submit(fn, *args))
+        except BrokenProcessPool:
+            # 子进程异常退出后重建进程池，本次在线程中重新执行
+            logger.warning("HTML解析进程池已损坏，在线程中重新执行")
+            self.shutdown(wait=False)
+        except RuntimeError as e:
+            # 解释器退出过程中不能再提交任务
+            logger.warning(f"HTML解析进程池不可用，在线程中执行: {e}")
+        return await loop.run_in_executor(None, fn, *args)
+
+    def shutdown(self, wait: bool = True):
+        """关闭进程池"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_parse_pool() -> ParseWorkerPool:
+    """获取进程内共享的解析进程池"""
+    global _shared_pool
+    if _shared_pool is None:
+        with _shared_pool_lock:
+            if _shared_pool is None:
+                _shared_pool = ParseWorkerPool()
+    return _shared_pool
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTML解析器后端
+所有模块统一通过make_soup构造BeautifulSoup，解析器由HTML_PARSER配置选择：
+auto表示已安装lxml时使用C实现的lxml，否则退回纯Python的html.parser。
+解析前先经过html_scrubber预处理，去掉超大的内嵌内容
+"""
+
+import os
+import sys
+import logging
+import importlib.util
+from functools import lru_cache
+
+from bs4 import BeautifulSoup
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import config
+from core.html_scrubber import scrub_html
+
+logger = logging.getLogger(__name__)
+
+# BeautifulSoup解析器名称 -> 依赖的模块
+SUPPORTED_PARSERS = {
+    'lxml': 'lxml',
+    'html5lib': 'html5lib',
+    'html.parser': None,
+}
+
+
+def _is_installed(parser: str) -> bool:
+    module = SUPPORTED_PARSERS.get(parser)
+    return module is None or importlib.util.find_spec(module) is not None
+
+
+@lru_cache(maxsize=None)
+def get_html_parser() -> str:
+    """
+    返回当前使用的解析器名称
+    Returns:
+        str: BeautifulSoup的解析器名称
+    """
+    setting = (config.HTML_PARSER or 'auto').strip().lower()
+    if setting == 'auto':
+        return 'lxml' if _is_installed('lxml') else 'html.parser'
+    if setting not in SUPPORTED_PARSERS:
+        logger.warning(f"不支持的HTML解析器 {setting}，使用html.parser")
+        return 'html.parser'
+    if not _is_installed(setting):
+        logger.warning(f"HTML解析器 {setting} 未安装，使用html.parser")
+        return 'html.parser'
+    return setting
+
+
+def make_soup(markup, parser: str = None, scrub: bool = True) -> BeautifulSoup:
+    """
+    使用配置的解析器解析HTML
+    Args:
+        markup: HTML文本或字节
+        parser: 指定解析器，默认取HTML_PARSER配置
+        scrub: 是否在解析前预处理，HTML_SCRUB_ENABLED为false时不处理
+    Returns:
+        BeautifulSoup: 文档树
+    """
+    if scrub and isinstance(markup, (str, bytes)):
+        markup = scrub_html(markup)
+    return BeautifulSoup(markup, parser or get_html_parser())
@@ -3,9 +3,10 @@ import os
 # 添加项目路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import requests
-from bs4 import BeautifulSoup
 from newspaper import Article# pip install --upgrade lxml_html_clean
 import re
+from core.parse_webpage.rate_limiter import rate_limiter
+from core.parser_backend import make_soup
 
 
 
@@ -19,7 +20,9 @@ class BingSearchEngine:
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36'
         }
-        response = requests.get(url, headers=headers, verify=True)
+        with rate_limiter.acquire(url) as slot:
+            response = requests.get(url, headers=headers, verify=True)
+            slot.record(response.status_code, response.headers)
         if response.status_code == 200:
             response.encoding = 'utf-8'  # Ensure UTF-8 encoding
             return response.text
@@ -27,7 +30,7 @@ class BingSearchEngine:
             return None
 
     def parse_html(self, html_content):
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = make_soup(html_content)
         links = [a['href'] for a in soup.find_all('a', href=True)]
         links = [link for link in links if link.startswith('https')]
         links = [link for link in links if 'bing.com' not in link]
@@ -62,8 +65,10 @@ class BingSearchEngine:
         return [], [], []
 
     def get_content(self, url):
-        response = requests.get(url)
-        soup = BeautifulSoup(response.content, 'html.parser')
+        with rate_limiter.acquire(url) as slot:
+            response = requests.get(url)
+            slot.record(response.status_code, response.headers)
+        soup = make_soup(response.content)
         content = soup.find('div')
         if content:
             return content.get_text()
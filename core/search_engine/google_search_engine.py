@@ -1,4 +1,5 @@
 from googlesearch import search
+from core.parse_webpage.rate_limiter import rate_limiter
 
 class GoogleSearchEngine:
     def __init__(self, keyword, max_results=10):
@@ -8,13 +9,15 @@ class GoogleSearchEngine:
     def search_keyword_by_google(self):
         try:
             results = []
-            for result in search(self.keyword, num_results=self.max_results, advanced=True):
-                print(112233, result.url, result.title, result.description)
-                results.append({
-                    'url': result.url,
-                    'title': result.title,
-                    'description': result.description
-                })
+            # googlesearch内部会分页发起多次请求，整个搜索占用一个google的并发槽位
+            with rate_limiter.acquire('www.google.com', track_latency=False):
+                for result in search(self.keyword, num_results=self.max_results, advanced=True):
+                    print(112233, result.url, result.title, result.description)
+                    results.append({
+                        'url': result.url,
+                        'title': result.title,
+                        'description': result.description
+                    })
             print(444444, results)
             return results
         except Exception as e:
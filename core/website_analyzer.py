@@ -1,9 +1,17 @@
+import os
+import sys
 import requests
 import re
-from bs4 import BeautifulSoup
 from urllib.parse import urlparse, urljoin
 import json
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.parse_webpage.response_cache import get_response_cache
+from core.parse_webpage.charset import charset_resolver
+from core.parse_webpage.rate_limiter import rate_limiter
+from core.parser_backend import make_soup
+from config import config
+
 class WebsiteAnalyzer:
     def __init__(self, base_url, timeout=10):
         """
@@ -16,6 +24,7 @@ class WebsiteAnalyzer:
         self.base_url = base_url
         self.timeout = timeout
         self.content = ""
+        self.cache = get_response_cache() if config.CACHE_ENABLED else None
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
@@ -46,16 +55,27 @@ class WebsiteAnalyzer:
         返回值:
         - 成功时返回True，失败时返回False。
         """
+        cached = self.cache.get(self.base_url, 'analyzer') if self.cache else None
+        if cached:
+            body, meta = cached
+            self.content = body.decode(meta.get('encoding', 'utf-8'), errors='replace')
+            return make_soup(self.content)
+
         try:
-            response = requests.get(
-                self.base_url, 
-                timeout=self.timeout,
-                headers=self.headers
-            )
+            with rate_limiter.acquire(self.base_url) as slot:
+                response = requests.get(
+                    self.base_url, 
+                    timeout=self.timeout,
+                    headers=self.headers
+                )
+                slot.record(response.status_code, response.headers)
             response.raise_for_status()
-            response.encoding = response.apparent_encoding
+            response.encoding, _ = charset_resolver.resolve(response.content, response.headers, self.base_url)
             self.content = response.text
-            return BeautifulSoup(self.content, 'html.parser')
+            if self.cache:
+                self.cache.set(self.base_url, 'analyzer', response.content, dict(response.headers),
+                               encoding=response.encoding)
+            return make_soup(self.content)
         except requests.RequestException as e:
             print(f"Error fetching {self.base_url}: {e}")
             return None
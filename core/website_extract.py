@@ -7,14 +7,18 @@ import os
 
 from urllib.parse import urlparse, urljoin
 import re
+import time
 import logging
-from collections import Counter
+from collections import Counter, deque
+from concurrent.futures import Future
 
 # 添加项目路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from core.clear_html import cleanup_html
 from core.search_engine.search_engine_tool import SearchEngineTool
 from core.parse_webpage.get_webpage_info import WebPageParser
+from core.parse_webpage.fetch_timing import summarize_timings
+from core.parse_worker import get_parse_pool, parse_page
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
@@ -43,14 +47,34 @@ class WebInfo:
         self.max_page = max_page
         self.need_soup = need_soup
         self.webpage_parser = WebPageParser()
+        self.parse_pool = get_parse_pool()
         self.job_urls = []  # 新增:存储工作职位相关URL
         self.common_text_counter = Counter()  # 用于统计重复文本
+        self.timing_records = []  # 每个页面的获取耗时分解
 
     def _clean_html(self, soup, base_url):
-        """清理HTML内容"""
-        title, body, link_urls, image_urls, text = cleanup_html(str(soup), base_url)
+        """清理HTML内容,直接复用已解析的soup(其中的script/style会被移除)"""
+        # 只使用标题、链接、图片和文本,不触发body的最小化
+        cleaned = cleanup_html(soup, base_url)
         
-        # 将文本分段并过滤掉重复内容
+        result = {
+            'title': cleaned.title,
+            'link_urls': cleaned.link_urls, 
+            'image_urls': cleaned.image_urls,
+            'text': self._filter_common_text(cleaned.text, len(self.url_list))
+        }
+        if self.need_soup:
+            result['soup'] = soup
+        return result
+
+    def _filter_common_text(self, text, page_count):
+        """
+        过滤在多个页面中重复出现的文本段
+        Args:
+            text: 按块分行的文本
+            page_count: 获取该页面时已获取的页面总数
+        """
+        # 将文本按块分段并过滤掉重复内容
         text_segments = text.split('\n')
         filtered_segments = []
         
@@ -63,21 +87,11 @@ class WebInfo:
             self.common_text_counter[segment] += 1
             
             # 如果这段文本出现次数小于页面总数的一半,则保留
-            if self.common_text_counter[segment] < len(self.url_list) / 2:
+            if self.common_text_counter[segment] < page_count / 2:
                 filtered_segments.append(segment)
                 
         # 重新组合过滤后的文本
-        filtered_text = '\n'.join(filtered_segments)
-        
-        result = {
-            'title': title,
-            'link_urls': link_urls, 
-            'image_urls': image_urls,
-            'text': filtered_text
-        }
-        if self.need_soup:
-            result['soup'] = soup
-        return result
+        return '\n'.join(filtered_segments)
 
     def get_url(self, name, engine_name="bing"):
         """通过搜索引擎获取URL"""
@@ -90,13 +104,50 @@ class WebInfo:
 
     def get_page_info(self, url):
         """获取单个页面信息"""
-        self.url_list.append(url)
-        soup = self.webpage_parser.get_webpage_content(url)
-        if not soup:
+        pending = self._start_page(url)
+        if not pending:
             return {}
+        return self._finish_page(*pending)
+
+    def _start_page(self, url):
+        """
+        获取页面并提交到解析进程池
+        Returns:
+            (url, 响应, 解析结果的Future, 当时已获取的页面总数)，获取失败时返回None
+        """
+        self.url_list.append(url)
+        page_count = len(self.url_list)
+        response = self.webpage_parser.fetch(url)
+        if not response:
+            return None
         if self.need_soup:
+            # 需要保存soup时只能在当前进程解析
+            soup = response.soup
             self.soup_list.append(soup)
-        return self._clean_html(soup, url)
+            start = time.perf_counter()
+            future = Future()
+            future.set_result(self._clean_html(soup, url))
+            response.timings['clean'] = time.perf_counter() - start
+            return url, response, future, page_count
+        future = self.parse_pool.submit(parse_page, response.content, response.encoding, url)
+        return url, response, future, page_count
+
+    def _finish_page(self, url, response, future, page_count):
+        """等待解析结果，过滤重复文本并记录耗时"""
+        if self.need_soup:
+            result = future.result()
+        else:
+            parsed = self.parse_pool.result(future, parse_page, response.content, response.encoding, url)
+            response.timings.update(parsed['timings'])
+            result = {
+                'title': parsed['title'],
+                'link_urls': parsed['link_urls'],
+                'image_urls': parsed['image_urls'],
+                'text': self._filter_common_text(parsed['text'], page_count)
+            }
+        result['timing'] = response.timing_report()
+        self.timing_records.append(result['timing'])
+        return result
 
     def _extract_files_and_links(self, soup):
         """提取页面中的文件和链接"""
@@ -184,25 +235,40 @@ class WebInfo:
         return "HTML" if self.base_url in url else "Other"
 
     def get_all_page_info(self, need_num_level=1):
-        """获取所有页面信息"""
-        while self.url_list_no_parse:
-            if len(self.seen_texts) > self.max_page:
-                break
+        """
+        获取所有页面信息
+        启用解析进程池时，页面解析的同时继续获取后续页面，最多同时解析与进程数相同的页面
+        """
+        max_in_flight = self.parse_pool.workers if self.parse_pool.enabled else 1
+        in_flight = deque()
+        while self.url_list_no_parse or in_flight:
+            can_start = self.url_list_no_parse and len(in_flight) < max_in_flight
+            if can_start and len(self.seen_texts) <= self.max_page:
+                url_no_parse = self.url_list_no_parse.pop(0)
+                link_url, num_level = list(url_no_parse.items())[0]
                 
-            url_no_parse = self.url_list_no_parse.pop(0)
-            link_url, num_level = list(url_no_parse.items())[0]
-            
-            if num_level > need_num_level or link_url in self.url_list:
-                continue
+                if num_level > need_num_level or link_url in self.url_list:
+                    continue
+                    
+                url_type = self.categorize_url(link_url)
+                if url_type != "HTML":
+                    continue
                 
-            url_type = self.categorize_url(link_url)
-            if url_type != "HTML":
+                try:
+                    pending = self._start_page(link_url)
+                except Exception as e:
+                    logger.error(f"获取页面 {link_url} 时发生错误: {str(e)}")
+                    continue
+                if pending:
+                    in_flight.append((pending, num_level))
                 continue
-                
+            
+            if not in_flight:
+                break
+            pending, num_level = in_flight.popleft()
+            link_url = pending[0]
             try:
-                res = self.get_page_info(link_url)
-                if not res:
-                    continue
+                res = self._finish_page(*pending)
                     
                 page_type = self._page_classes(link_url)
                 if self.need_soup and len(self.soup_list) == 2:
@@ -225,6 +291,10 @@ class WebInfo:
                 logger.error(f"解析页面 {link_url} 时发生错误: {str(e)}")
                 continue
 
+    def timing_summary(self):
+        """汇总本次爬取所有页面的耗时分解"""
+        return summarize_timings(self.timing_records)
+
     def run(self):
         """运行爬虫"""
         self.url_list_no_parse.append({self.url: 0})
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""并发调用大模型时的部分结果测试：用会抛异常、阻塞或正常返回的假调用代替大模型"""
+
+import threading
+import time
+
+import pytest
+
+from core import ai_processor
+from core.ai_processor import AIContentProcessor
+
+
+@pytest.fixture
+def processor():
+    # _run_concurrently不依赖模型初始化
+    return object.__new__(AIContentProcessor)
+
+
+@pytest.fixture
+def release():
+    event = threading.Event()
+    yield event
+    # 放行阻塞的调用，避免占用共享线程池
+    event.set()
+
+
+def test_failed_call_does_not_drop_other_results(processor):
+    def fail(content):
+        raise RuntimeError('quota exceeded')
+
+    results, errors = processor._run_concurrently({
+        'summary': lambda content: f'总结:{content}',
+        'categories': fail,
+        'insights': lambda content: '洞察',
+    }, '正文')
+
+    assert results == {'summary': '总结:正文', 'insights': '洞察'}
+    assert errors == {'categories': 'quota exceeded'}
+
+
+def test_timed_out_call_does_not_block_results(processor, release, monkeypatch):
+    monkeypatch.setattr(ai_processor.app_config, 'AI_CALL_TIMEOUT', 0.2)
+
+    def block(content):
+        release.wait(10)
+        return '太迟'
+
+    start = time.monotonic()
+    results, errors = processor._run_concurrently({
+        'summary': lambda content: '总结',
+        'key_info': block,
+        'categories': lambda content: ['制造业'],
+    }, '正文')
+    elapsed = time.monotonic() - start
+
+    assert elapsed < 2
+    assert results == {'summary': '总结', 'categories': ['制造业']}
+    assert errors == {'key_info': '超时'}
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""网页字符集分级解析测试"""
+
+import codecs
+
+import pytest
+
+from core.parse_webpage.charset import DETECT_SNIFF_BYTES, CharsetResolver
+
+GBK_PAGE = '<html><head><meta charset="gbk"><title>中文标题</title></head><body>正文内容</body></html>'.encode('gbk')
+
+
+@pytest.fixture
+def resolver():
+    return CharsetResolver()
+
+
+def test_bom_overrides_conflicting_header(resolver):
+    body = codecs.BOM_UTF8 + '<html><body>中文</body></html>'.encode('utf-8')
+    headers = {'Content-Type': 'text/html; charset=iso-8859-1'}
+    assert resolver.resolve(body, headers, 'https://example.com/a') == ('utf-8-sig', 'bom')
+
+
+def test_header_overrides_meta(resolver):
+    headers = {'Content-Type': 'text/html; charset=UTF-8'}
+    assert resolver.resolve(GBK_PAGE, headers, 'https://example.com/a') == ('utf-8', 'header')
+
+
+def test_headerless_gbk_page_uses_meta(resolver):
+    encoding, source = resolver.resolve(GBK_PAGE, {}, 'https://example.cn/a')
+    assert (encoding, source) == ('gb18030', 'meta')
+    assert '中文标题' in GBK_PAGE.decode(encoding)
+
+
+def test_same_host_reuses_cached_charset(resolver, monkeypatch):
+    resolver.resolve(GBK_PAGE, {}, 'https://Example.cn/a')
+
+    def fail_detect(prefix):
+        raise AssertionError('不应进行统计探测')
+
+    monkeypatch.setattr(resolver, 'detect', fail_detect)
+    body = '<html><body>没有声明编码的页面</body></html>'.encode('gbk')
+    assert resolver.resolve(body, {'Content-Type': 'text/html'}, 'https://example.cn/b') == ('gb18030', 'host')
+
+
+def test_detect_only_sees_prefix(resolver, monkeypatch):
+    seen = []
+
+    def fake_detect(prefix):
+        seen.append(len(prefix))
+        return {'encoding': 'utf-8'}
+
+    monkeypatch.setattr('requests.compat.chardet.detect', fake_detect)
+    body = ('<html><body>' + '中文' * 50000 + '</body></html>').encode('utf-8')
+    assert resolver.resolve(body, {}, 'https://other.example.com/') == ('utf-8', 'detect')
+    assert seen == [DETECT_SNIFF_BYTES]
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""正文提取器打分测试"""
+
+import pytest
+
+pytest.importorskip('qwen_agent')
+
+from core.ai_summary.content_extractor import MainContentExtractor
+from core.parser_backend import make_soup
+
+PARAGRAPH = '<p>' + '本段介绍公司在工业自动化领域的最新进展，包括产品研发、市场拓展和客户服务，内容较长。' * 2 + '</p>'
+
+
+def _weight(attrs):
+    return MainContentExtractor._class_weight(make_soup(f'<div {attrs}></div>').div)
+
+
+@pytest.mark.parametrize('attrs, expected', [
+    ('class="article-photo shot"', 25),
+    ('class="pagination page-list"', 0),
+    ('class="hotel-intro"', 0),
+    ('class="metadata"', 0),
+    ('id="canvas"', 0),
+    ('class="downloads"', 0),
+    ('class="main_nav"', 0),
+    ('class="site-nav"', -25),
+    ('id="comments"', -25),
+    ('class="ad"', -25),
+    ('class="post-content"', 25),
+])
+def test_class_weight_matches_whole_words(attrs, expected):
+    assert _weight(attrs) == expected
+
+
+def test_pagination_is_not_selected_with_article():
+    html = (
+        '<html><body><div id="wrap">'
+        f'<div class="article-photo shot">{PARAGRAPH * 3}</div>'
+        '<div class="pagination page-list"><p>上一页 1 2 3 4 5 6 7 8 9 10 下一页 共10页</p></div>'
+        '</div></body></html>'
+    )
+    selected = MainContentExtractor().find_main_content(make_soup(html))
+    assert [element.get('class') for element in selected] == [['article-photo', 'shot']]
+
+
+def test_short_high_weight_block_falls_back_to_next_candidate():
+    teaser = '<p>导语：一、二、三、四、五、六、七、八、九、十，更多内容请见下文。</p>'
+    html = (
+        '<html><body>'
+        f'<div class="content">{teaser}</div>'
+        f'<div id="story-wrap"><div>{PARAGRAPH * 2}</div></div>'
+        '</body></html>'
+    )
+    extractor = MainContentExtractor()
+    soup = make_soup(html)
+    stats, scores, _ = extractor._collect_stats(soup)
+    teaser_div = soup.find('div', class_='content')
+    # 导语得分最高，但长度不足
+    assert max(scores, key=scores.get) == id(teaser_div)
+
+    text = extractor.extract_text(soup)
+    assert text is not None
+    assert '工业自动化' in text
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""日期解析测试"""
+
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip('qwen_agent')
+
+from core.ai_summary.date_parser import format_datetime, parse_datetime_with_precision
+from core.ai_summary.html_content_agent import HTMLContentExtractorAgent
+
+NOW = datetime(2024, 5, 10, 12, 0, 0)
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('2024-03-15', '2024-03-15 00:00:00'),
+    ('2024年3月15日', '2024-03-15 00:00:00'),
+    ('2024/3/15 8:05', '2024-03-15 08:05:00'),
+    ('2024-03-15T01:30:00Z', '2024-03-15 09:30:00'),
+    ('Fri, 15 Mar 2024 01:30:00 GMT', '2024-03-15 09:30:00'),
+    ('1710466200', '2024-03-15 09:30:00'),
+    ('发布时间：2024-03-15 09:30 来源：科技日报', '2024-03-15 09:30:00'),
+])
+def test_absolute_dates(text, expected):
+    assert format_datetime(text, NOW) == expected
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('3小时前', '2024-05-10 09:00:00'),
+    ('发布于 3小时前', '2024-05-10 09:00:00'),
+    ('Posted 2 days ago', '2024-05-08 12:00:00'),
+    ('昨天 10:30', '2024-05-09 10:30:00'),
+    ('今天', '2024-05-10 00:00:00'),
+    ('just now', '2024-05-10 12:00:00'),
+])
+def test_relative_dates(text, expected):
+    assert format_datetime(text, NOW) == expected
+
+
+@pytest.mark.parametrize('text', [
+    '今天天气很好，3天前我们去了公园',
+    '昨天公司发布了新产品，今天股价上涨',
+    'The company said today that sales rose 10% compared with 2 weeks ago',
+    '',
+    '没有时间',
+])
+def test_relative_words_in_prose_are_not_dates(text):
+    assert format_datetime(text, NOW) == ""
+
+
+def test_date_only_precision():
+    assert parse_datetime_with_precision('2024-03-15', NOW) == (datetime(2024, 3, 15), False)
+
+
+def test_agent_publish_time_ignores_prose():
+    agent = object.__new__(HTMLContentExtractorAgent)
+    extract = agent._extract_publish_time_from_ai_result
+
+    assert extract({'publish_time': '2024-03-15'}) == '2024-03-15 00:00:00'
+    assert extract({'summary': '文章介绍了公司今天发布的新产品', 'content_preview': '3天前开始预售'}) == ""
+    assert extract({'summary': '', 'content_preview': '发布时间：2024年3月15日\n正文'}) == '2024-03-15 00:00:00'
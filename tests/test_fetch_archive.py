@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""WARC录制与回放测试"""
+
+import os
+
+from core.parse_webpage.fetch_archive import FetchArchive
+from core.parse_webpage.fetch_response import FetchResponse
+
+
+def make_response(url, body, **kwargs):
+    return FetchResponse(
+        url=url,
+        content=body,
+        encoding=kwargs.pop('encoding', 'utf-8'),
+        final_url=kwargs.pop('final_url', url),
+        headers=kwargs.pop('headers', {'Content-Type': 'text/html; charset=utf-8'}),
+        status_code=200,
+        tool='requests',
+        timings={'fetch': 0.25},
+        **kwargs
+    )
+
+
+def test_round_trip(tmp_path):
+    archive = FetchArchive(str(tmp_path / 'fetch.warc.gz'), latency_scale=0)
+    gbk_body = '<html><body>中文页面\r\n\r\n第二段</body></html>'.encode('gbk')
+    original = make_response(
+        'https://example.com/news?id=1',
+        gbk_body,
+        encoding='gb18030',
+        final_url='https://www.example.com/news/1',
+        headers={'Content-Type': 'text/html', 'Server': 'nginx', 'Set-Cookie': 'a=1; Path=/'},
+        redirects=1
+    )
+    archive.record(original)
+
+    replayed = archive.replay('https://example.com/news?id=1')
+    assert replayed is not None
+    assert replayed.content == original.content
+    assert replayed.headers == original.headers
+    assert replayed.final_url == original.final_url
+    assert replayed.encoding == original.encoding
+    assert replayed.status_code == 200
+    assert replayed.tool == 'requests'
+    assert replayed.redirects == 1
+
+
+def test_replay_miss_and_latest_record_wins(tmp_path):
+    path = tmp_path / 'fetch.warc.gz'
+    archive = FetchArchive(str(path), latency_scale=0)
+    assert archive.replay('https://example.com/') is None
+
+    large_body = b'<html><body>' + os.urandom(300 * 1024).hex().encode('ascii') + b'</body></html>'
+    archive.record(make_response('https://example.com/a', b'<html>old</html>'))
+    archive.record(make_response('https://example.com/big', large_body))
+    archive.record(make_response('https://example.com/a', b'<html>new</html>'))
+
+    assert archive.replay('https://example.com/never-recorded') is None
+    assert archive.replay('https://example.com/big').content == large_body
+    assert archive.replay('https://EXAMPLE.com/a#top').content == b'<html>new</html>'
+
+    # 另一个实例从文件重新建立索引
+    assert FetchArchive(str(path), latency_scale=0).replay('https://example.com/a').content == b'<html>new</html>'
+
+
+def test_encoding_headers_are_dropped(tmp_path):
+    archive = FetchArchive(str(tmp_path / 'fetch.warc.gz'), latency_scale=0)
+    archive.record(make_response('https://example.com/', b'<html>plain</html>', headers={
+        'Content-Type': 'text/html', 'Content-Encoding': 'gzip', 'Content-Length': '999'
+    }))
+    replayed = archive.replay('https://example.com/')
+    assert replayed.headers == {'Content-Type': 'text/html'}
+    assert replayed.content == b'<html>plain</html>'
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""FetchResponse与WebPageParser降级逻辑测试"""
+
+from core.parse_webpage.fetch_response import FetchResponse
+from core.parse_webpage.get_webpage_info import WebPageParser
+
+
+def test_blank_body_is_falsy():
+    assert not FetchResponse(url='https://example.com', content=b'')
+    assert not FetchResponse(url='https://example.com', content=b' \r\n\t ')
+    assert FetchResponse(url='https://example.com', content=b'<html></html>')
+
+
+def test_blank_body_falls_back_to_next_tool(monkeypatch):
+    parser = WebPageParser(use_cache=False, archive_mode='off')
+    bodies = {'requests': b'   ', 'selenium': b'<html><body>rendered</body></html>'}
+    calls = []
+
+    def fake_fetch(url, tool_type):
+        calls.append(tool_type)
+        return FetchResponse(url=url, content=bodies[tool_type], tool=tool_type)
+
+    monkeypatch.setattr(parser, '_fetch_with_tool', fake_fetch)
+    response = parser.fetch('https://example.com')
+
+    assert calls == ['requests', 'selenium']
+    assert response.tool == 'selenium'
+    assert [attempt['ok'] for attempt in response.attempts] == [False, True]
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""解析前HTML预处理的各项限制测试"""
+
+import os
+
+import pytest
+
+from core.html_scrubber import HTMLScrubber
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def make_scrubber(**limits):
+    defaults = dict(max_inline_bytes=0, max_data_uri=0, max_depth=0, max_nodes=0,
+                    max_attributes=0, max_attribute_length=0)
+    defaults.update(limits)
+    return HTMLScrubber(**defaults)
+
+
+@pytest.mark.parametrize('name', ['article.html', 'listing.html', 'news_en.html'])
+def test_fixture_pages_pass_unchanged(name):
+    with open(os.path.join(FIXTURES, name), 'rb') as f:
+        raw = f.read()
+    scrubber = HTMLScrubber(max_inline_bytes=262144, max_data_uri=2048, max_depth=256, max_nodes=200000,
+                            max_attributes=64, max_attribute_length=8192)
+    assert scrubber.scrub(raw) == raw
+    assert scrubber.scrub(raw.decode('utf-8')) == raw.decode('utf-8')
+
+
+def test_max_depth_drops_deep_tags_keeps_text():
+    html = '<div>' * 5 + 'deep text' + '</div>' * 5
+    result, stats = make_scrubber(max_depth=3).scrub_with_stats(html)
+    assert result == '<div><div><div>deep text</div></div></div>'
+    assert stats['deep_tags'] == 4
+
+
+def test_max_nodes_truncates():
+    html = ''.join(f'<p>{i}</p>' for i in range(10))
+    result, stats = make_scrubber(max_nodes=3).scrub_with_stats(html)
+    assert result == '<p>0</p><p>1</p><p>2</p>'
+    assert stats['truncated'] == 1
+
+
+def test_max_attributes():
+    attrs = ' '.join(f'data-a{i}="{i}"' for i in range(10))
+    result, stats = make_scrubber(max_attributes=3).scrub_with_stats(f'<div id="x" {attrs}>text</div>')
+    assert result == '<div id="x" data-a0="0" data-a1="1">text</div>'
+    assert stats['attribute_tags'] == 1
+
+
+def test_max_attribute_length():
+    html = f'<img src="a.png" data-state="{"x" * 500}" alt=\'pic\' />'
+    result, stats = make_scrubber(max_attribute_length=100).scrub_with_stats(html.encode('utf-8'))
+    assert result == b'<img src="a.png" alt=\'pic\' />'
+    assert stats['attribute_tags'] == 1
+
+
+@pytest.mark.parametrize('tag', ['script', 'style', 'svg'])
+def test_oversized_inline_block_is_emptied(tag):
+    small = f'<{tag}>short</{tag}>'
+    large = f'<{tag} id="big">{"x" * 2000}</{tag}>'
+    result, stats = make_scrubber(max_inline_bytes=1000).scrub_with_stats(f'<body>{small}{large}<p>after</p></body>')
+    assert result == f'<body>{small}<{tag} id="big"></{tag}><p>after</p></body>'
+    assert stats['inline_blocks'] == 1
+
+
+def test_oversized_data_uri_is_emptied():
+    small = 'data:image/png;base64,AAAA'
+    large = 'data:image/png;base64,' + 'A' * 5000
+    html = f'<img src="{small}"><img src="{large}">'
+    result, stats = make_scrubber(max_data_uri=1000).scrub_with_stats(html)
+    assert result == f'<img src="{small}"><img src="data:,">'
+    assert stats['data_uris'] == 1
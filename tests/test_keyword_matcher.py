@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""关键词匹配器与逐个关键词子串判断的等价性测试"""
+
+import random
+
+import pytest
+
+pytest.importorskip('qwen_agent')
+
+from core.ai_summary.keyword_matcher import KeywordMatcher
+
+
+def naive_scan(categories, text):
+    """被替换的写法：逐个关键词做子串判断"""
+    text = text.lower()
+    return {
+        category: {keyword.lower() for keyword in keywords if keyword and keyword.lower() in text}
+        for category, keywords in categories.items()
+    }
+
+
+CASES = [
+    # 重叠和互为前缀的关键词
+    ({'a': ['ab', 'abc', 'abcd'], 'b': ['bc', 'cd', 'd']}, 'xxabcdyy'),
+    ({'a': ['abc', 'cde'], 'b': ['bcd']}, 'abcde'),
+    ({'a': ['aa', 'aaa'], 'b': ['a']}, 'aaaa'),
+    ({'a': ['ab'], 'b': ['ba']}, 'aba'),
+    # 中文关键词
+    ({'login': ['登录', '登录页', '注册'], 'company': ['公司', '有限公司', '公司简介']},
+     '欢迎访问某某科技有限公司简介，请先登录后注册'),
+    ({'a': ['产品', '产品服务', '服务'], 'b': ['品服']}, '我们的产品服务覆盖全国'),
+    # 正则元字符
+    ({'a': ['c++', 'c#', '.net', 'a.b', '(beta)', '[x]', 'what?', '$100', '^_^', 'a|b', '\\d']},
+     'C++ and C# on .NET (beta) [x] what? costs $100 ^_^ a|b \\d, but not axb'),
+    # 大小写
+    ({'a': ['Cookie', 'PRIVACY POLICY'], 'b': ['sign in']}, 'Accept cookies; read our Privacy Policy. Sign In'),
+    ({'a': ['abc'], 'b': []}, ''),
+]
+
+
+@pytest.mark.parametrize('categories, text', CASES)
+def test_scan_matches_naive_loop(categories, text):
+    assert KeywordMatcher(categories).scan(text) == naive_scan(categories, text)
+
+
+def test_counts():
+    categories = {'login': ['登录', '注册', 'password'], 'consent': ['cookie']}
+    assert KeywordMatcher(categories).counts('登录 / 注册 / Password') == {'login': 3, 'consent': 0}
+
+
+def test_random_keywords_match_naive_loop():
+    rng = random.Random(20240510)
+    alphabet = 'ab.c中文'
+    for _ in range(500):
+        categories = {
+            name: [''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(0, 5))]
+            for name in ('x', 'y', 'z')
+        }
+        text = ''.join(rng.choice(alphabet + 'AB') for _ in range(rng.randint(0, 30)))
+        assert KeywordMatcher(categories).scan(text) == naive_scan(categories, text), (categories, text)
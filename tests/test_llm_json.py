@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""大模型回复JSON提取测试"""
+
+from core.llm_json import extract_json
+
+
+def test_extract_from_code_block_with_text():
+    text = '分析如下：\n```json\n{"summary": "简介", "tags": ["a", "b"],}\n```\n以上。'
+    assert extract_json(text, dict) == {"summary": "简介", "tags": ["a", "b"]}
+
+
+def test_expect_list_looks_inside_object():
+    assert extract_json('{"categories": ["制造业", "机器人"]}', list) == ["制造业", "机器人"]
+    assert extract_json('{"result": {"tags": ["a"]}, "count": 1}', list) == ["a"]
+    assert extract_json('{"count": 1}', list, default=[]) == []
+
+
+def test_truncated_keeps_last_complete_element():
+    assert extract_json('["a","b"', list) == ["a", "b"]
+    assert extract_json('["a","b', list) == ["a"]
+    assert extract_json('{"summary": "简介", "tags": ["a", "b"', dict) == {"summary": "简介", "tags": ["a", "b"]}
+
+
+def test_truncated_object_drops_dangling_key():
+    assert extract_json('{"a": "b", "c"', dict) == {"a": "b"}
+    assert extract_json('{"a": "b", "c": "d', dict) == {"a": "b"}
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""srcset解析测试"""
+
+from core.media_extractor import best_srcset_candidate, parse_srcset
+
+
+def test_parse_srcset_basic():
+    assert parse_srcset('a.jpg 480w, b.jpg 960w') == [('a.jpg', 480.0), ('b.jpg', 960.0)]
+    assert parse_srcset('a.jpg 1x,b.jpg 2x') == [('a.jpg', 1.0), ('b.jpg', 2.0)]
+    assert parse_srcset('a.jpg, b.jpg 2x') == [('a.jpg', 1.0), ('b.jpg', 2.0)]
+    assert parse_srcset('  ') == []
+
+
+def test_parse_srcset_url_with_comma():
+    srcset = 'https://x.com/img,w_200.jpg 200w, https://x.com/img,w_800.jpg 800w'
+    assert parse_srcset(srcset) == [
+        ('https://x.com/img,w_200.jpg', 200.0),
+        ('https://x.com/img,w_800.jpg', 800.0),
+    ]
+    assert best_srcset_candidate(srcset) == 'https://x.com/img,w_800.jpg'
+
+
+def test_best_srcset_candidate_skips_data_url():
+    assert best_srcset_candidate('data:image/png;base64,AAAA 4x, big.jpg 2x') == 'big.jpg'
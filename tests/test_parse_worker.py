@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""解析进程池在协程中的执行方式测试"""
+
+import asyncio
+import threading
+from concurrent.futures.process import BrokenProcessPool
+
+from core.parse_worker import ParseWorkerPool
+
+
+def _current_thread_name():
+    return threading.current_thread().name
+
+
+def test_run_async_without_pool_uses_thread():
+    pool = ParseWorkerPool(workers=1)
+
+    async def main():
+        return await pool.run_async(_current_thread_name), threading.current_thread().name
+
+    worker_thread, loop_thread = asyncio.run(main())
+    assert worker_thread != loop_thread
+
+
+def test_run_async_broken_pool_falls_back_to_thread(monkeypatch):
+    pool = ParseWorkerPool(workers=2)
+
+    class BrokenExecutor:
+        def submit(self, fn, *args):
+            raise BrokenProcessPool('worker died')
+
+        def shutdown(self, wait=True):
+            pass
+
+    monkeypatch.setattr(pool, '_get_executor', lambda: BrokenExecutor())
+
+    async def main():
+        return await pool.run_async(_current_thread_name), threading.current_thread().name
+
+    worker_thread, loop_thread = asyncio.run(main())
+    assert worker_thread != loop_thread
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+解析器一致性测试
+同一批样例页面分别用html.parser和lxml解析，cleanup_html、HTMLCleaner和ContentProcessor的
+提取结果应当相同
+"""
+
+import os
+
+import pytest
+
+from config import config
+from core.parser_backend import get_html_parser, make_soup
+from core.clear_html import cleanup_html
+
+pytest.importorskip('lxml')
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+FIXTURES = sorted(name for name in os.listdir(FIXTURE_DIR) if name.endswith('.html'))
+PARSERS = ('html.parser', 'lxml')
+BASE_URL = 'https://site.com/news/2024/'
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURE_DIR, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def with_parser(monkeypatch, parser, func):
+    """切换HTML_PARSER配置后执行func"""
+    monkeypatch.setattr(config, 'HTML_PARSER', parser)
+    get_html_parser.cache_clear()
+    try:
+        assert get_html_parser() == parser
+        return func()
+    finally:
+        get_html_parser.cache_clear()
+
+
+def across_parsers(monkeypatch, func):
+    return [with_parser(monkeypatch, parser, func) for parser in PARSERS]
+
+
+@pytest.mark.parametrize('name', FIXTURES)
+def test_cleanup_html_parity(monkeypatch, name):
+    html = read_fixture(name)
+
+    def run():
+        result = cleanup_html(html, BASE_URL)
+        return result.title, result.text, result.link_urls, result.image_urls
+
+    baseline, candidate = across_parsers(monkeypatch, run)
+    assert baseline[1], "样例页面应当能提取出文本"
+    assert candidate == baseline
+
+
+@pytest.mark.parametrize('name', FIXTURES)
+def test_html_cleaner_parity(monkeypatch, name):
+    pytest.importorskip('qwen_agent')
+    from core.ai_summary.html_cleaner import HTMLCleaner
+
+    html = read_fixture(name)
+    cleaner = HTMLCleaner()
+
+    def run():
+        cleaned = cleaner.clean_html(html)
+        # 比较清理后的文本和保留的结构，不比较两种解析器序列化细节上的差异
+        soup = make_soup(cleaned, parser='html.parser')
+        return (
+            cleaner.extract_text_content(html),
+            soup.get_text(' ', strip=True),
+            [tag.name for tag in soup.find_all(True)],
+            cleaner.extract_links(html),
+            cleaner.extract_images(html)
+        )
+
+    baseline, candidate = across_parsers(monkeypatch, run)
+    assert candidate == baseline
+
+
+@pytest.mark.parametrize('name', FIXTURES)
+def test_content_processor_parity(monkeypatch, name):
+    pytest.importorskip('qwen_agent')
+    from core.ai_summary.content_processor import ContentProcessor
+
+    html = read_fixture(name)
+    processor = ContentProcessor(use_ai=False)
+
+    def run():
+        result = processor.process_html_content(html, BASE_URL)
+        return (result.is_valid, result.title, result.author, result.publish_time, result.content,
+                result.summary, result.tags, result.content_type, result.word_count)
+
+    baseline, candidate = across_parsers(monkeypatch, run)
+    assert candidate == baseline
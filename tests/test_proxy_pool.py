@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""代理池测试：使用假代理地址和可控时钟，不访问网络"""
+
+import types
+
+import pytest
+
+import core.parse_webpage.proxy_pool as proxy_pool_module
+import core.parse_webpage.requests_tool as requests_tool
+from core.parse_webpage.proxy_pool import ProxyPool
+
+FAST = 'http://10.0.0.1:8080'
+SLOW = 'http://10.0.0.2:8080'
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """替换代理池使用的单调时钟"""
+    now = [1000.0]
+    monkeypatch.setattr(proxy_pool_module, 'time', types.SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def make_pool(proxies=(FAST, SLOW), sticky_hosts=()):
+    return ProxyPool(list(proxies), sticky_hosts=list(sticky_hosts), eject_after=2, reprobe_seconds=10)
+
+
+def stats_of(pool, proxy):
+    return next(item for item in pool.stats() if item['proxy'] == proxy)
+
+
+def test_latency_ewma_and_weight():
+    pool = make_pool()
+    pool.report(FAST, True, 0.1)
+    pool.report(FAST, True, 0.6)
+    assert stats_of(pool, FAST)['latency_ewma'] == pytest.approx(0.8 * 0.1 + 0.2 * 0.6)
+
+    pool.report(SLOW, True, 2.0)
+    pool.report(SLOW, False)
+    assert stats_of(pool, FAST)['weight'] > stats_of(pool, SLOW)['weight']
+
+
+def test_weighted_choice_prefers_healthy_proxy(monkeypatch):
+    pool = make_pool()
+    pool.report(FAST, True, 0.1)
+    pool.report(SLOW, True, 3.0)
+    seen = []
+    monkeypatch.setattr(proxy_pool_module.random, 'choices',
+                        lambda candidates, weights: seen.append(dict(zip([c.url for c in candidates], weights))) or [candidates[0]])
+    pool.choose('https://example.com/')
+    assert seen[0][FAST] > seen[0][SLOW]
+
+
+def test_ejection_and_reprobe(clock):
+    pool = make_pool(proxies=(FAST,))
+    pool.report(FAST, False)
+    assert pool.choose('https://example.com/') == FAST
+    pool.report(FAST, False)
+    assert stats_of(pool, FAST)['ejected']
+    assert pool.choose('https://example.com/') is None
+
+    # 冷却结束后只放行一个探测请求
+    clock[0] += 10
+    assert pool.choose('https://example.com/') == FAST
+    assert pool.choose('https://example.com/') is None
+
+    # 探测失败后冷却时间翻倍
+    pool.report(FAST, False)
+    clock[0] += 10
+    assert pool.choose('https://example.com/') is None
+    clock[0] += 10
+    assert pool.choose('https://example.com/') == FAST
+
+    # 探测成功后恢复
+    pool.report(FAST, True, 0.2)
+    assert not stats_of(pool, FAST)['ejected']
+    assert pool.choose('https://example.com/') == FAST
+
+
+def test_release_clears_probe_without_report(clock):
+    pool = make_pool(proxies=(FAST,))
+    pool.report(FAST, False)
+    pool.report(FAST, False)
+    clock[0] += 10
+    assert pool.choose('https://example.com/') == FAST
+    pool.release(FAST)
+    assert pool.choose('https://example.com/') == FAST
+
+
+def test_sticky_host_assignment(clock):
+    pool = make_pool(sticky_hosts=('shop.example.com',))
+    first = pool.choose('https://shop.example.com/cart')
+    assert all(pool.choose('https://shop.example.com/item/%d' % i) == first for i in range(20))
+
+    # 被剔除的代理不再承担粘性站点
+    pool.report(first, False)
+    pool.report(first, False)
+    other = SLOW if first == FAST else FAST
+    assert pool.choose('https://shop.example.com/cart') == other
+
+
+def test_requests_tool_releases_probe_on_unexpected_error(clock, monkeypatch):
+    pool = make_pool(proxies=(FAST,))
+    pool.report(FAST, False)
+    pool.report(FAST, False)
+    clock[0] += 10
+    monkeypatch.setattr(requests_tool, 'proxy_pool', pool)
+
+    def broken_get(*args, **kwargs):
+        raise ValueError('unexpected')
+
+    monkeypatch.setattr(requests_tool.http, 'get', broken_get)
+    with pytest.raises(ValueError):
+        requests_tool.RequestsTool().fetch('https://example.com/')
+    assert pool.choose('https://example.com/') == FAST
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""页面质量判断测试：得分只决定是否调用大模型，不丢弃页面内容"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip('qwen_agent')
+
+from core import ai_processor
+from core.ai_summary import quality_gate as quality_gate_module
+from core.ai_summary.quality_gate import QualityGate
+
+ABOUT_PAGE = {'title': '关于我们', 'text': '本公司成立于2005年，专注于工业自动化设备的研发、生产和销售。'}
+PRODUCT_PAGE = {'title': '产品服务', 'text': '产品服务\nRX-100 工业机器人\nRX-200 工业机器人'}
+
+
+def test_allows_threshold_is_inclusive():
+    gate = QualityGate(threshold=0.5, enabled=True)
+    assert gate.allows(0.5)
+    assert not gate.allows(0.46)
+    assert gate.allows(None)
+    assert QualityGate(threshold=0.5, enabled=False).allows(0.0)
+
+
+@pytest.fixture
+def processor(monkeypatch):
+    monkeypatch.setenv('DASHSCOPE_API_KEY', 'test')
+    processor = ai_processor.AIContentProcessor()
+    calls = []
+
+    def fake_call(name, value):
+        def call(content):
+            calls.append((name, content))
+            return value
+        return call
+
+    monkeypatch.setattr(processor, 'summarize_content', fake_call('summary', '总结'))
+    monkeypatch.setattr(processor, 'extract_key_info', fake_call('key_info', {}))
+    monkeypatch.setattr(processor, 'categorize_content', fake_call('categories', ['制造业']))
+    monkeypatch.setattr(processor, 'generate_insights', fake_call('insights', '洞察'))
+    processor.calls = calls
+    return processor
+
+
+def _use_scores(monkeypatch, scores):
+    gate = QualityGate(threshold=0.5, enabled=True)
+    monkeypatch.setattr(gate, 'score_texts', lambda texts: np.asarray(scores[:len(texts)]))
+    monkeypatch.setattr(quality_gate_module, 'get_quality_gate', lambda: gate)
+
+
+def test_borderline_page_is_kept_in_merged_text(monkeypatch, processor):
+    # 产品列表页得分0.46，低于阈值，但其内容仍要交给大模型
+    _use_scores(monkeypatch, [0.9, 0.46])
+    result = processor.process_website_content([ABOUT_PAGE, PRODUCT_PAGE], structured=False)
+
+    assert 'error' not in result
+    assert result['page_count'] == 2
+    assert result['low_quality_page_count'] == 1
+    assert result['titles'] == ['关于我们', '产品服务']
+    assert len(processor.calls) == 4
+    assert all('RX-200 工业机器人' in content for _, content in processor.calls)
+
+
+def test_all_pages_below_threshold_skip_llm(monkeypatch, processor):
+    _use_scores(monkeypatch, [0.2, 0.46])
+    result = processor.process_website_content([ABOUT_PAGE, PRODUCT_PAGE], structured=False)
+
+    assert 'error' in result
+    assert result['quality_scores'] == [0.2, 0.46]
+    assert processor.calls == []
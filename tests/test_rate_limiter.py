@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""按站点自适应限流器测试：使用可控时钟，等待时直接推进时钟"""
+
+import types
+
+import pytest
+
+import core.parse_webpage.rate_limiter as rate_limiter_module
+from core.parse_webpage.rate_limiter import MAX_PAUSE, HostRateLimiter
+
+URL = 'https://example.com/page'
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """替换限流器使用的单调时钟"""
+    now = [1000.0]
+    monkeypatch.setattr(rate_limiter_module, 'time', types.SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+@pytest.fixture
+def limiter(clock):
+    limiter = HostRateLimiter(rate=1.0, max_rate=10.0, concurrency=2, max_concurrency=8, enabled=True)
+    limiter.waits = []
+
+    def fake_wait(timeout=None):
+        # 不真正阻塞：记录等待时长并推进时钟（多推进1微秒，避免浮点舍入使令牌始终差一点）
+        assert timeout is not None, '并发槽位不会在单线程测试中释放'
+        limiter.waits.append(timeout)
+        clock[0] += timeout + 1e-6
+
+    limiter._cond.wait = fake_wait
+    return limiter
+
+
+def request(limiter, clock, status_code=200, headers=None, latency=0.1):
+    with limiter.acquire(URL) as slot:
+        clock[0] += latency
+        slot.record(status_code, headers)
+
+
+def test_success_increases_additively(limiter, clock):
+    request(limiter, clock)
+    stats = limiter.stats(URL)
+    assert stats['rate'] == pytest.approx(2.0)
+    assert stats['concurrency'] == pytest.approx(2.5)
+
+    request(limiter, clock)
+    stats = limiter.stats(URL)
+    assert stats['rate'] == pytest.approx(2.5)
+    assert stats['concurrency'] == pytest.approx(2.9)
+    assert stats['in_flight'] == 0
+
+
+@pytest.mark.parametrize('status_code', [429, 503])
+def test_throttle_status_decreases_multiplicatively(limiter, clock, status_code):
+    for _ in range(3):
+        request(limiter, clock)
+    before = limiter.stats(URL)
+
+    request(limiter, clock, status_code)
+    after = limiter.stats(URL)
+    assert after['rate'] == pytest.approx(before['rate'] / 2)
+    assert after['concurrency'] == pytest.approx(before['concurrency'] / 2)
+
+    # 同一个延迟周期内的第二次错误不再减少
+    limiter._feedback('example.com', status_code, None, False, None)
+    assert limiter.stats(URL)['rate'] == pytest.approx(after['rate'])
+
+    clock[0] += 2
+    limiter._feedback('example.com', status_code, None, False, None)
+    assert limiter.stats(URL)['rate'] == pytest.approx(after['rate'] / 2)
+
+
+def test_rate_never_drops_below_minimum(limiter, clock):
+    for _ in range(10):
+        clock[0] += 5
+        limiter._feedback('example.com', 503, None, False, None)
+    stats = limiter.stats(URL)
+    assert stats['rate'] == pytest.approx(limiter.min_rate)
+    assert stats['concurrency'] == 1.0
+
+
+def test_retry_after_pauses_host(limiter, clock):
+    request(limiter, clock, 429, {'Retry-After': '5'})
+    paused_at = clock[0]
+
+    request(limiter, clock)
+    assert clock[0] - 0.1 >= paused_at + 5
+    assert sum(limiter.waits) == pytest.approx(5.0)
+
+
+def test_retry_after_is_capped(limiter, clock):
+    request(limiter, clock, 503, {'Retry-After': '3600'})
+    request(limiter, clock)
+    assert sum(limiter.waits) == pytest.approx(MAX_PAUSE)
+
+
+def test_latency_spike_backs_off(limiter, clock):
+    for _ in range(5):
+        request(limiter, clock, latency=0.1)
+    before = limiter.stats(URL)
+    assert before['latency_ewma'] == pytest.approx(0.1)
+
+    request(limiter, clock, latency=1.0)
+    after = limiter.stats(URL)
+    assert after['rate'] == pytest.approx(before['rate'] / 2)
+    # 延迟突增与429/503一样减半，不做加性增加
+    assert after['concurrency'] == pytest.approx(before['concurrency'] / 2)
+
+
+def test_exception_inside_acquire_counts_as_error(limiter, clock):
+    request(limiter, clock)
+    before = limiter.stats(URL)
+    with pytest.raises(ConnectionError):
+        with limiter.acquire(URL):
+            raise ConnectionError('reset')
+    assert limiter.stats(URL)['rate'] == pytest.approx(before['rate'] / 2)
+    assert limiter.stats(URL)['in_flight'] == 0
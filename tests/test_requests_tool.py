@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""requests获取工具的截断和二进制嗅探测试"""
+
+import codecs
+import zlib
+
+import pytest
+
+from core.parse_webpage.requests_tool import is_binary_prefix, truncate_at_tag_boundary
+
+
+def test_truncate_inside_tag():
+    assert truncate_at_tag_boundary('<p>hello</p><a href="/x') == '<p>hello</p>'
+    assert truncate_at_tag_boundary(b'<p>hello</p><div cla') == b'<p>hello</p>'
+
+
+def test_truncate_inside_multibyte_character():
+    html = '<p>中文内容</p><p>第二段'.encode('utf-8')
+    # 截在"段"字的第二个字节处
+    cut = html[:len(html) - 2]
+    result = truncate_at_tag_boundary(cut)
+    assert result == '<p>中文内容</p><p>'.encode('utf-8')
+    result.decode('utf-8')
+
+
+def test_truncate_drops_unclosed_script_style_and_comment():
+    assert truncate_at_tag_boundary('<p>a</p><script>var x = "<b>";') == '<p>a</p>'
+    assert truncate_at_tag_boundary('<p>a</p><style>p{}</style><p>b</p>') == '<p>a</p><style>p{}</style><p>b</p>'
+    assert truncate_at_tag_boundary('<p>a</p><!-- <b>note</b>') == '<p>a</p>'
+
+
+def test_truncate_without_any_tag():
+    # 上限之前没有任何完整标签时结果为空，调用方视为获取失败
+    assert truncate_at_tag_boundary(b'plain text without markup') == b''
+    assert truncate_at_tag_boundary('') == ''
+
+
+@pytest.mark.parametrize('prefix', [
+    b'%PDF-1.7\n%\xe2\xe3\xcf\xd3',
+    b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR',
+    b'PK\x03\x04\x14\x00\x00\x00\x08\x00',
+    b'\x00\x00\x00\x18ftypmp42',
+    b'\x1f\x8b' + zlib.compress(b'x'),
+])
+def test_binary_prefixes(prefix):
+    assert is_binary_prefix(prefix)
+
+
+@pytest.mark.parametrize('prefix', [
+    b'<!DOCTYPE html><html><head>',
+    codecs.BOM_UTF8 + '<html><body>中文</body></html>'.encode('utf-8'),
+    codecs.BOM_UTF16_LE + '<html></html>'.encode('utf-16-le'),
+    b'   \r\n<html>',
+])
+def test_html_prefixes(prefix):
+    assert not is_binary_prefix(prefix)
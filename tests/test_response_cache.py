@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""响应磁盘缓存测试：使用临时目录和可控时钟"""
+
+import os
+import types
+
+import pytest
+
+import core.parse_webpage.response_cache as response_cache_module
+from core.parse_webpage.response_cache import ResponseCache, parse_cache_control
+
+URL = 'https://Example.com:443/news?b=2&a=1#top'
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """替换缓存使用的墙上时钟"""
+    now = [1_000_000.0]
+    monkeypatch.setattr(response_cache_module, 'time', types.SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(cache_dir=str(tmp_path), ttl=60, max_size_mb=1)
+
+
+def test_ttl_hit_and_miss(cache, clock):
+    assert cache.set(URL, 'requests', b'<html>ok</html>', {'Content-Type': 'text/html'}, encoding='utf-8')
+
+    body, meta = cache.get('https://example.com/news?a=1&b=2', 'requests')
+    assert body == b'<html>ok</html>'
+    assert meta['encoding'] == 'utf-8'
+    assert meta['headers'] == {'Content-Type': 'text/html'}
+
+    clock[0] += 61
+    assert cache.get(URL, 'requests') is None
+    # 过期条目被删除
+    assert list(cache._iter_entries()) == []
+
+
+@pytest.mark.parametrize('cache_control', ['no-store', 'no-cache', 'private, no-store', 'max-age=0'])
+def test_uncacheable_responses_are_not_stored(cache, clock, cache_control):
+    assert not cache.set(URL, 'requests', b'body', {'Cache-Control': cache_control})
+    assert cache.get(URL, 'requests') is None
+
+
+def test_max_age_overrides_default_ttl(cache, clock):
+    assert parse_cache_control({'cache-control': 'public, max-age=600'}, 60) == 600
+    assert parse_cache_control({'Cache-Control': 's-maxage=5, max-age=600'}, 60) == 5
+    assert parse_cache_control({'Pragma': 'no-cache'}, 60) is None
+    assert parse_cache_control({}, 60) == 60
+
+    cache.set(URL, 'requests', b'long', {'Cache-Control': 'max-age=600'})
+    cache.set(URL, 'selenium', b'short', {'Cache-Control': 'max-age=10'})
+    clock[0] += 100
+    assert cache.get(URL, 'requests')[0] == b'long'
+    assert cache.get(URL, 'selenium') is None
+
+
+def test_key_distinguishes_tools(cache, clock):
+    assert ResponseCache.make_key(URL, 'requests') != ResponseCache.make_key(URL, 'playwright')
+    assert ResponseCache.make_key(URL, 'requests') == ResponseCache.make_key('https://example.com/news?a=1&b=2', 'requests')
+
+    cache.set(URL, 'requests', b'static')
+    cache.set(URL, 'playwright', b'rendered')
+    assert cache.get(URL, 'requests')[0] == b'static'
+    assert cache.get(URL, 'playwright')[0] == b'rendered'
+    assert cache.get(URL, 'selenium') is None
+
+
+def test_lru_eviction_over_max_size(tmp_path, clock):
+    cache = ResponseCache(cache_dir=str(tmp_path), ttl=60, max_size_mb=1)
+    cache.max_size = 3 * 1024
+    urls = [f'https://example.com/page{i}' for i in range(3)]
+    for index, url in enumerate(urls[:2]):
+        # 随机字节无法压缩，每个条目约1KB
+        cache.set(url, 'requests', os.urandom(1024))
+        path = cache._entry_path(cache.make_key(url, 'requests'))
+        os.utime(path, (1000 + index, 1000 + index))
+
+    # 访问page0后它比page1更新，超出上限时淘汰page1
+    assert cache.get(urls[0], 'requests') is not None
+    cache.set(urls[2], 'requests', os.urandom(1024))
+
+    assert cache.get(urls[1], 'requests') is None
+    assert cache.get(urls[0], 'requests') is not None
+    assert cache.get(urls[2], 'requests') is not None
+    assert cache._approx_size <= cache.max_size
+
+
+def test_corrupt_entry_is_a_miss(cache, clock):
+    cache.set(URL, 'requests', b'<html>ok</html>')
+    path = cache._entry_path(cache.make_key(URL, 'requests'))
+    with open(path, 'wb') as f:
+        f.write(b'\x1f\x8b\x08\x00not really gzip')
+
+    assert cache.get(URL, 'requests') is None
+    assert not os.path.exists(path)